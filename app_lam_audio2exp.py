@@ -14,7 +14,13 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 import os
+import io
+import json
 import base64
+import zipfile
+import posixpath
+import threading
+from collections import OrderedDict
 
 import gradio as gr
 import argparse
@@ -26,7 +32,8 @@ from engines.defaults import (
     default_config_parser,
     default_setup,
 )
-from engines.infer import INFER
+from engines.infer import INFER, InferRequest
+from models.utils import build_blendshape_animation, ARKitBlendShape
 from pathlib import Path
 
 try:
@@ -120,45 +127,120 @@ def parse_configs():
     return cfg, cfg_train
 
 
-def create_zip_archive(output_zip='assets/arkitWithBSData.zip', base_dir=""):
-    import os
-    if (os.path.exists(output_zip)):
-        os.remove(output_zip)
-        print(f"Reomve previous file: {output_zip}")
-    run_command = 'zip -r '+output_zip+' '+base_dir
-    os.system(run_command)
-    # check file
-    if(os.path.exists(output_zip)):
-        print(f"Archive created successfully: {output_zip}")
-    else:
-        raise ValueError(f"Archive created failed: {output_zip}")
+class AvatarArchiveCache:
+    """Caches the extracted assets of avatars, keyed by the path, mtime and size of their files.
+
+    A cache hit only costs a stat of the LAM-generated archive, or of every file of a bundled
+    sample avatar, and an edited avatar (new mtime or size) is re-read. Each entry holds the
+    members (posix path relative to the avatar folder, bytes) without bsData.json;
+    create_zip_archive streams them out with the request's own bsData.json. Least recently
+    used entries are evicted beyond ``max_entries`` entries or ``max_bytes`` of member data,
+    an avatar larger than ``max_bytes`` is not cached.
+    """
+
+    def __init__(self, max_entries=32, max_bytes=512 * 2 ** 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._members = OrderedDict()
+        self._sizes = {}
+        self._num_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stat_key(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _get(self, key):
+        with self._lock:
+            members = self._members.get(key)
+            if members is not None:
+                self._members.move_to_end(key)
+            return members
+
+    def _put(self, key, members):
+        members = tuple((name, data) for name, data in members if posixpath.basename(name) != 'bsData.json')
+        size = sum(len(data) for _, data in members)
+        if size > self.max_bytes:
+            return members
+        with self._lock:
+            if key in self._members:
+                self._num_bytes -= self._sizes.pop(key)
+            self._members[key] = members
+            self._members.move_to_end(key)
+            self._sizes[key] = size
+            self._num_bytes += size
+            while len(self._members) > self.max_entries or self._num_bytes > self.max_bytes:
+                evicted, _ = self._members.popitem(last=False)
+                self._num_bytes -= self._sizes.pop(evicted)
+        return members
+
+    def from_zip(self, zip_path, base_id):
+        key = ('zip', os.path.abspath(zip_path), *self._stat_key(zip_path), base_id)
+        members = self._get(key)
+        if members is None:
+            # LAM exports <base_id>/<files>; the avatar folder is served as arkitWithBSData
+            extracted = []
+            with zipfile.ZipFile(zip_path) as src:
+                for info in src.infolist():
+                    if info.is_dir():
+                        continue
+                    parts = info.filename.split('/')
+                    name = '/'.join(parts[1:]) if len(parts) > 1 and parts[0] == base_id else info.filename
+                    extracted.append((posixpath.join('arkitWithBSData', name), src.read(info)))
+            members = self._put(key, extracted)
+        return members
+
+    def from_directory(self, avatar_dir):
+        paths = []
+        for root, dir_names, file_names in os.walk(avatar_dir):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                file_path = os.path.join(root, file_name)
+                paths.append((Path(os.path.relpath(file_path, avatar_dir)).as_posix(), file_path))
+        key = ('dir', os.path.abspath(avatar_dir), tuple((name, *self._stat_key(path)) for name, path in paths))
+        members = self._get(key)
+        if members is None:
+            files = []
+            for name, file_path in paths:
+                with open(file_path, 'rb') as f:
+                    files.append((name, f.read()))
+            members = self._put(key, files)
+        return members
+
+
+def create_zip_archive(output_zip, members, prefix, bs_data):
+    """Streams the cached avatar ``members`` and the request's bsData.json under ``prefix`` into ``output_zip``."""
+    with zipfile.ZipFile(output_zip, 'w', zipfile.ZIP_DEFLATED) as dst:
+        for name, data in members:
+            dst.writestr(posixpath.join(prefix, name), data)
+        dst.writestr(posixpath.join(prefix, 'arkitWithBSData', 'bsData.json'), bs_data)
 
 
 def demo_lam_audio2exp(infer, cfg):
+    avatar_cache = AvatarArchiveCache()
+
     def core_fn(image_path: str, audio_params, working_dir, input_zip_textbox):
 
         if(os.path.exists(input_zip_textbox)):
             base_id = os.path.basename(input_zip_textbox).split(".")[0]
-            output_dir = os.path.join('assets', 'sample_lam', base_id)
-            # unzip_dir
-            if (not os.path.exists(os.path.join(output_dir, 'arkitWithBSData'))):
-                run_command = 'unzip -d '+output_dir+' '+input_zip_textbox
-                os.system(run_command)
-                rename_command = 'mv '+os.path.join(output_dir,base_id)+' '+os.path.join(output_dir,'arkitWithBSData')
-                os.system(rename_command)
+            members = avatar_cache.from_zip(input_zip_textbox, base_id)
         else:
             base_id = os.path.basename(image_path).split(".")[0]
+            members = avatar_cache.from_directory(os.path.join('assets', 'sample_lam', base_id))
+
+        # per-request inputs, the shared cfg is never written: concurrent requests are safe
+        pred_exp = infer.infer(InferRequest(audio_input=audio_params))
 
-        # set input audio
-        cfg.audio_input = audio_params
-        cfg.save_json_path = os.path.join("./assets/sample_lam", base_id, 'arkitWithBSData', 'bsData.json')
-        infer.infer()
+        bs_data = json.dumps(build_blendshape_animation(pred_exp, ARKitBlendShape, fps=infer.output_fps),
+                             indent=2, ensure_ascii=False)
 
         output_file_name = base_id+'_'+os.path.basename(audio_params).split(".")[0]+'.zip'
         assetPrefix = 'gradio_api/file=assets/'
         output_file_path = os.path.join('./assets',output_file_name)
 
-        create_zip_archive(output_zip=output_file_path, base_dir=os.path.join("./assets/sample_lam", base_id))
+        # written straight to ./assets, where gradio serves it from; arcnames always use '/'
+        create_zip_archive(output_file_path, members, posixpath.join('assets', 'sample_lam', base_id), bs_data)
 
         return 'gradio_api/file='+audio_params, assetPrefix+output_file_name
 
@@ -0,0 +1,125 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Throughput of batched offline inference (Audio2ExpressionInfer.infer_batch) against one
+infer_audio_array call per clip.
+
+    python -m benchmarks.batch --config-file configs/lam_audio2exp_config.py --options weight=${CHECKPOINT_PATH} \\
+        --num-clips 64 --batch-sizes 4 8 16 --output batch.json
+
+The workload is --num-clips random crops (seeded, --min-seconds..--max-seconds) of the clips in
+--audio-dir. Reported per batch size: wall time, clips/sec, audio seconds per second and speedup
+over the sequential run. ``max_abs_diff`` compares the raw model outputs of the padded batches
+with per-clip forwards (post-processing is left out since its eye blinks are random).
+"""
+
+import sys
+import math
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from benchmarks.common import (benchmark_argument_parser, build_infer, load_sample_clips, synchronize,
+                               environment_info, peak_rss_mb, write_report)
+
+
+def random_crops(clips, num_clips, min_seconds, max_seconds, sr, seed=0):
+    rng = np.random.default_rng(seed)
+    crops = []
+    for _ in range(num_clips):
+        _, speech_array = clips[rng.integers(len(clips))]
+        length = min(int(rng.uniform(min_seconds, max_seconds) * sr), speech_array.shape[0])
+        start = rng.integers(0, speech_array.shape[0] - length + 1)
+        crops.append(speech_array[start:start + length])
+    return crops
+
+
+def raw_outputs(infer, clips):
+    """Model outputs of one zero-padded batch, trimmed per clip."""
+    lengths = [clip.shape[0] for clip in clips]
+    time_steps = [math.ceil(length / infer.cfg.audio_sr * infer.cfg.fps) for length in lengths]
+    padded = np.zeros((len(clips), max(lengths)), dtype=np.float32)
+    for row, clip in enumerate(clips):
+        padded[row, :clip.shape[0]] = clip
+    input_dict = dict(id_idx=F.one_hot(torch.tensor([infer.cfg.id_idx] * len(clips)),
+                                       infer.cfg.model.backbone.num_identity_classes).to(infer.device),
+                      input_audio_array=torch.from_numpy(padded).to(infer.device),
+                      audio_lengths=torch.tensor(lengths),
+                      time_steps=time_steps)
+    with torch.no_grad():
+        pred_exp = infer.model(input_dict)['pred_exp'].cpu().numpy()
+    return [pred_exp[row, :steps] for row, steps in enumerate(time_steps)]
+
+
+def max_abs_diff(infer, clips, batch_size):
+    diff = 0.0
+    for start in range(0, len(clips), batch_size):
+        batch = clips[start:start + batch_size]
+        for single, batched in zip([raw_outputs(infer, [clip])[0] for clip in batch], raw_outputs(infer, batch)):
+            diff = max(diff, float(np.abs(single - batched).max()))
+    return diff
+
+
+def timed(infer, fn):
+    synchronize(infer.device)
+    start = time.perf_counter()
+    fn()
+    synchronize(infer.device)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = benchmark_argument_parser("batched offline inference benchmark")
+    parser.add_argument("--num-clips", type=int, default=32)
+    parser.add_argument("--min-seconds", type=float, default=2.0)
+    parser.add_argument("--max-seconds", type=float, default=10.0)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[4, 8, 16])
+    parser.add_argument("--parity-clips", type=int, default=8, help="clips used for the max_abs_diff check")
+    args = parser.parse_args()
+
+    infer = build_infer(args)
+    sr = infer.cfg.audio_sr
+    crops = random_crops(load_sample_clips(args.audio_dir, sr), args.num_clips, args.min_seconds, args.max_seconds, sr)
+    audio_seconds = sum(crop.shape[0] for crop in crops) / sr
+
+    for _ in range(args.warmup):
+        infer.infer_audio_array(crops[0], sr)
+        infer.infer_batch(crops[:max(args.batch_sizes)], sr, batch_size=max(args.batch_sizes))
+
+    results = {}
+    seconds = timed(infer, lambda: [infer.infer_audio_array(crop, sr) for crop in crops])
+    results["sequential"] = dict(seconds=seconds, clips_per_sec=len(crops) / seconds,
+                                 audio_sec_per_sec=audio_seconds / seconds, speedup=1.0)
+    for batch_size in args.batch_sizes:
+        batch_seconds = timed(infer, lambda: infer.infer_batch(crops, sr, batch_size=batch_size))
+        results[f"batch={batch_size}"] = dict(seconds=batch_seconds,
+                                              clips_per_sec=len(crops) / batch_seconds,
+                                              audio_sec_per_sec=audio_seconds / batch_seconds,
+                                              speedup=seconds / batch_seconds,
+                                              max_abs_diff=max_abs_diff(infer, crops[:args.parity_clips], batch_size))
+
+    write_report(dict(meta=dict(environment_info(infer),
+                                num_clips=len(crops),
+                                audio_seconds=audio_seconds,
+                                peak_rss_mb=peak_rss_mb()),
+                      results=results),
+                 args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Parity check and memory / speed benchmark of the chunked wav2vec conv feature encoder
+(feature_chunk_seconds, models/encoder/wav2vec.py chunked_extract_features).
+
+    python -m benchmarks.chunked_features --config-file configs/lam_audio2exp_config.py --options weight=${CHECKPOINT_PATH} \\
+        --seconds 60 300 900 --chunk-seconds 20 --output chunked_features.json
+
+For every --seconds, the conv feature encoder runs on the same random audio in one pass and
+in --chunk-seconds chunks. Reported: ``max_abs_diff`` and ``bit_exact`` of the features,
+seconds (best of --repeat), and peak memory: torch.cuda.max_memory_allocated on CUDA, on CPU
+the peak RSS of a fresh process while it runs one extraction (counted from the RSS after the
+model is built where /proc/self/clear_refs is available). Exits with 1 if a difference
+exceeds --tolerance.
+"""
+
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+import torch
+
+from benchmarks.common import (benchmark_argument_parser, build_infer, synchronize, reset_peak_rss,
+                               peak_rss_mb, environment_info, write_report)
+
+MODES = ("single_pass", "chunked")
+
+
+def extract(encoder, audio, mode, chunk_seconds, sample_rate):
+    encoder.set_feature_chunk(chunk_seconds if mode == "chunked" else None, sample_rate)
+    with torch.no_grad():
+        return encoder.extract_features(audio)
+
+
+def random_audio(infer, seconds):
+    generator = torch.Generator().manual_seed(0)
+    return (0.1 * torch.randn(1, int(seconds * infer.cfg.audio_sr), generator=generator)).to(infer.device)
+
+
+def probe_rss(args, mode, seconds):
+    """Peak RSS (MB) of a fresh process during one extraction."""
+    command = [sys.executable, "-m", "benchmarks.chunked_features", "--config-file", args.config_file,
+               "--probe", mode, "--seconds", str(seconds), "--chunk-seconds", str(args.chunk_seconds)]
+    if args.options:
+        command += ["--options"] + [f"{key}={value}" for key, value in args.options.items()]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])["peak_rss_mb"]
+
+
+def main():
+    parser = benchmark_argument_parser("chunked conv feature extraction")
+    parser.set_defaults(config_file="configs/lam_audio2exp_config.py")
+    parser.add_argument("--seconds", nargs="+", type=float, default=[60, 300, 900])
+    parser.add_argument("--chunk-seconds", type=float, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-5)
+    parser.add_argument("--skip-rss", action="store_true", help="do not start the CPU peak RSS probe processes")
+    parser.add_argument("--probe", choices=MODES, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    infer = build_infer(args)
+    encoder = infer.backbone.audio_encoder
+    sample_rate = infer.cfg.audio_sr
+    if args.probe is not None:
+        audio = random_audio(infer, args.seconds[0])
+        reset_peak_rss()
+        extract(encoder, audio, args.probe, args.chunk_seconds, sample_rate)
+        print(json.dumps(dict(peak_rss_mb=peak_rss_mb())))
+        return 0
+
+    results = {}
+    for seconds in args.seconds:
+        audio = random_audio(infer, seconds)
+        entry, outputs = {}, {}
+        for mode in MODES:
+            if infer.device.type == "cuda":
+                torch.cuda.reset_peak_memory_stats(infer.device)
+            best = float("inf")
+            for _ in range(args.repeat):
+                synchronize(infer.device)
+                start = time.perf_counter()
+                outputs[mode] = extract(encoder, audio, mode, args.chunk_seconds, sample_rate)
+                synchronize(infer.device)
+                best = min(best, time.perf_counter() - start)
+            entry[f"{mode}_seconds"] = best
+            if infer.device.type == "cuda":
+                entry[f"{mode}_peak_mb"] = torch.cuda.max_memory_allocated(infer.device) / 2 ** 20
+            elif not args.skip_rss:
+                entry[f"{mode}_peak_rss_mb"] = probe_rss(args, mode, seconds)
+        entry["max_abs_diff"] = float((outputs["single_pass"] - outputs["chunked"]).abs().max())
+        entry["bit_exact"] = bool(torch.equal(outputs["single_pass"], outputs["chunked"]))
+        results[f"seconds={seconds:g}"] = entry
+    encoder.set_feature_chunk(infer.cfg.get("feature_chunk_seconds", None), sample_rate)
+
+    failures = [key for key, entry in results.items() if entry["max_abs_diff"] > args.tolerance]
+    write_report(dict(meta=dict(environment_info(infer), chunk_seconds=args.chunk_seconds, tolerance=args.tolerance),
+                      results=results,
+                      failures=failures),
+                 args.output)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
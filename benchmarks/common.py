@@ -0,0 +1,169 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Shared helpers of the benchmark scripts.
+"""
+
+import os
+import sys
+import glob
+import json
+import platform
+import resource
+
+import librosa
+import numpy as np
+import torch
+
+from engines.defaults import default_argument_parser, default_config_parser, default_setup
+from engines.infer import INFER
+
+SAMPLE_AUDIO_DIR = "assets/sample_audio"
+
+
+def benchmark_argument_parser(description):
+    parser = default_argument_parser()
+    parser.description = description
+    parser.set_defaults(config_file="configs/lam_audio2exp_config_streaming.py")
+    parser.add_argument("--audio-dir", default=SAMPLE_AUDIO_DIR, help="directory of benchmark clips (*.wav)")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs before measuring")
+    parser.add_argument("--output", default=None, help="write the JSON report to this path")
+    return parser
+
+
+def build_infer(args, **overrides):
+    """Builds an Audio2ExpressionInfer without any file output side effects."""
+    cfg = default_config_parser(args.config_file, args.options)
+    for key, value in overrides.items():
+        cfg[key] = value
+    # after the overrides: default_setup also applies the process-wide compile settings
+    cfg = default_setup(cfg)
+    cfg.ex_vol = False
+    cfg.save_json_path = None
+    infer = INFER.build(dict(type=cfg.infer.type, cfg=cfg))
+    infer.model.eval()
+    return infer
+
+
+def load_sample_clips(audio_dir=SAMPLE_AUDIO_DIR, sr=16000):
+    """
+    Returns:
+        list[(name, waveform)]: every *.wav of ``audio_dir`` resampled to ``sr``, sorted by name
+    """
+    clips = []
+    for path in sorted(glob.glob(os.path.join(audio_dir, "*.wav"))):
+        speech_array, _ = librosa.load(path, sr=sr)
+        clips.append((os.path.splitext(os.path.basename(path))[0], speech_array))
+    if not clips:
+        raise FileNotFoundError(f"No *.wav clips found in {audio_dir}")
+    return clips
+
+
+def synchronize(device):
+    if torch.device(device).type == "cuda":
+        torch.cuda.synchronize()
+
+
+def latency_stats(latencies):
+    latencies = np.asarray(latencies, dtype=np.float64)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return dict(count=int(latencies.shape[0]),
+                mean=float(latencies.mean()),
+                p50=float(p50),
+                p95=float(p95),
+                p99=float(p99),
+                max=float(latencies.max()))
+
+
+def reset_peak_rss():
+    """Restart the peak RSS of this process from its current RSS (Linux only, a no-op elsewhere)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (since the last reset_peak_rss on Linux)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / 1024.0 / 1024.0 if sys.platform == "darwin" else peak / 1024.0
+
+
+def environment_info(infer):
+    info = dict(python=platform.python_version(),
+                torch=torch.__version__,
+                platform=platform.platform(),
+                device=str(infer.device),
+                config=infer.cfg.filename)
+    if infer.device.type == "cuda":
+        info["gpu"] = torch.cuda.get_device_name(infer.device)
+    return info
+
+
+def write_report(report, path=None):
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+# metric name -> True if larger is better
+COMPARED_METRICS = {
+    "rtf": False,
+    "latency_p50": False,
+    "latency_p95": False,
+    "latency_p99": False,
+    "frames_per_sec": True,
+    "peak_rss_mb": False,
+}
+
+
+def compare_to_baseline(results, baseline, tolerance=0.1):
+    """Flags metrics that got worse than ``baseline`` by more than ``tolerance`` (relative).
+
+    Args:
+        results: dict[case -> dict[metric -> value]] of the current run
+        baseline: the same structure loaded from a stored report
+        tolerance: allowed relative degradation, e.g. 0.1 for 10 %
+
+    Returns:
+        list[dict]: one entry per regression (case, metric, baseline, current, change)
+    """
+    regressions = []
+    for case, metrics in results.items():
+        if case not in baseline:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if metric not in metrics or metric not in baseline[case]:
+                continue
+            base, current = baseline[case][metric], metrics[metric]
+            if base == 0:
+                continue
+            change = (current - base) / abs(base)
+            worse = -change if higher_is_better else change
+            if worse > tolerance:
+                regressions.append(dict(case=case, metric=metric, baseline=base,
+                                        current=current, change=change))
+    return regressions
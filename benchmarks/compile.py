@@ -0,0 +1,195 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Startup and steady-state cost of compile_model=True (torch.compile with shape buckets,
+engines/infer.py forward_model) vs eager.
+
+    python -m benchmarks.compile --config-file configs/lam_audio2exp_config.py --options weight=${CHECKPOINT_PATH} \\
+        --seconds 2 4 8 --chunk-ms 500 --output compile.json
+
+startup: fresh processes timing the model build, the first streaming call and the first
+offline call per --seconds clip; eager, compiled on an empty compile cache directory
+('cold') and compiled again on that now-populated directory ('warm', i.e. a restart).
+steady_state (this process, after warm-up): streaming per-call latency p50/p95 over
+--stream-calls chunks of --chunk-ms (the model always sees the fixed streaming window) and
+offline seconds / RTF per --seconds clip (padded to its compile bucket), eager vs compiled,
+with the max_abs_diff of the raw model outputs. Exits with 1 if a difference exceeds
+--tolerance.
+"""
+
+import sys
+import json
+import math
+import time
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from benchmarks.common import (benchmark_argument_parser, build_infer, synchronize, latency_stats,
+                               environment_info, write_report)
+
+MODES = ("eager", "compiled")
+
+
+def random_audio(infer, seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    return (0.1 * rng.standard_normal(int(seconds * infer.cfg.audio_sr))).astype(np.float32)
+
+
+def model_inputs(infer, speech_array):
+    input_dict = infer.audio_inputs([speech_array], infer.cfg.audio_sr)
+    input_dict['id_idx'] = F.one_hot(torch.tensor([infer.cfg.id_idx]),
+                                     infer.cfg.model.backbone.num_identity_classes).to(infer.device)
+    return input_dict
+
+
+def raw_expressions(infer, input_dict, mode, bucketed=True):
+    with torch.no_grad():
+        if mode == "eager":
+            output_dict = infer.model(input_dict)
+        else:
+            output_dict = infer.forward_model(dict(input_dict), bucketed=bucketed)
+    return output_dict['pred_exp'][0].cpu().numpy()
+
+
+def stream_window(infer):
+    """Model input of one streaming call: the fixed audio window of _infer_streaming_audio."""
+    window = (0.1 * np.random.default_rng(0).standard_normal(infer.streaming_window_samples)).astype(np.float32)
+    input_dict = model_inputs(infer, window)
+    input_dict['time_steps'] = math.ceil(window.shape[0] / infer.cfg.audio_sr * infer.cfg.fps)
+    return input_dict
+
+
+def stream(infer, chunk, calls):
+    latencies, context = [], None
+    for _ in range(calls):
+        synchronize(infer.device)
+        start = time.perf_counter()
+        _, context = infer.infer_streaming_audio(chunk, infer.cfg.audio_sr, context)
+        synchronize(infer.device)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def timed(infer, function):
+    synchronize(infer.device)
+    start = time.perf_counter()
+    function()
+    synchronize(infer.device)
+    return time.perf_counter() - start
+
+
+def probe_startup(args, mode, cache_dir):
+    """Startup timings of a fresh process."""
+    command = [sys.executable, "-m", "benchmarks.compile",
+               "--config-file", args.config_file, "--probe", mode, "--cache-dir", cache_dir,
+               "--chunk-ms", str(args.chunk_ms), "--seconds"] + [str(seconds) for seconds in args.seconds]
+    if args.options:
+        command += ["--options"] + [f"{key}={value}" for key, value in args.options.items()]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def startup(args):
+    start = time.perf_counter()
+    infer = build_infer(args, compile_model=args.probe == "compiled", compile_cache_dir=args.cache_dir,
+                        compile_warmup=False)
+    result = dict(build_seconds=time.perf_counter() - start)
+    chunk = random_audio(infer, args.chunk_ms / 1000)
+    result["first_stream_call_seconds"] = timed(infer, lambda: infer.infer_streaming_audio(chunk, infer.cfg.audio_sr, None))
+    for seconds in args.seconds:
+        speech_array = random_audio(infer, seconds)
+        result[f"first_offline_call_seconds={seconds:g}"] = timed(
+            infer, lambda: infer.infer_audio_array(speech_array, infer.cfg.audio_sr))
+    return result
+
+
+def main():
+    parser = benchmark_argument_parser("torch.compile startup / steady state")
+    parser.set_defaults(config_file="configs/lam_audio2exp_config.py")
+    parser.add_argument("--seconds", nargs="+", type=float, default=[2, 4, 8])
+    parser.add_argument("--chunk-ms", type=float, default=500)
+    parser.add_argument("--stream-calls", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    parser.add_argument("--cache-dir", default=None, help="compile cache directory (default: a new empty temp dir)")
+    parser.add_argument("--skip-startup", action="store_true", help="do not start the startup probe processes")
+    parser.add_argument("--probe", choices=MODES, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe is not None:
+        print(json.dumps(startup(args)))
+        return 0
+
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="torch_compile_")
+    startup_results = {}
+    if not args.skip_startup:
+        startup_results["eager"] = probe_startup(args, "eager", cache_dir)
+        startup_results["compiled_cold"] = probe_startup(args, "compiled", cache_dir)
+        startup_results["compiled_warm"] = probe_startup(args, "compiled", cache_dir)
+
+    infer = build_infer(args, compile_model=True, compile_cache_dir=cache_dir, compile_warmup=False)
+    compiled_model = infer.compiled_model
+    window = stream_window(infer)
+    chunk = random_audio(infer, args.chunk_ms / 1000)
+    clips = {seconds: random_audio(infer, seconds) for seconds in args.seconds}
+
+    results = dict(streaming={})
+    outputs = {mode: raw_expressions(infer, window, mode, bucketed=False) for mode in MODES}
+    for mode in MODES:
+        infer.compiled_model = compiled_model if mode == "compiled" else None
+        for _ in range(args.warmup):
+            stream(infer, chunk, 2)
+        results["streaming"][f"{mode}_latency"] = latency_stats(stream(infer, chunk, args.stream_calls))
+    results["streaming"]["speedup_p50"] = (results["streaming"]["eager_latency"]["p50"]
+                                           / results["streaming"]["compiled_latency"]["p50"])
+    results["streaming"]["max_abs_diff"] = float(np.abs(outputs["eager"] - outputs["compiled"]).max())
+
+    for seconds, speech_array in clips.items():
+        input_dict = model_inputs(infer, speech_array)
+        outputs = {mode: raw_expressions(infer, input_dict, mode) for mode in MODES}
+        bucket = next((b for b in infer.compile_buckets if b >= speech_array.shape[0]), None)
+        entry = dict(bucket_seconds=None if bucket is None else bucket / infer.cfg.audio_sr)
+        for mode in MODES:
+            infer.compiled_model = compiled_model if mode == "compiled" else None
+            for _ in range(args.warmup):
+                infer.infer_audio_array(speech_array, infer.cfg.audio_sr)
+            best = min(timed(infer, lambda: infer.infer_audio_array(speech_array, infer.cfg.audio_sr))
+                       for _ in range(args.repeat))
+            entry[f"{mode}_seconds"] = best
+            entry[f"{mode}_rtf"] = best / seconds
+        entry["speedup"] = entry["eager_seconds"] / entry["compiled_seconds"]
+        entry["max_abs_diff"] = float(np.abs(outputs["eager"] - outputs["compiled"]).max())
+        results[f"offline_seconds={seconds:g}"] = entry
+    infer.compiled_model = compiled_model
+
+    failures = [key for key, entry in results.items() if entry["max_abs_diff"] > args.tolerance]
+    write_report(dict(meta=dict(environment_info(infer), cache_dir=cache_dir, chunk_ms=args.chunk_ms,
+                                compile_mode=infer.cfg.get("compile_mode", "default"),
+                                compile_buckets_seconds=infer.cfg.get("compile_buckets_seconds", None),
+                                tolerance=args.tolerance),
+                      startup=startup_results,
+                      steady_state=results,
+                      failures=failures),
+                 args.output)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
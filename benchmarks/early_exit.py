@@ -0,0 +1,115 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+RTF vs blendshape error sweep over early-exit depths (encoder_layers, set_encoder_layers).
+
+    python -m benchmarks.early_exit --config-file configs/lam_audio2exp_config.py --options weight=${CHECKPOINT_PATH} \\
+        encoder_layer_heads.6=pretrained_models/lam_audio2exp_k6.tar --layers 2 4 6 8 10 12 --output early_exit.json
+
+For every K of --layers, every clip of --audio-dir runs through infer_audio_array (best of
+--repeat). Reported per K: seconds, real-time factor and speedup over the full 12 layers, and
+the error of the raw model outputs (no post-processing) against the full-depth model: mean /
+p95 / max absolute difference and mean per-channel Pearson correlation over frames. ``head``
+tells whether a fine-tuned decoder head was loaded for that depth.
+"""
+
+import sys
+import math
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from benchmarks.common import (benchmark_argument_parser, build_infer, load_sample_clips, synchronize,
+                               environment_info, write_report)
+
+
+def raw_expressions(infer, speech_array):
+    input_dict = dict(input_audio_array=torch.from_numpy(speech_array)[None].to(infer.device),
+                      time_steps=math.ceil(speech_array.shape[0] / infer.cfg.audio_sr * infer.cfg.fps),
+                      id_idx=F.one_hot(torch.tensor([infer.cfg.id_idx]),
+                                       infer.cfg.model.backbone.num_identity_classes).to(infer.device))
+    with torch.no_grad():
+        return infer.backbone(input_dict)[0].cpu().numpy()
+
+
+def channel_correlation(a, b):
+    a, b = a - a.mean(0), b - b.mean(0)
+    denominator = np.sqrt((a ** 2).sum(0) * (b ** 2).sum(0))
+    valid = denominator > 1e-12
+    return float(((a * b).sum(0)[valid] / denominator[valid]).mean()) if valid.any() else float("nan")
+
+
+def timed_sweep(infer, clips, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        synchronize(infer.device)
+        start = time.perf_counter()
+        for _, speech_array in clips:
+            infer.infer_audio_array(speech_array, infer.cfg.audio_sr)
+        synchronize(infer.device)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = benchmark_argument_parser("early-exit depth sweep")
+    parser.set_defaults(config_file="configs/lam_audio2exp_config.py")
+    parser.add_argument("--layers", nargs="+", type=int, default=list(range(1, 13)))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    infer = build_infer(args)
+    sr = infer.cfg.audio_sr
+    clips = load_sample_clips(args.audio_dir, sr)
+    audio_seconds = sum(clip.shape[0] for _, clip in clips) / sr
+    heads = {int(k) for k in (infer.cfg.get("encoder_layer_heads", None) or {})}
+
+    infer.set_encoder_layers(None)
+    reference = [raw_expressions(infer, clip) for _, clip in clips]
+    for _ in range(args.warmup):
+        infer.infer_audio_array(clips[0][1], sr)
+    full_seconds = timed_sweep(infer, clips, args.repeat)
+
+    results = {}
+    for num_layers in args.layers:
+        infer.set_encoder_layers(num_layers)
+        seconds = timed_sweep(infer, clips, args.repeat)
+        diffs, correlations = [], []
+        for (_, clip), full in zip(clips, reference):
+            expressions = raw_expressions(infer, clip)
+            diffs.append(np.abs(expressions - full).ravel())
+            correlations.append(channel_correlation(expressions, full))
+        diffs = np.concatenate(diffs)
+        results[f"layers={num_layers}"] = dict(seconds=seconds,
+                                               rtf=seconds / audio_seconds,
+                                               speedup=full_seconds / seconds,
+                                               head=num_layers in heads,
+                                               mean_abs_diff=float(diffs.mean()),
+                                               p95_abs_diff=float(np.percentile(diffs, 95)),
+                                               max_abs_diff=float(diffs.max()),
+                                               channel_correlation=float(np.mean(correlations)))
+    infer.set_encoder_layers(None)
+
+    write_report(dict(meta=dict(environment_info(infer), audio_seconds=audio_seconds,
+                                full_seconds=full_seconds, full_rtf=full_seconds / audio_seconds),
+                      results=results),
+                 args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
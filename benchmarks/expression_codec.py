@@ -0,0 +1,102 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Bandwidth benchmark of the expression stream codec (utils/expression_codec.py) on the
+jsontests/ fixtures.
+
+    python -m benchmarks.expression_codec --chunk-frames 5 15 30 --bits 8 16 --thresholds 0 1 --output codec.json
+
+Every fixture is cut into messages of --chunk-frames frames (a streaming reply of the server)
+and sent through one ExpressionEncoder / ExpressionDecoder pair. Reported per fixture and
+setting: ``bytes`` on the wire (headers included), ``ratio`` to raw float32 frames
+(``output=binary``), ``encode_us`` / ``decode_us`` per message and ``max_error``. The ``all``
+entries sum bytes over all fixtures and take the max of the errors.
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+import numpy as np
+
+from utils.expression_codec import ExpressionEncoder, ExpressionDecoder
+from pdxutils import blendshape_formats as formats
+from benchmarks.common import write_report
+
+
+def run(weights, chunk_frames, **codec):
+    encoder = ExpressionEncoder(num_channels=weights.shape[1], **codec)
+    decoder = ExpressionDecoder()
+    messages, decoded = [], []
+    start = time.perf_counter()
+    for i in range(0, weights.shape[0], chunk_frames):
+        messages.append(encoder.encode(weights[i:i + chunk_frames]))
+    encode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for message in messages:
+        decoded.append(decoder.decode(message)[2])
+    decode_s = time.perf_counter() - start
+    decoded = np.concatenate(decoded)
+    return dict(bytes=sum(len(m) for m in messages),
+                raw_bytes=weights.size * 4,
+                messages=len(messages),
+                encode_us=encode_s / len(messages) * 1e6,
+                decode_us=decode_s / len(messages) * 1e6,
+                max_error=float(np.abs(decoded.astype(np.float64) - weights).max()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="expression stream codec benchmark")
+    parser.add_argument("--json-dir", default="jsontests")
+    parser.add_argument("--chunk-frames", type=int, nargs="+", default=[5, 15, 30])
+    parser.add_argument("--bits", type=int, nargs="+", default=[8, 16])
+    parser.add_argument("--thresholds", type=int, nargs="+", default=[0, 1])
+    parser.add_argument("--keyframe-interval", type=int, default=60)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    clips = []
+    for path in sorted(glob.glob(os.path.join(args.json_dir, "*.json"))):
+        layout, names, weights, fps = formats.load_animation(formats.load(path))
+        clips.append((os.path.splitext(os.path.basename(path))[0],
+                      np.clip(formats.to_arkit(names, weights), 0.0, 1.0).astype(np.float32)))
+
+    results = {}
+    for chunk_frames in args.chunk_frames:
+        for bits in args.bits:
+            for threshold in args.thresholds:
+                setting = f"chunk={chunk_frames}/bits={bits}/threshold={threshold}"
+                total = dict(bytes=0, raw_bytes=0, max_error=0.0)
+                for name, weights in clips:
+                    entry = run(weights, chunk_frames, bits=bits, threshold=threshold,
+                                keyframe_interval=args.keyframe_interval)
+                    entry["ratio"] = entry["bytes"] / entry["raw_bytes"]
+                    results[f"{name}/{setting}"] = entry
+                    total["bytes"] += entry["bytes"]
+                    total["raw_bytes"] += entry["raw_bytes"]
+                    total["max_error"] = max(total["max_error"], entry["max_error"])
+                results[f"all/{setting}"] = dict(total, ratio=total["bytes"] / total["raw_bytes"])
+
+    write_report(dict(meta=dict(fixtures=[name for name, _ in clips],
+                                keyframe_interval=args.keyframe_interval),
+                      results=results),
+                 args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
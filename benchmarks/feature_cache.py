@@ -0,0 +1,85 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Style A/B sweep with and without the encoder feature cache (models/feature_cache.py).
+
+    python -m benchmarks.feature_cache --config-file configs/lam_audio2exp_config.py --options weight=${CHECKPOINT_PATH} \\
+        --id-idx 0 1 2 3 --cache-dir /tmp/a2e_feature_cache --output feature_cache.json
+
+Every clip of --audio-dir is rendered once per --id-idx through infer_audio_array, without a
+cache and with each cache level (starting from an empty --cache-dir). Reported: total seconds,
+speedup, cache hits / misses, on-disk size and the max difference to the uncached outputs
+(np.random is reseeded per call so the random eye blinks match).
+"""
+
+import os
+import sys
+import time
+import shutil
+
+import numpy as np
+
+from models.feature_cache import FEATURE_CACHE_LEVELS
+from benchmarks.common import (benchmark_argument_parser, build_infer, load_sample_clips, synchronize,
+                               environment_info, write_report)
+
+
+def sweep(infer, clips, id_indices):
+    outputs = []
+    synchronize(infer.device)
+    start = time.perf_counter()
+    for _, speech_array in clips:
+        for id_idx in id_indices:
+            np.random.seed(0)
+            outputs.append(infer.infer_audio_array(speech_array, infer.cfg.audio_sr, id_idx))
+    synchronize(infer.device)
+    return outputs, time.perf_counter() - start
+
+
+def directory_mb(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names) / 1024.0 / 1024.0
+
+
+def main():
+    parser = benchmark_argument_parser("encoder feature cache benchmark")
+    parser.add_argument("--id-idx", nargs="+", type=int, default=[0, 1, 2, 3])
+    parser.add_argument("--cache-dir", default="/tmp/a2e_feature_cache")
+    args = parser.parse_args()
+
+    clips = load_sample_clips(args.audio_dir)
+    infer = build_infer(args, feature_cache_dir=None)
+    reference, seconds = sweep(infer, clips, args.id_idx)
+    results = dict(uncached=dict(seconds=seconds, speedup=1.0))
+
+    for level in FEATURE_CACHE_LEVELS:
+        shutil.rmtree(args.cache_dir, ignore_errors=True)
+        infer = build_infer(args, feature_cache_dir=args.cache_dir, feature_cache_level=level)
+        outputs, level_seconds = sweep(infer, clips, args.id_idx)
+        results[level] = dict(seconds=level_seconds,
+                              speedup=seconds / level_seconds,
+                              hits=infer.feature_cache.hits,
+                              misses=infer.feature_cache.misses,
+                              cache_mb=directory_mb(args.cache_dir),
+                              max_abs_diff=max(float(np.abs(a - b).max()) for a, b in zip(outputs, reference)))
+
+    write_report(dict(meta=dict(environment_info(infer), clips=[name for name, _ in clips], id_idx=args.id_idx),
+                      results=results),
+                 args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Output-format conversion benchmark on the jsontests/ fixtures.
+
+    python -m benchmarks.formats --output formats.json
+
+Every fixture is loaded into its (N, 52) matrix, then each target layout is built with the
+former per-frame conversion loops (``legacy``) and with pdxutils.blendshape_formats, and
+serialized with json.dumps and blendshape_formats.dumps (orjson when installed). Reported per
+fixture and layout: build / dump times in ms (best of --repeat), output size and whether the
+two builds agree.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+import numpy as np
+
+from models.utils import ARKitBlendShape
+from pdxutils import blendshape_formats as formats
+from benchmarks.common import write_report
+
+
+def legacy_expected(weights, fps, decimals=None, time_decimals=None):
+    """Per-frame conversion as done by the former generate_blendshapes / convert_to_correct_format."""
+    names = formats.EXPECTED_BLENDSHAPE_NAMES
+    arkit_to_expected = {}
+    for i, arkit_name in enumerate(ARKitBlendShape):
+        if arkit_name in names:
+            arkit_to_expected[i] = names.index(arkit_name)
+    result = []
+    for frame_idx in range(weights.shape[0]):
+        blendshapes = {name: 0.0 for name in names}
+        for arkit_idx, expected_idx in arkit_to_expected.items():
+            value = float(weights[frame_idx, arkit_idx])
+            blendshapes[names[expected_idx]] = round(value, decimals) if decimals is not None else value
+        frame_time = frame_idx / fps
+        result.append({"time": round(frame_time, time_decimals) if time_decimals is not None else frame_time,
+                       "blendshapes": blendshapes})
+    return result
+
+
+def legacy_values(weights):
+    values = []
+    for frame in weights:
+        values.append([float(v) for v in frame])
+    return {"names": list(ARKitBlendShape), "values": values}
+
+
+LAYOUTS = {
+    "values": (lambda w, fps: legacy_values(w),
+               lambda w, fps: formats.to_values(w)),
+    "expected": (lambda w, fps: legacy_expected(w, fps),
+                 lambda w, fps: formats.to_expected(w, fps)),
+    "expected_rounded": (lambda w, fps: legacy_expected(w, fps, decimals=2, time_decimals=4),
+                         lambda w, fps: formats.to_expected(w, fps, decimals=2, time_decimals=4)),
+}
+
+
+def best_of(fn, repeat):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return out, best * 1000.0
+
+
+def max_difference(a, b):
+    """Largest absolute numeric difference between two JSON-like structures (inf if shapes differ)."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        if a.keys() != b.keys():
+            return float("inf")
+        return max([max_difference(a[k], b[k]) for k in a] or [0.0])
+    if isinstance(a, list) and isinstance(b, list):
+        if len(a) != len(b):
+            return float("inf")
+        return max([max_difference(x, y) for x, y in zip(a, b)] or [0.0])
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b)
+    return 0.0 if a == b else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="blendshape output format conversion benchmark")
+    parser.add_argument("--json-dir", default="jsontests")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = {}
+    for path in sorted(glob.glob(os.path.join(args.json_dir, "*.json"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path, "rb") as f:
+            raw = f.read()
+
+        _, json_load_ms = best_of(lambda: json.loads(raw), args.repeat)
+        data, fast_load_ms = best_of(lambda: formats.loads(raw), args.repeat)
+        layout, names, weights, fps = formats.load_animation(data)
+        weights = formats.to_arkit(names, weights)
+        fps = fps or 30.0
+        results[f"{name}/load"] = dict(json_ms=json_load_ms, fast_ms=fast_load_ms, frames=int(weights.shape[0]))
+
+        for target, (legacy_fn, fast_fn) in LAYOUTS.items():
+            legacy_out, legacy_ms = best_of(lambda: legacy_fn(weights, fps), args.repeat)
+            fast_out, fast_ms = best_of(lambda: fast_fn(weights, fps), args.repeat)
+            legacy_text, json_dump_ms = best_of(lambda: json.dumps(legacy_out, indent=2).encode(), args.repeat)
+            fast_text, fast_dump_ms = best_of(lambda: formats.dumps(fast_out, indent=2), args.repeat)
+            results[f"{name}/{target}"] = dict(legacy_build_ms=legacy_ms,
+                                               fast_build_ms=fast_ms,
+                                               json_dump_ms=json_dump_ms,
+                                               fast_dump_ms=fast_dump_ms,
+                                               speedup=(legacy_ms + json_dump_ms) / (fast_ms + fast_dump_ms),
+                                               legacy_bytes=len(legacy_text),
+                                               fast_bytes=len(fast_text),
+                                               max_abs_diff=max_difference(legacy_out, fast_out))
+
+    write_report(dict(meta=dict(encoder="orjson" if formats.orjson is not None else "json",
+                                repeat=args.repeat),
+                      results=results),
+                 args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
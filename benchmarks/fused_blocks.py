@@ -0,0 +1,108 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Parity check and micro-benchmark of the channels-last FusedConvNormRelu blocks.
+
+    python -m benchmarks.fused_blocks --config-file configs/lam_audio2exp_config.py --options weight=${CHECKPOINT_PATH} \\
+        --frames 64 9000 --output fused.json
+
+For every ConvNormRelu of the identity encoder and the decoder, and for the whole
+Audio2Expression.decode, the eval-mode training block and the fused block get the same input
+of --frames frames. Reported: ``max_abs_diff``, ``reference_ms`` / ``fused_ms`` (best of
+--repeat) and ``speedup``. Exits with 1 if a difference exceeds --tolerance.
+"""
+
+import sys
+import time
+
+import torch
+import torch.nn.functional as F
+
+from models.network import FusedConvNormRelu
+from benchmarks.common import benchmark_argument_parser, build_infer, synchronize, environment_info, write_report
+
+
+def best_ms(device, fn, repeat):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        synchronize(device)
+        start = time.perf_counter()
+        out = fn()
+        synchronize(device)
+        best = min(best, time.perf_counter() - start)
+    return out, best * 1000.0
+
+
+def compare(device, reference_fn, fused_fn, repeat):
+    with torch.no_grad():
+        reference_fn()
+        fused_fn()
+        reference, reference_ms = best_ms(device, reference_fn, repeat)
+        fused, fused_ms = best_ms(device, fused_fn, repeat)
+    return dict(max_abs_diff=float((reference - fused).abs().max()),
+                reference_ms=reference_ms,
+                fused_ms=fused_ms,
+                speedup=reference_ms / fused_ms)
+
+
+def main():
+    parser = benchmark_argument_parser("fused ConvNormRelu parity and micro-benchmark")
+    parser.add_argument("--frames", nargs="+", type=int, default=[64, 9000])
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    infer = build_infer(args, fused_inference=False)
+    backbone = infer.backbone.eval()
+    device = infer.device
+    blocks = {f"identity_encoder.first_net.{i}": block
+              for i, block in enumerate(backbone.identity_encoder.first_net.conv_layers)}
+    blocks.update({f"decoder.{i}": block for i, block in enumerate(backbone.decoder[0])})
+
+    results = {}
+    for num_frames in args.frames:
+        for name, block in blocks.items():
+            fused = FusedConvNormRelu.from_module(block).to(device)
+            x = torch.randn(args.batch_size, block.conv.in_channels, num_frames, device=device)
+            x_last = x.transpose(1, 2).contiguous()
+            results[f"T={num_frames}/{name}"] = compare(device,
+                                                        lambda: block(x).transpose(1, 2),
+                                                        lambda: fused(x_last),
+                                                        args.repeat)
+
+        hidden_states = torch.randn(args.batch_size, num_frames, backbone.feature_projection.in_features, device=device)
+        identity = F.one_hot(torch.tensor([infer.cfg.id_idx] * args.batch_size),
+                             infer.cfg.model.backbone.num_identity_classes).to(device)
+
+        backbone.fuse_inference_blocks()
+        fused_stacks = (backbone.fused_identity_net, backbone.fused_decoder)
+
+        def decode(fused):
+            backbone.fused_identity_net, backbone.fused_decoder = fused_stacks if fused else (None, None)
+            return backbone.decode(hidden_states, identity)
+
+        results[f"T={num_frames}/decode"] = compare(device, lambda: decode(False), lambda: decode(True), args.repeat)
+
+    failures = [key for key, entry in results.items() if entry["max_abs_diff"] > args.tolerance]
+    write_report(dict(meta=dict(environment_info(infer), batch_size=args.batch_size, tolerance=args.tolerance),
+                      results=results,
+                      failures=failures),
+                 args.output)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
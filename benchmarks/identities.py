@@ -0,0 +1,95 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Multi-identity fan-out (Audio2ExpressionInfer.infer_identities) against one full
+infer_audio_array run per identity.
+
+    python -m benchmarks.identities --config-file configs/lam_audio2exp_config.py --options weight=${CHECKPOINT_PATH} \\
+        --num-identities 1 4 16 --output identities.json
+
+For every clip of --audio-dir and every identity count N (identities 0..N-1), reported: seconds
+of the N full runs, seconds of the fan-out, speedup, and ``max_abs_diff`` between the raw model
+outputs of both paths (post-processing is left out since its eye blinks are random).
+"""
+
+import sys
+import math
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from benchmarks.common import (benchmark_argument_parser, build_infer, load_sample_clips, synchronize,
+                               environment_info, write_report)
+
+
+def timed(infer, fn):
+    synchronize(infer.device)
+    start = time.perf_counter()
+    fn()
+    synchronize(infer.device)
+    return time.perf_counter() - start
+
+
+def raw_max_abs_diff(infer, speech_array, id_indices):
+    backbone = infer.backbone
+    num_classes = infer.cfg.model.backbone.num_identity_classes
+    audio = torch.from_numpy(speech_array).to(infer.device)[None]
+    time_steps = math.ceil(speech_array.shape[0] / infer.cfg.audio_sr * infer.cfg.fps)
+    with torch.no_grad():
+        hidden_states, _ = backbone.encode(dict(input_audio_array=audio, time_steps=time_steps))
+        fan_out = backbone.decode(hidden_states.expand(len(id_indices), -1, -1),
+                                  F.one_hot(torch.tensor(id_indices), num_classes).to(infer.device))
+        diff = 0.0
+        for row, id_idx in enumerate(id_indices):
+            full = backbone(dict(input_audio_array=audio, time_steps=time_steps,
+                                 id_idx=F.one_hot(torch.tensor([id_idx]), num_classes).to(infer.device)))
+            diff = max(diff, float((full[0] - fan_out[row]).abs().max()))
+    return diff
+
+
+def main():
+    parser = benchmark_argument_parser("multi-identity fan-out benchmark")
+    parser.add_argument("--num-identities", nargs="+", type=int, default=[1, 4, 16])
+    args = parser.parse_args()
+
+    infer = build_infer(args)
+    sr = infer.cfg.audio_sr
+    clips = load_sample_clips(args.audio_dir, sr)
+    for _ in range(args.warmup):
+        infer.infer_audio_array(clips[0][1], sr, 0)
+        infer.infer_identities(clips[0][1], sr, [0, 1])
+
+    results = {}
+    for name, speech_array in clips:
+        for num_identities in args.num_identities:
+            id_indices = list(range(num_identities))
+            full_seconds = timed(infer, lambda: [infer.infer_audio_array(speech_array, sr, i) for i in id_indices])
+            fan_out_seconds = timed(infer, lambda: infer.infer_identities(speech_array, sr, id_indices))
+            results[f"{name}/identities={num_identities}"] = dict(
+                full_seconds=full_seconds,
+                fan_out_seconds=fan_out_seconds,
+                speedup=full_seconds / fan_out_seconds,
+                max_abs_diff=raw_max_abs_diff(infer, speech_array, id_indices))
+
+    write_report(dict(meta=dict(environment_info(infer), audio_seconds={name: a.shape[0] / sr for name, a in clips}),
+                      results=results),
+                 args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
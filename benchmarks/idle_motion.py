@@ -0,0 +1,215 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Cost and determinism of the procedural blinks / brow raises (models/utils.py IdleMotionGenerator)
+vs the previous global-np.random post-processing.
+
+    python -m benchmarks.idle_motion --minutes 1 10 60 --chunk-frames 15 --output idle_motion.json
+
+streaming: per-chunk seconds of the streaming blink stage over a stream of --minutes at 30 fps
+(chunks of --chunk-frames after a 64-frame history, as _infer_streaming_audio does), legacy
+(last blink searched in the history every chunk) vs the generator; p50 / p95 are taken over the
+last 1000 chunks. offline: seconds of the brow stage on a whole clip of synthetic speech
+volume, legacy (one label mask per voiced region) vs vectorized run lengths. checks:
+same seed gives identical output, chunked stamping equals stamping the whole stream, blinks
+per minute (generator and legacy streaming). Exits with 1 if a check fails.
+"""
+
+import sys
+import time
+import argparse
+
+import numpy as np
+from scipy.ndimage import label
+
+from benchmarks.common import write_report
+from models.utils import IdleMotionGenerator, BLINK_PATTERNS, BROW1, BROW2, apply_random_brow_movement
+
+FPS = 30
+HISTORY_FRAMES = 64
+
+
+def legacy_eye_blinks_context(animation_params, processed_frames=0, intensity_range=(0.8, 1.0)):
+    """apply_random_eye_blinks_context before IdleMotionGenerator."""
+    remaining_frames = animation_params.shape[0] - processed_frames
+    if remaining_frames <= 7:
+        return animation_params
+    min_blink_interval, max_blink_interval = 40, 100
+    previous_blink_indices = np.where(animation_params[:processed_frames, 8] > 0.5)[0]
+    last_processed_blink = previous_blink_indices[-1] - 7 if previous_blink_indices.size > 0 else processed_frames
+    first_blink_start = max(0, np.random.randint(min_blink_interval, max_blink_interval) - last_processed_blink)
+    if first_blink_start <= (remaining_frames - 7):
+        blink_start = processed_frames + first_blink_start
+        values = BLINK_PATTERNS[np.random.randint(0, 4)] * np.random.uniform(*intensity_range)
+        animation_params[blink_start:blink_start + 7, 8] = values
+        animation_params[blink_start:blink_start + 7, 9] = values
+    return animation_params
+
+
+def legacy_brow_movement(input_exp, volume):
+    """apply_random_brow_movement before IdleMotionGenerator."""
+    FRAME_SEGMENT = 150
+    HOLD_THRESHOLD = 10
+    VOLUME_THRESHOLD = 0.08
+    MIN_REGION_LENGTH = 6
+    STRENGTH_RANGE = (0.7, 1.3)
+
+    BROW_PEAKS = {
+        0: np.argmax(BROW1[:, 2]),
+        1: np.argmax(BROW2[:, 2])
+    }
+
+    for seg_start in range(0, len(volume), FRAME_SEGMENT):
+        seg_end = min(seg_start + FRAME_SEGMENT, len(volume))
+        seg_volume = volume[seg_start:seg_end]
+
+        candidate_regions = []
+
+        high_vol_mask = seg_volume > VOLUME_THRESHOLD
+        labeled_array, num_features = label(high_vol_mask)
+
+        for i in range(1, num_features + 1):
+            region = (labeled_array == i)
+            region_indices = np.where(region)[0]
+            if len(region_indices) >= MIN_REGION_LENGTH:
+                candidate_regions.append(region_indices)
+
+        if candidate_regions:
+            selected_region = candidate_regions[np.random.choice(len(candidate_regions))]
+            region_start = selected_region[0]
+            region_end = selected_region[-1]
+            region_length = region_end - region_start + 1
+
+            brow_idx = np.random.randint(0, 2)
+            base_brow = BROW1 if brow_idx == 0 else BROW2
+            peak_idx = BROW_PEAKS[brow_idx]
+
+            if region_length > HOLD_THRESHOLD:
+                local_max_pos = seg_volume[selected_region].argmax()
+                global_peak_frame = seg_start + selected_region[local_max_pos]
+
+                rise_anim = base_brow[:peak_idx + 1]
+                hold_frame = base_brow[peak_idx:peak_idx + 1]
+
+                insert_start = max(global_peak_frame - peak_idx, seg_start)
+                insert_end = min(global_peak_frame + (region_length - local_max_pos), seg_end)
+
+                strength = np.random.uniform(*STRENGTH_RANGE)
+
+                if insert_start + len(rise_anim) <= seg_end:
+                    input_exp[insert_start:insert_start + len(rise_anim), :5] += rise_anim * strength
+                    hold_duration = insert_end - (insert_start + len(rise_anim))
+                    if hold_duration > 0:
+                        input_exp[insert_start + len(rise_anim):insert_end, :5] += np.tile(hold_frame * strength,
+                                                                                           (hold_duration, 1))
+            else:
+                anim_length = base_brow.shape[0]
+                insert_pos = seg_start + region_start + (region_length - anim_length) // 2
+                insert_pos = max(seg_start, min(insert_pos, seg_end - anim_length))
+
+                if insert_pos + anim_length <= seg_end:
+                    strength = np.random.uniform(*STRENGTH_RANGE)
+                    input_exp[insert_pos:insert_pos + anim_length, :5] += base_brow * strength
+
+    return np.clip(input_exp, 0, 1)
+
+
+def speech_volume(num_frames, seed=0):
+    """RMS-like volume: voiced runs of 0.2-2 s separated by 0.1-1 s pauses."""
+    rng = np.random.default_rng(seed)
+    volume = np.zeros(num_frames)
+    frame = 0
+    while frame < num_frames:
+        voiced = rng.integers(6, 60)
+        volume[frame:frame + voiced] = rng.uniform(0.1, 0.3, size=min(voiced, num_frames - frame))
+        frame += voiced + rng.integers(3, 30)
+    return volume
+
+
+def blink_rate(expression, minutes):
+    return float((np.diff((expression[:, 8] > 0.5).astype(np.int8)) == 1).sum() / minutes)
+
+
+def generator_blinks(generator):
+    def stamp(window, processed_frames, frame_offset):
+        generator.stamp_blinks(window[processed_frames:], frame_offset)
+        return window
+    return stamp
+
+
+def stream_blinks(num_frames, chunk_frames, stamp):
+    """Runs ``stamp(window, processed_frames, frame_offset)`` like the streaming post-processing."""
+    history = np.zeros((0, 52))
+    latencies, output = [], []
+    for frame_offset in range(0, num_frames, chunk_frames):
+        chunk = np.zeros((min(chunk_frames, num_frames - frame_offset), 52))
+        window = np.concatenate([history, chunk])
+        start = time.perf_counter()
+        window = stamp(window, history.shape[0], frame_offset)
+        latencies.append(time.perf_counter() - start)
+        output.append(window[history.shape[0]:])
+        history = window[-HISTORY_FRAMES:]
+    return latencies, np.concatenate(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="idle motion (blinks / brows) cost and determinism")
+    parser.add_argument("--minutes", nargs="+", type=float, default=[1, 10, 60])
+    parser.add_argument("--chunk-frames", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results, failures = {}, []
+    for minutes in args.minutes:
+        num_frames = int(minutes * 60 * FPS)
+        entry = {}
+
+        legacy_latencies, legacy_streamed = stream_blinks(num_frames, args.chunk_frames,
+                                            lambda window, processed, offset: legacy_eye_blinks_context(window, processed))
+        latencies, streamed = stream_blinks(num_frames, args.chunk_frames, generator_blinks(IdleMotionGenerator(args.seed)))
+        for name, values in (("legacy", legacy_latencies), ("generator", latencies)):
+            tail = np.asarray(values[-1000:])
+            entry[f"stream_{name}_chunk_p50"] = float(np.percentile(tail, 50))
+            entry[f"stream_{name}_chunk_p95"] = float(np.percentile(tail, 95))
+        whole = IdleMotionGenerator(args.seed).stamp_blinks(np.zeros((num_frames, 52)))
+        entry["chunked_equals_whole"] = bool(np.array_equal(streamed, whole))
+        entry["blinks_per_minute"] = blink_rate(whole, minutes)
+        entry["legacy_stream_blinks_per_minute"] = blink_rate(legacy_streamed, minutes)
+
+        volume = speech_volume(num_frames, args.seed)
+        start = time.perf_counter()
+        legacy_brow_movement(np.zeros((num_frames, 52)), volume)
+        entry["offline_brow_legacy_seconds"] = time.perf_counter() - start
+        start = time.perf_counter()
+        brows = apply_random_brow_movement(np.zeros((num_frames, 52)), volume, IdleMotionGenerator(args.seed))
+        entry["offline_brow_generator_seconds"] = time.perf_counter() - start
+        entry["offline_brow_speedup"] = entry["offline_brow_legacy_seconds"] / entry["offline_brow_generator_seconds"]
+        again = apply_random_brow_movement(np.zeros((num_frames, 52)), volume, IdleMotionGenerator(args.seed))
+        entry["seeded_deterministic"] = bool(np.array_equal(brows, again))
+
+        if not (entry["chunked_equals_whole"] and entry["seeded_deterministic"]):
+            failures.append(f"minutes={minutes:g}")
+        results[f"minutes={minutes:g}"] = entry
+
+    write_report(dict(meta=dict(fps=FPS, chunk_frames=args.chunk_frames, history_frames=HISTORY_FRAMES, seed=args.seed),
+                      results=results,
+                      failures=failures),
+                 args.output)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
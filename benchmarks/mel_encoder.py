@@ -0,0 +1,140 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Quality / latency comparison of a distilled mel_conv student (models/encoder/mel.py) against
+its wav2vec teacher.
+
+    python -m benchmarks.mel_encoder --config-file configs/lam_audio2exp_config_mel_distill.py \\
+        --options weight=${STUDENT_CHECKPOINT_PATH} device=cpu \\
+        --teacher-options weight=${CHECKPOINT_PATH} device=cpu --threads 1 4 --output mel_encoder.json
+
+Reported per model and --threads: audio encoder parameters, encoder-only and end-to-end
+(infer_audio_array) seconds and real-time factor summed over the clips of --audio-dir (best of
+--repeat). Quality, on the raw model outputs (no post-processing): mean / max absolute
+difference to the teacher, mean per-channel Pearson correlation over frames and the cosine
+similarity of the encoder outputs the student is distilled on.
+"""
+
+import sys
+import copy
+import time
+import math
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from utils.config import DictAction
+from benchmarks.common import (benchmark_argument_parser, build_infer, load_sample_clips, synchronize,
+                               environment_info, write_report)
+
+
+def best_seconds(device, fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        synchronize(device)
+        start = time.perf_counter()
+        fn()
+        synchronize(device)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def raw_outputs(infer, speech_array):
+    """(encoder output [T, D], expressions [T, 52]) without post-processing."""
+    backbone = infer.backbone
+    input_dict = dict(input_audio_array=torch.from_numpy(speech_array)[None].to(infer.device),
+                      time_steps=math.ceil(speech_array.shape[0] / infer.cfg.audio_sr * infer.cfg.fps))
+    identity = F.one_hot(torch.tensor([infer.cfg.id_idx]),
+                         infer.cfg.model.backbone.num_identity_classes).to(infer.device)
+    with torch.no_grad():
+        hidden_states, _ = backbone.encode(input_dict)
+        expressions = backbone.decode(hidden_states, identity)
+    return hidden_states[0].cpu().numpy(), expressions[0].cpu().numpy()
+
+
+def channel_correlation(a, b):
+    a, b = a - a.mean(0), b - b.mean(0)
+    denominator = np.sqrt((a ** 2).sum(0) * (b ** 2).sum(0))
+    valid = denominator > 1e-12
+    return float(((a * b).sum(0)[valid] / denominator[valid]).mean()) if valid.any() else float("nan")
+
+
+def timings(infer, clips, threads, repeat):
+    sr = infer.cfg.audio_sr
+    audio_seconds = sum(clip.shape[0] for _, clip in clips) / sr
+    encoder = lambda clip: infer.backbone.encode(dict(
+        input_audio_array=torch.from_numpy(clip)[None].to(infer.device),
+        time_steps=math.ceil(clip.shape[0] / sr * infer.cfg.fps)))
+    results = {}
+    for num_threads in threads:
+        torch.set_num_threads(num_threads)
+        with torch.no_grad():
+            encoder(clips[0][1])
+            encoder_seconds = best_seconds(infer.device, lambda: [encoder(clip) for _, clip in clips], repeat)
+        infer.infer_audio_array(clips[0][1], sr)
+        total_seconds = best_seconds(infer.device, lambda: [infer.infer_audio_array(clip, sr) for _, clip in clips],
+                                     repeat)
+        results[f"threads={num_threads}"] = dict(encoder_seconds=encoder_seconds,
+                                                 encoder_rtf=encoder_seconds / audio_seconds,
+                                                 total_seconds=total_seconds,
+                                                 rtf=total_seconds / audio_seconds)
+    return results
+
+
+def main():
+    parser = benchmark_argument_parser("mel_conv student vs wav2vec teacher")
+    parser.set_defaults(config_file="configs/lam_audio2exp_config_mel_distill.py")
+    parser.add_argument("--teacher-config", default="configs/lam_audio2exp_config.py")
+    parser.add_argument("--teacher-options", nargs="+", action=DictAction, help="custom options of the teacher")
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    teacher_args = copy.copy(args)
+    teacher_args.config_file, teacher_args.options = args.teacher_config, args.teacher_options
+    models = dict(student=build_infer(args), teacher=build_infer(teacher_args))
+    clips = load_sample_clips(args.audio_dir, models["student"].cfg.audio_sr)
+
+    results = {}
+    for name, infer in models.items():
+        results[name] = dict(encoder_params=sum(p.numel() for p in infer.backbone.audio_encoder.parameters()),
+                             params=sum(p.numel() for p in infer.model.parameters()),
+                             **timings(infer, clips, args.threads, args.repeat))
+
+    quality = {}
+    for clip_name, speech_array in clips:
+        student_hidden, student_exp = raw_outputs(models["student"], speech_array)
+        teacher_hidden, teacher_exp = raw_outputs(models["teacher"], speech_array)
+        cosine = (student_hidden * teacher_hidden).sum(1) / (
+            np.linalg.norm(student_hidden, axis=1) * np.linalg.norm(teacher_hidden, axis=1) + 1e-12)
+        quality[clip_name] = dict(mean_abs_diff=float(np.abs(student_exp - teacher_exp).mean()),
+                                  max_abs_diff=float(np.abs(student_exp - teacher_exp).max()),
+                                  channel_correlation=channel_correlation(student_exp, teacher_exp),
+                                  hidden_cosine=float(cosine.mean()))
+    results["quality"] = quality
+    results["encoder_param_ratio"] = results["student"]["encoder_params"] / results["teacher"]["encoder_params"]
+
+    write_report(dict(meta=dict(environment_info(models["student"]),
+                                teacher_config=args.teacher_config,
+                                audio_seconds={name: clip.shape[0] / models["student"].cfg.audio_sr
+                                               for name, clip in clips}),
+                      results=results),
+                 args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
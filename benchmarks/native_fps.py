@@ -0,0 +1,134 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Cost/quality comparison of native variable-fps inference against post-hoc resampling.
+
+    python -m benchmarks.native_fps --config-file configs/lam_audio2exp_config_streaming.py \
+        --options weight=pretrained_models/lam_audio2exp_streaming.tar --fps 25 50 60 --output fps.json
+
+For every target fps the raw model output (before post-processing) is produced two ways:
+``native`` interpolates the encoder features straight to the target rate (the wav2vec
+transformer and the decoder run on the longer sequence), ``posthoc/<method>`` runs the model at
+``cfg.fps`` and resamples the output with models.utils.resample_frames. Reported per path:
+``seconds`` and ``rtf`` (model forward + resampling), ``jitter`` (mean absolute second
+difference in weight units per s^2, lower is smoother), ``lipsync`` (Pearson correlation of
+jawOpen with the audio RMS envelope at the target rate) and, for post-hoc paths, ``mae_to_native``.
+"""
+
+import sys
+import math
+import time
+
+import librosa
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from benchmarks.common import (benchmark_argument_parser, build_infer, load_sample_clips,
+                               synchronize, environment_info, write_report)
+from models.utils import ARKitBlendShape, FRAME_INTERPOLATION_METHODS, resample_frames
+
+JAW_OPEN = ARKitBlendShape.index("jawOpen")
+
+
+def model_forward(infer, speech_array, fps):
+    sr = infer.cfg.audio_sr
+    with torch.no_grad():
+        input_dict = {}
+        input_dict['id_idx'] = F.one_hot(torch.tensor(infer.cfg.id_idx),
+                                         infer.cfg.model.backbone.num_identity_classes).to(infer.device)[None, ...]
+        input_dict['input_audio_array'] = torch.FloatTensor(speech_array).to(infer.device)[None, ...]
+        input_dict['time_steps'] = math.ceil(speech_array.shape[0] / sr * fps)
+        output_dict = infer.model(input_dict)
+    return output_dict['pred_exp'].squeeze(0).cpu().numpy()
+
+
+def jitter(frames, fps):
+    if frames.shape[0] < 3:
+        return 0.0
+    return float(np.abs(np.diff(frames, n=2, axis=0)).mean() * fps * fps)
+
+
+def lipsync(frames, speech_array, sr, fps):
+    hop = int(sr / fps)
+    volume = librosa.feature.rms(y=speech_array, frame_length=hop, hop_length=hop)[0]
+    length = min(volume.shape[0], frames.shape[0])
+    jaw, volume = frames[:length, JAW_OPEN], volume[:length]
+    if jaw.std() == 0 or volume.std() == 0:
+        return 0.0
+    return float(np.corrcoef(jaw, volume)[0, 1])
+
+
+def timed(infer, fn):
+    synchronize(infer.device)
+    start = time.perf_counter()
+    out = fn()
+    synchronize(infer.device)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = benchmark_argument_parser("LAM-A2E native fps vs post-hoc resampling benchmark")
+    parser.add_argument("--fps", nargs="+", type=float, default=[25.0, 50.0, 60.0], help="target frame rates")
+    parser.add_argument("--methods", nargs="+", default=list(FRAME_INTERPOLATION_METHODS),
+                        choices=FRAME_INTERPOLATION_METHODS, help="post-hoc interpolation methods")
+    args = parser.parse_args()
+
+    infer = build_infer(args)
+    sr, model_fps = infer.cfg.audio_sr, infer.cfg.fps
+    clips = load_sample_clips(args.audio_dir, sr=sr)
+    for _ in range(args.warmup):
+        model_forward(infer, clips[0][1], model_fps)
+
+    audio_seconds = sum(speech_array.shape[0] for _, speech_array in clips) / sr
+    results = {}
+    for fps in args.fps:
+        totals = {}
+
+        def add(path, **metrics):
+            entry = totals.setdefault(path, {})
+            for key, value in metrics.items():
+                entry.setdefault(key, []).append(value)
+
+        for _, speech_array in clips:
+            native, native_time = timed(infer, lambda: model_forward(infer, speech_array, fps))
+            add("native", seconds=native_time, jitter=jitter(native, fps),
+                lipsync=lipsync(native, speech_array, sr, fps))
+
+            base, base_time = timed(infer, lambda: model_forward(infer, speech_array, model_fps))
+            for method in args.methods:
+                posthoc, resample_time = timed(infer, lambda: resample_frames(base, model_fps, fps, method))
+                length = min(posthoc.shape[0], native.shape[0])
+                add(f"posthoc/{method}", seconds=base_time + resample_time, jitter=jitter(posthoc, fps),
+                    lipsync=lipsync(posthoc, speech_array, sr, fps),
+                    mae_to_native=float(np.abs(posthoc[:length] - native[:length]).mean()))
+
+        for path, metrics in totals.items():
+            seconds = float(np.sum(metrics.pop("seconds")))
+            results[f"fps={fps:g}/{path}"] = dict(seconds=seconds,
+                                                   rtf=seconds / audio_seconds,
+                                                   **{key: float(np.mean(values)) for key, values in metrics.items()})
+
+    write_report(dict(meta=dict(environment_info(infer),
+                                model_fps=model_fps,
+                                clips=[name for name, _ in clips],
+                                audio_seconds=audio_seconds),
+                      results=results),
+                 args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Accuracy gate and throughput report of the inference precisions (infer_precision).
+
+    python -m benchmarks.precision --config-file configs/lam_audio2exp_config.py --options weight=${CHECKPOINT_PATH} \\
+        --precisions bf16 --output precision.json
+
+Every clip of --audio-dir runs through the model in fp32 and in each of --precisions
+(default: bf16, plus fp16 on CUDA). accuracy: error of the raw model outputs (no
+post-processing) against fp32 over all frames, per blendshape (max and mean absolute
+difference) and overall; a precision fails the gate if any blendshape's max error exceeds
+--max-abs-tolerance or its mean error exceeds --mean-abs-tolerance. throughput: offline
+RTF / frames per second (infer_audio_array) and streaming per-chunk latency of --chunk-ms
+chunks, with the speedup over fp32. Exits with 1 if a precision fails the gate.
+"""
+
+import sys
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from benchmarks.common import benchmark_argument_parser, build_infer, load_sample_clips, environment_info, write_report
+from benchmarks.rtf import bench_offline, bench_streaming, summarize
+from models.utils import ARKitBlendShape
+
+# default accuracy gate against fp32, per blendshape (also used by tests/test_parity.py)
+MAX_ABS_TOLERANCE = 0.05
+MEAN_ABS_TOLERANCE = 0.005
+
+
+def raw_expressions(infer, speech_array):
+    input_dict = infer.audio_inputs([speech_array], infer.cfg.audio_sr)
+    input_dict['id_idx'] = F.one_hot(torch.tensor([infer.cfg.id_idx]),
+                                     infer.cfg.model.backbone.num_identity_classes).to(infer.device)
+    with torch.no_grad():
+        return infer.forward_model(input_dict)['pred_exp'][0].cpu().numpy()
+
+
+def accuracy(outputs, reference, max_abs_tolerance, mean_abs_tolerance):
+    diffs = np.abs(np.concatenate(outputs) - np.concatenate(reference))
+    max_abs, mean_abs = diffs.max(0), diffs.mean(0)
+    failing = [name for name, max_error, mean_error in zip(ARKitBlendShape, max_abs, mean_abs)
+               if max_error > max_abs_tolerance or mean_error > mean_abs_tolerance]
+    worst = np.argsort(-max_abs)[:5]
+    return dict(max_abs_diff=float(diffs.max()),
+                mean_abs_diff=float(diffs.mean()),
+                p99_abs_diff=float(np.percentile(diffs, 99)),
+                worst_blendshapes={ARKitBlendShape[i]: float(max_abs[i]) for i in worst},
+                per_blendshape={name: dict(max_abs_diff=float(max_error), mean_abs_diff=float(mean_error))
+                                for name, max_error, mean_error in zip(ARKitBlendShape, max_abs, mean_abs)},
+                failing_blendshapes=failing,
+                passed=not failing)
+
+
+def main():
+    parser = benchmark_argument_parser("inference precision accuracy gate / throughput")
+    parser.set_defaults(config_file="configs/lam_audio2exp_config.py")
+    parser.add_argument("--precisions", nargs="+", default=None, help="default: bf16, plus fp16 on CUDA")
+    parser.add_argument("--max-abs-tolerance", type=float, default=MAX_ABS_TOLERANCE)
+    parser.add_argument("--mean-abs-tolerance", type=float, default=MEAN_ABS_TOLERANCE)
+    parser.add_argument("--chunk-ms", type=float, default=500)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    infer = build_infer(args, infer_precision="fp32")
+    clips = load_sample_clips(args.audio_dir, infer.cfg.audio_sr)
+    precisions = args.precisions or (["bf16", "fp16"] if infer.device.type == "cuda" else ["bf16"])
+
+    results = {}
+    reference = None
+    for precision in ["fp32"] + [p for p in precisions if p != "fp32"]:
+        infer.precision = precision
+        outputs = [raw_expressions(infer, speech_array) for _, speech_array in clips]
+        entry = dict(offline=summarize(*bench_offline(infer, clips, 1, args.warmup, args.repeat)),
+                     streaming=summarize(*bench_streaming(infer, clips, args.chunk_ms, args.warmup, args.repeat)))
+        if reference is None:
+            reference = outputs
+        else:
+            entry["accuracy"] = accuracy(outputs, reference, args.max_abs_tolerance, args.mean_abs_tolerance)
+            entry["offline_speedup"] = results["fp32"]["offline"]["rtf"] / entry["offline"]["rtf"]
+            entry["streaming_speedup_p50"] = (results["fp32"]["streaming"]["latency_p50"]
+                                              / entry["streaming"]["latency_p50"])
+        results[precision] = entry
+
+    failures = [precision for precision, entry in results.items() if not entry.get("accuracy", {}).get("passed", True)]
+    write_report(dict(meta=dict(environment_info(infer), clips=[name for name, _ in clips],
+                                max_abs_tolerance=args.max_abs_tolerance, mean_abs_tolerance=args.mean_abs_tolerance),
+                      results=results,
+                      failures=failures),
+                 args.output)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Savings of the inference-graph pruning (prune_unused_modules, INFERENCE_UNUSED_MODULES in
+models/network.py), optionally writing an inference-only checkpoint.
+
+    python -m benchmarks.pruning --config-file configs/lam_audio2exp_config.py --options weight=${CHECKPOINT_PATH} \\
+        --save-pruned pretrained_models/lam_audio2exp_infer.tar --output pruning.json
+
+Reported: parameter count and fp32 bytes of the full and pruned models, the removed modules,
+checkpoint file sizes, resident memory (RSS) of a fresh process building each model and the
+max difference between their outputs on the first clip of --audio-dir. The pruned checkpoint
+only keeps ``state_dict`` without the pruned keys (and drops optimizer / scheduler state); load
+it with prune_unused_modules=True. Both models are built from the same --options weight, so
+the RSS of the pruned model still includes loading the full checkpoint once.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+import numpy as np
+import torch
+
+from models.network import is_pruned_key
+from benchmarks.common import benchmark_argument_parser, build_infer, load_sample_clips, environment_info, write_report
+
+# builds the model in a fresh interpreter and prints its resident memory
+RSS_PROBE = """
+import sys, json
+from benchmarks.common import benchmark_argument_parser, build_infer, peak_rss_mb
+args = benchmark_argument_parser("").parse_args(sys.argv[1:])
+infer = build_infer(args)
+print(json.dumps(dict(peak_rss_mb=peak_rss_mb())))
+"""
+
+
+def model_size(model):
+    params = sum(p.numel() for p in model.parameters())
+    return dict(params=params, megabytes=sum(p.numel() * p.element_size() for p in model.parameters()) / 2 ** 20)
+
+
+def probe_rss(args, prune):
+    command = [sys.executable, "-c", RSS_PROBE, "--config-file", args.config_file, "--options"]
+    command += [f"{key}={value}" for key, value in (args.options or {}).items()]
+    command += [f"prune_unused_modules={prune}"]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])["peak_rss_mb"]
+
+
+def save_pruned_checkpoint(weight_path, removed, path):
+    checkpoint = torch.load(weight_path, map_location="cpu")
+    state_dict = {key: value for key, value in checkpoint["state_dict"].items()
+                  if not is_pruned_key(key[7:] if key.startswith("module.") else key, removed)}
+    torch.save(dict(state_dict=state_dict), path)
+
+
+def main():
+    parser = benchmark_argument_parser("inference graph pruning report")
+    parser.add_argument("--save-pruned", default=None, help="write an inference-only checkpoint to this path")
+    parser.add_argument("--skip-rss", action="store_true", help="do not start the RSS probe processes")
+    args = parser.parse_args()
+
+    full = build_infer(args, prune_unused_modules=False)
+    pruned = build_infer(args, prune_unused_modules=True)
+
+    _, speech_array = load_sample_clips(args.audio_dir)[0]
+    np.random.seed(0)
+    full_exp = full.infer_audio_array(speech_array, full.cfg.audio_sr)
+    np.random.seed(0)
+    pruned_exp = pruned.infer_audio_array(speech_array, pruned.cfg.audio_sr)
+
+    results = dict(full=model_size(full.model),
+                   pruned=model_size(pruned.model),
+                   removed_modules=pruned.pruned_modules,
+                   max_abs_diff=float(np.abs(full_exp - pruned_exp).max()))
+    results["saved_params"] = results["full"]["params"] - results["pruned"]["params"]
+    results["saved_megabytes"] = results["full"]["megabytes"] - results["pruned"]["megabytes"]
+
+    weight_path = full.cfg.weight
+    results["checkpoint_megabytes"] = os.path.getsize(weight_path) / 2 ** 20
+    if args.save_pruned is not None:
+        save_pruned_checkpoint(weight_path, pruned.pruned_modules, args.save_pruned)
+        results["pruned_checkpoint_megabytes"] = os.path.getsize(args.save_pruned) / 2 ** 20
+
+    if not args.skip_rss:
+        results["full"]["peak_rss_mb"] = probe_rss(args, False)
+        results["pruned"]["peak_rss_mb"] = probe_rss(args, True)
+
+    write_report(dict(meta=environment_info(full), results=results), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
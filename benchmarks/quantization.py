@@ -0,0 +1,107 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Precision vs size benchmark of the exporter's quantization modes on the jsontests/ fixtures.
+
+    python -m benchmarks.quantization --modes none decimal2 decimal3 uint8 uint16 uint8_delta --output quant.json
+
+For every fixture and mode the animation JSON is built with build_blendshape_animation and
+serialized compactly. Reported: ``bytes`` and ``gzip_bytes`` (what a client downloads with HTTP
+compression), their ratio to the float export, ``encode_ms`` (quantize + build + dump),
+``decode_ms`` (parse + decode_blendshape_animation), ``max_error`` overall and per blendshape.
+The ``all`` entry sums sizes and times over all fixtures and takes the max of the errors.
+"""
+
+import os
+import sys
+import glob
+import gzip
+import json
+import time
+import argparse
+
+import numpy as np
+
+from models.utils import ARKitBlendShape, build_blendshape_animation, decode_blendshape_animation
+from pdxutils import blendshape_formats as formats
+from benchmarks.common import write_report
+
+DEFAULT_MODES = ["none", "decimal2", "decimal3", "decimal4", "uint8", "uint16",
+                 "decimal3_delta", "uint8_delta", "uint16_delta"]
+
+
+def best_of(fn, repeat):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return out, best * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="exporter quantization benchmark")
+    parser.add_argument("--json-dir", default="jsontests")
+    parser.add_argument("--modes", nargs="+", default=DEFAULT_MODES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    clips = []
+    for path in sorted(glob.glob(os.path.join(args.json_dir, "*.json"))):
+        layout, names, weights, fps = formats.load_animation(formats.load(path))
+        clips.append((os.path.splitext(os.path.basename(path))[0],
+                      np.clip(formats.to_arkit(names, weights), 0.0, 1.0).astype(np.float32),
+                      fps or 30.0))
+
+    results = {}
+    for mode in args.modes:
+        quantization = None if mode == "none" else mode
+        total = dict(bytes=0, gzip_bytes=0, encode_ms=0.0, decode_ms=0.0)
+        per_blendshape = np.zeros(len(ARKitBlendShape))
+        for name, weights, fps in clips:
+            def encode():
+                animation = build_blendshape_animation(weights, ARKitBlendShape, fps, quantization=quantization)
+                return json.dumps(animation, separators=(',', ':')).encode('utf-8')
+
+            payload, encode_ms = best_of(encode, args.repeat)
+            decoded, decode_ms = best_of(lambda: decode_blendshape_animation(json.loads(payload)), args.repeat)
+            error = np.abs(decoded.astype(np.float64) - weights).max(axis=0)
+            per_blendshape = np.maximum(per_blendshape, error)
+            entry = dict(bytes=len(payload),
+                         gzip_bytes=len(gzip.compress(payload)),
+                         encode_ms=encode_ms,
+                         decode_ms=decode_ms)
+            for key in total:
+                total[key] += entry[key]
+            results[f"{name}/{mode}"] = dict(entry, max_error=float(error.max()))
+        results[f"all/{mode}"] = dict(total,
+                                      max_error=float(per_blendshape.max()),
+                                      max_error_per_blendshape=dict(zip(ARKitBlendShape, per_blendshape.tolist())))
+
+    if "none" in args.modes:
+        for key, entry in results.items():
+            reference = results[key.rsplit("/", 1)[0] + "/none"]
+            entry["size_ratio"] = entry["bytes"] / reference["bytes"]
+            entry["gzip_size_ratio"] = entry["gzip_bytes"] / reference["gzip_bytes"]
+
+    write_report(dict(meta=dict(fixtures=[name for name, _, _ in clips], repeat=args.repeat),
+                      results=results),
+                 args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
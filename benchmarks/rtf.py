@@ -0,0 +1,165 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Real-time-factor benchmark of the offline and streaming inference paths.
+
+    python -m benchmarks.rtf --config-file configs/lam_audio2exp_config_streaming.py \
+        --options weight=pretrained_models/lam_audio2exp_streaming.tar device=cpu \
+        --chunk-ms 200 500 1000 --batch-sizes 1 4 --threads 1 4 --output rtf.json
+
+    # flag regressions against a stored report (exit code 1 if any)
+    python -m benchmarks.rtf ... --baseline rtf_baseline.json --tolerance 0.1
+
+Every clip of ``assets/sample_audio`` is run through each case. Reported per case:
+``rtf`` (processing time / audio duration), per-call latency p50/p95/p99 in seconds
+(a call is one batch offline, one chunk when streaming), output ``frames_per_sec`` and
+the process ``peak_rss_mb`` during the case (reset before each case on Linux).
+"""
+
+import sys
+import json
+import time
+
+import numpy as np
+import torch
+
+from benchmarks.common import (benchmark_argument_parser, build_infer, load_sample_clips,
+                               synchronize, latency_stats, reset_peak_rss, peak_rss_mb, environment_info,
+                               write_report, compare_to_baseline)
+
+def run_offline_batch(infer, speech_array, batch_size):
+    """Runs ``batch_size`` copies of one clip through infer_batch as a single batch (same path for every size)."""
+    return infer.infer_batch([speech_array] * batch_size, infer.cfg.audio_sr,
+                             batch_size=batch_size, max_batch_seconds=float("inf"))
+
+
+def bench_offline(infer, clips, batch_size, warmup, repeat):
+    sr = infer.cfg.audio_sr
+    for _ in range(warmup):
+        run_offline_batch(infer, clips[0][1], batch_size)
+
+    latencies, audio_seconds, frames = [], 0.0, 0
+    for _ in range(repeat):
+        for _, speech_array in clips:
+            synchronize(infer.device)
+            start = time.perf_counter()
+            outputs = run_offline_batch(infer, speech_array, batch_size)
+            synchronize(infer.device)
+            latencies.append(time.perf_counter() - start)
+            audio_seconds += batch_size * speech_array.shape[0] / sr
+            frames += sum(out.shape[0] for out in outputs)
+    return latencies, audio_seconds, frames
+
+
+def bench_streaming(infer, clips, chunk_ms, warmup, repeat):
+    sr = infer.cfg.audio_sr
+    chunk_size = int(sr * chunk_ms / 1000)
+
+    def stream_clip(speech_array, latencies=None):
+        context, frames = None, 0
+        for start in range(0, speech_array.shape[0], chunk_size):
+            chunk = speech_array[start:start + chunk_size]
+            synchronize(infer.device)
+            tic = time.perf_counter()
+            output, context = infer.infer_streaming_audio(chunk, sr, context)
+            synchronize(infer.device)
+            if latencies is not None:
+                latencies.append(time.perf_counter() - tic)
+            if output['expression'] is not None:
+                frames += output['expression'].shape[0]
+        return frames + infer.flush_streaming_audio(context)['expression'].shape[0]
+
+    for _ in range(warmup):
+        stream_clip(clips[0][1])
+
+    latencies, audio_seconds, frames = [], 0.0, 0
+    for _ in range(repeat):
+        for _, speech_array in clips:
+            frames += stream_clip(speech_array, latencies)
+            audio_seconds += speech_array.shape[0] / sr
+    return latencies, audio_seconds, frames
+
+
+def summarize(latencies, audio_seconds, frames):
+    stats = latency_stats(latencies)
+    total = float(np.sum(latencies))
+    return dict(rtf=total / audio_seconds,
+                latency_p50=stats['p50'],
+                latency_p95=stats['p95'],
+                latency_p99=stats['p99'],
+                latency_mean=stats['mean'],
+                latency_max=stats['max'],
+                num_calls=stats['count'],
+                audio_seconds=audio_seconds,
+                frames=int(frames),
+                frames_per_sec=frames / total,
+                peak_rss_mb=peak_rss_mb())
+
+
+def main():
+    parser = benchmark_argument_parser("LAM-A2E real-time-factor benchmark")
+    parser.add_argument("--mode", nargs="+", default=["offline", "streaming"], choices=["offline", "streaming"])
+    parser.add_argument("--chunk-ms", nargs="+", type=float, default=[500.0], help="streaming chunk durations")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1], help="offline batch sizes")
+    parser.add_argument("--threads", nargs="+", type=int, default=[torch.get_num_threads()], help="torch intra-op thread counts")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over all clips per case")
+    parser.add_argument("--baseline", default=None, help="report of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative regression")
+    args = parser.parse_args()
+
+    infer = build_infer(args)
+    # a streaming chunk has to fit into the model's audio window
+    max_chunk_ms = infer.streaming_window_samples / infer.cfg.audio_sr * 1000
+    for chunk_ms in args.chunk_ms:
+        if not 0 < chunk_ms <= max_chunk_ms:
+            parser.error(f"--chunk-ms must be in (0, {max_chunk_ms:.0f}], got {chunk_ms}")
+    clips = load_sample_clips(args.audio_dir, sr=infer.cfg.audio_sr)
+
+    results = {}
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        if "offline" in args.mode:
+            for batch_size in args.batch_sizes:
+                case = f"offline/threads={threads}/batch={batch_size}"
+                reset_peak_rss()
+                results[case] = summarize(*bench_offline(infer, clips, batch_size, args.warmup, args.repeat))
+        if "streaming" in args.mode:
+            for chunk_ms in args.chunk_ms:
+                case = f"streaming/threads={threads}/chunk_ms={chunk_ms:g}"
+                reset_peak_rss()
+                results[case] = summarize(*bench_streaming(infer, clips, chunk_ms, args.warmup, args.repeat))
+
+    report = dict(meta=dict(environment_info(infer),
+                            clips=[name for name, _ in clips],
+                            repeat=args.repeat,
+                            warmup=args.warmup),
+                  results=results)
+
+    regressions = []
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline["results"], args.tolerance)
+        report["baseline"] = dict(path=args.baseline, tolerance=args.tolerance, regressions=regressions)
+
+    write_report(report, args.output)
+    for r in regressions:
+        print(f"REGRESSION {r['case']} {r['metric']}: {r['baseline']:.6g} -> {r['current']:.6g} ({r['change']:+.1%})",
+              file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
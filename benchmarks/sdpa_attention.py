@@ -0,0 +1,118 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Parity check and benchmark of the wav2vec encoder attention implementations
+(encoder_attention='sdpa' vs 'eager', models/encoder/wav2vec.py Wav2Vec2SdpaAttention).
+
+    python -m benchmarks.sdpa_attention --config-file configs/lam_audio2exp_config.py --options weight=${CHECKPOINT_PATH} \\
+        --seconds 10 60 300 --output sdpa.json
+
+For every --seconds, the audio encoder runs on the same random audio with both
+implementations. Reported: ``max_abs_diff`` of the encoder outputs, seconds (best of
+--repeat), speedup, and peak memory: torch.cuda.max_memory_allocated on CUDA, the peak RSS of
+a fresh process running one forward on CPU. Exits with 1 if a difference exceeds --tolerance.
+"""
+
+import sys
+import json
+import argparse
+import math
+import time
+import subprocess
+
+import torch
+
+from benchmarks.common import (benchmark_argument_parser, build_infer, synchronize, peak_rss_mb,
+                               environment_info, write_report)
+
+IMPLEMENTATIONS = ("eager", "sdpa")
+
+
+def encoder_forward(infer, audio):
+    time_steps = math.ceil(audio.shape[1] / infer.cfg.audio_sr * infer.cfg.fps)
+    with torch.no_grad():
+        return infer.backbone.audio_encoder(audio, frame_num=time_steps).last_hidden_state
+
+
+def random_audio(infer, seconds):
+    generator = torch.Generator().manual_seed(0)
+    return (0.1 * torch.randn(1, int(seconds * infer.cfg.audio_sr), generator=generator)).to(infer.device)
+
+
+def probe_rss(args, implementation, seconds):
+    """Peak RSS (MB) of a fresh process running one encoder forward."""
+    command = [sys.executable, "-m", "benchmarks.sdpa_attention", "--config-file", args.config_file,
+               "--probe", implementation, "--seconds", str(seconds)]
+    if args.options:
+        command += ["--options"] + [f"{key}={value}" for key, value in args.options.items()]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])["peak_rss_mb"]
+
+
+def main():
+    parser = benchmark_argument_parser("wav2vec sdpa vs eager attention")
+    parser.set_defaults(config_file="configs/lam_audio2exp_config.py")
+    parser.add_argument("--seconds", nargs="+", type=float, default=[10, 60, 300])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    parser.add_argument("--skip-rss", action="store_true", help="do not start the CPU peak RSS probe processes")
+    parser.add_argument("--probe", choices=IMPLEMENTATIONS, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    infer = build_infer(args)
+    encoder = infer.backbone.audio_encoder
+    if args.probe is not None:
+        audio = random_audio(infer, args.seconds[0])
+        encoder.set_attention_implementation(args.probe)
+        encoder_forward(infer, audio)
+        print(json.dumps(dict(peak_rss_mb=peak_rss_mb())))
+        return 0
+
+    results = {}
+    for seconds in args.seconds:
+        audio = random_audio(infer, seconds)
+        entry, outputs = {}, {}
+        for implementation in IMPLEMENTATIONS:
+            encoder.set_attention_implementation(implementation)
+            encoder_forward(infer, audio)
+            best = float("inf")
+            if infer.device.type == "cuda":
+                torch.cuda.reset_peak_memory_stats(infer.device)
+            for _ in range(args.repeat):
+                synchronize(infer.device)
+                start = time.perf_counter()
+                outputs[implementation] = encoder_forward(infer, audio)
+                synchronize(infer.device)
+                best = min(best, time.perf_counter() - start)
+            entry[f"{implementation}_seconds"] = best
+            if infer.device.type == "cuda":
+                entry[f"{implementation}_peak_mb"] = torch.cuda.max_memory_allocated(infer.device) / 2 ** 20
+            elif not args.skip_rss:
+                entry[f"{implementation}_peak_rss_mb"] = probe_rss(args, implementation, seconds)
+        entry["speedup"] = entry["eager_seconds"] / entry["sdpa_seconds"]
+        entry["max_abs_diff"] = float((outputs["eager"] - outputs["sdpa"]).abs().max())
+        results[f"seconds={seconds:g}"] = entry
+    encoder.set_attention_implementation(infer.cfg.get("encoder_attention", "eager"))
+
+    failures = [key for key, entry in results.items() if entry["max_abs_diff"] > args.tolerance]
+    write_report(dict(meta=dict(environment_info(infer), tolerance=args.tolerance),
+                      results=results,
+                      failures=failures),
+                 args.output)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Latency / quality / CPU map of the streaming chunk size and context window
+(streaming_chunk_ms, streaming_window_seconds).
+
+    python -m benchmarks.streaming_latency --config-file configs/lam_audio2exp_config_streaming.py --options weight=${CHECKPOINT_PATH} \\
+        --chunk-ms 100 160 250 500 1000 --window-seconds 1 1.5 2.133 --target-ms 200 --output streaming_latency.json
+
+Every clip of --audio-dir is streamed in --chunk-ms chunks with every --window-seconds
+window (pairs with a chunk longer than the window are skipped). Reported per pair:
+``call_p50`` / ``call_p95`` seconds per infer_streaming_audio call; ``rtf`` (wall) and
+``cpu_rtf`` (process CPU time, all threads) per second of audio, a stream cannot keep up
+above 1; mouth response latency, the delay from a sound to its expression frame:
+``response_mean_ms`` (half a chunk of buffering + p50 call) and ``response_max_ms`` (a
+full chunk + p95 call), ``meets_target`` if the max is within --target-ms; and the
+quality of the jaw / mouth blendshapes against offline inference of the whole clip
+(``mouth_mae``, ``mouth_correlation``).
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import (benchmark_argument_parser, build_infer, load_sample_clips, synchronize,
+                               environment_info, write_report)
+from models.utils import ARKitBlendShape, MOUTH_BLENDSHAPES
+
+MOUTH_CHANNELS = [ARKitBlendShape.index(name) for name in ["jawOpen"] + MOUTH_BLENDSHAPES]
+
+
+def stream_clip(infer, speech_array, chunk_size, overrides=None):
+    """Streams one clip with cfg ``overrides``; returns (per-call seconds, process CPU seconds, expressions)."""
+    sr = infer.cfg.audio_sr
+    context, latencies, expressions = None, [], []
+    cpu_start = time.process_time()
+    for start in range(0, speech_array.shape[0], chunk_size):
+        synchronize(infer.device)
+        tic = time.perf_counter()
+        output, context = infer.infer_streaming_audio(speech_array[start:start + chunk_size], sr, context, overrides)
+        synchronize(infer.device)
+        latencies.append(time.perf_counter() - tic)
+        if output['expression'] is not None:
+            expressions.append(output['expression'])
+    expressions.append(infer.flush_streaming_audio(context, overrides)['expression'])
+    return latencies, time.process_time() - cpu_start, np.concatenate(expressions)
+
+
+def mouth_quality(streamed, reference):
+    num_frames = min(streamed.shape[0], reference.shape[0])
+    a, b = streamed[:num_frames, MOUTH_CHANNELS], reference[:num_frames, MOUTH_CHANNELS]
+    a_centered, b_centered = a - a.mean(0), b - b.mean(0)
+    denominator = np.sqrt((a_centered ** 2).sum(0) * (b_centered ** 2).sum(0))
+    valid = denominator > 1e-12
+    correlation = (a_centered * b_centered).sum(0)[valid] / denominator[valid]
+    return float(np.abs(a - b).mean()), float(correlation.mean()) if valid.any() else float("nan")
+
+
+def main():
+    parser = benchmark_argument_parser("streaming chunk / window latency-quality map")
+    parser.add_argument("--chunk-ms", nargs="+", type=float, default=[100, 160, 250, 500, 1000])
+    parser.add_argument("--window-seconds", nargs="+", type=float, default=[1.0, 1.5, 64 / 30])
+    parser.add_argument("--target-ms", type=float, default=200, help="mouth response latency target")
+    args = parser.parse_args()
+
+    infer = build_infer(args)
+    sr = infer.cfg.audio_sr
+    clips = load_sample_clips(args.audio_dir, sr)
+    audio_seconds = sum(clip.shape[0] for _, clip in clips) / sr
+    references = [infer.infer_audio_array(clip, sr) for _, clip in clips]
+
+    results = {}
+    for window_seconds in args.window_seconds:
+        overrides = dict(streaming_window_seconds=window_seconds)
+        for chunk_ms in args.chunk_ms:
+            chunk_size = int(chunk_ms * sr / 1000)
+            if chunk_size > int(window_seconds * sr):
+                continue
+            for _ in range(args.warmup):
+                stream_clip(infer, clips[0][1][:4 * chunk_size], chunk_size, overrides)
+            latencies, cpu_seconds, maes, correlations = [], 0.0, [], []
+            for (_, clip), reference in zip(clips, references):
+                clip_latencies, clip_cpu_seconds, streamed = stream_clip(infer, clip, chunk_size, overrides)
+                latencies += clip_latencies
+                cpu_seconds += clip_cpu_seconds
+                mae, correlation = mouth_quality(streamed, reference)
+                maes.append(mae)
+                correlations.append(correlation)
+            call_p50, call_p95 = np.percentile(latencies, [50, 95])
+            response_max_ms = chunk_ms + call_p95 * 1000
+            results[f"window={window_seconds:.3g}s/chunk={chunk_ms:g}ms"] = dict(
+                window_seconds=window_seconds,
+                chunk_ms=chunk_ms,
+                calls=len(latencies),
+                call_p50=float(call_p50),
+                call_p95=float(call_p95),
+                rtf=float(np.sum(latencies)) / audio_seconds,
+                cpu_rtf=cpu_seconds / audio_seconds,
+                response_mean_ms=chunk_ms / 2 + call_p50 * 1000,
+                response_max_ms=response_max_ms,
+                meets_target=bool(response_max_ms <= args.target_ms and np.sum(latencies) <= audio_seconds),
+                mouth_mae=float(np.mean(maes)),
+                mouth_correlation=float(np.mean(correlations)))
+
+    write_report(dict(meta=dict(environment_info(infer), clips=[name for name, _ in clips], audio_seconds=audio_seconds,
+                                target_ms=args.target_ms),
+                      results=results),
+                 args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,43 @@
 weight = 'pretrained_models/lam_audio2exp.tar'  # path to model weight
 ex_vol = True # Isolates vocal track from audio file
-audio_input = './assets/sample_audio/BarackObama.wav'
+audio_input = './assets/sample_audio/BarackObama.wav'  # a file, or a directory of audio files (batched, one json per file in save_path)
 save_json_path = 'bsData.json'
+export_quantization = None  # None (float weights), 'decimal3', 'uint8', 'uint16', optionally with '_delta', e.g. 'uint8_delta'
+stream_codec = dict(bits=16, keyframe_interval=60, threshold=0)  # server ?output=codec, see utils/expression_codec.py
 
 audio_sr = 16000
-fps = 30.0
+fps = 30.0  # model frame rate, encoder features are interpolated straight to it
+output_fps = None  # fps of returned expressions, e.g. 60 or 120, resampled from fps (None: same as fps)
+frame_interpolation = 'monotone'  # resampling method: 'linear', 'cubic' or 'monotone'
+device = 'cuda'  # inference device, e.g. 'cuda', 'cuda:1' or 'cpu'
+fused_inference = False  # opt-in: channels-last fused conv/LayerNorm/ReLU decoder blocks at inference (models/network.py FusedConvNormRelu)
+prune_unused_modules = False  # opt-in: drop submodules inference never runs (models/network.py INFERENCE_UNUSED_MODULES) before loading weights
+encoder_layers = None  # early exit: run only the first K of the 12 wav2vec transformer layers (None: all), infer.set_encoder_layers(K) at runtime
+encoder_layer_heads = dict()  # K -> checkpoint whose decoder head was fine-tuned for that depth, e.g. {6: 'pretrained_models/lam_audio2exp_k6.tar'} (--options encoder_layer_heads.6=...)
+encoder_attention = 'eager'  # wav2vec self-attention at inference: 'eager' (HF, builds the T x T matrix) or opt-in 'sdpa' (F.scaled_dot_product_attention, ~3e-6 from eager, see benchmarks/sdpa_attention.py)
+infer_precision = 'fp32'  # model forward precision: 'fp32', 'bf16' (autocast, CPU or CUDA) or 'fp16' (autocast, CUDA only), check with benchmarks/precision.py
+feature_chunk_seconds = None  # opt-in: run the wav2vec conv feature encoder over long audio in chunks of this many seconds (bounded memory); not bit-exact, features differ from one pass by ~1e-6 (hidden states ~5e-6), see benchmarks/chunked_features.py
+compile_model = False  # torch.compile the model (inductor, static shapes): one graph for the streaming window, one per compile bucket offline
+compile_mode = 'default'  # torch.compile mode: 'default', 'reduce-overhead' (CUDA graphs) or 'max-autotune'
+compile_buckets_seconds = [2.5, 5, 10, 20]  # offline audio is zero-padded (masked) to the shortest bucket that holds it, longer audio runs eagerly
+compile_cache_dir = 'cache/torch_compile'  # compiled kernels kept across restarts (TORCHINDUCTOR_CACHE_DIR, process-wide, set by default_setup), None: torch default
+compile_warmup = False  # compile every bucket and the streaming window at startup instead of on the first request
+streaming_window_seconds = 64 / 30  # audio the model sees per streaming call (history + new chunk); shorter: less compute per call, less context
+streaming_chunk_ms = 1000  # chunk size fed by inference_streaming_audio.py; the first frames arrive one chunk + one call after the audio starts
+infer_batch_size = 8  # clips per forward pass when audio_input is a directory (infer_batch)
+infer_max_batch_seconds = None  # cap on clips x longest clip (seconds) per batch, None: no cap
+feature_cache_dir = None  # offline encoder outputs cached on disk by audio hash, e.g. 'cache/features'
+feature_cache_level = 'hidden'  # 'hidden' (skip the whole audio encoder) or 'extractor' (conv features only, survives encoder fine-tuning)
 
 movement_smooth = True
 brow_movement = True
+idle_motion_seed = None  # seed of the procedural eye blinks / brow raises (IdleMotionGenerator), None: different every request / stream
 id_idx = 153
 
+profile_latency = False  # per-stage latency histograms written to save_path/latency.json
+latency_window_size = 1000  # latest samples per stage kept for the histograms
+latency_write_period = 20  # requests between two histogram writes
+
 resume = False  # whether to resume training process
 evaluate = True  # evaluate after each epoch training process
 test_only = False  # test process
@@ -47,6 +75,8 @@ model = dict(
         use_transformer=True,
         num_attention_heads=8,
         num_transformer_layers=6,
+        fps=fps,
+        sample_rate=audio_sr,
     ),
     criteria=[dict(type="L1Loss", loss_weight=1.0, ignore_index=-1)],
 )
@@ -0,0 +1,136 @@
+# Lightweight mel_conv encoder distilled from the wav2vec model (models/encoder/mel.py, DistillationEstimator).
+# Trained with the DefaultTrainer (engines/train.py) like the base config; the student checkpoint
+# then runs inference with this config (the teacher is only built for training steps).
+weight = 'pretrained_models/lam_audio2exp_mel.tar'  # path to the distilled student weight
+teacher_weight = 'pretrained_models/lam_audio2exp.tar'  # wav2vec model the student is distilled from
+ex_vol = True # Isolates vocal track from audio file
+audio_input = './assets/sample_audio/BarackObama.wav'  # a file, or a directory of audio files (batched, one json per file in save_path)
+save_json_path = 'bsData.json'
+export_quantization = None  # None (float weights), 'decimal3', 'uint8', 'uint16', optionally with '_delta', e.g. 'uint8_delta'
+stream_codec = dict(bits=16, keyframe_interval=60, threshold=0)  # server ?output=codec, see utils/expression_codec.py
+
+audio_sr = 16000
+fps = 30.0  # model frame rate, encoder features are interpolated straight to it
+output_fps = None  # fps of returned expressions, e.g. 60 or 120, resampled from fps (None: same as fps)
+frame_interpolation = 'monotone'  # resampling method: 'linear', 'cubic' or 'monotone'
+device = 'cuda'  # inference device, e.g. 'cuda', 'cuda:1' or 'cpu'
+fused_inference = True  # channels-last fused conv/LayerNorm/ReLU decoder blocks at inference (models/network.py FusedConvNormRelu)
+prune_unused_modules = True  # drop submodules inference never runs (models/network.py INFERENCE_UNUSED_MODULES) before loading weights
+infer_batch_size = 8  # clips per forward pass when audio_input is a directory (infer_batch)
+infer_max_batch_seconds = None  # cap on clips x longest clip (seconds) per batch, None: no cap
+feature_cache_dir = None  # offline encoder outputs cached on disk by audio hash, e.g. 'cache/features'
+feature_cache_level = 'hidden'  # 'hidden' (skip the whole audio encoder) or 'extractor' (conv features only, survives encoder fine-tuning)
+
+movement_smooth = True
+brow_movement = True
+id_idx = 153
+
+profile_latency = False  # per-stage latency histograms written to save_path/latency.json
+latency_window_size = 1000  # latest samples per stage kept for the histograms
+latency_write_period = 20  # requests between two histogram writes
+
+resume = False  # whether to resume training process
+evaluate = True  # evaluate after each epoch training process
+test_only = False  # test process
+
+seed = None  # train process will init a random seed and record
+save_path = "exp/audio2exp"
+num_worker = 16  # total worker in all gpu
+batch_size = 16  # total batch size in all gpu
+batch_size_val = None  # auto adapt to bs 1 for each gpu
+batch_size_test = None  # auto adapt to bs 1 for each gpu
+epoch = 100  # total epoch, data loop = epoch // eval_epoch
+eval_epoch = 100  # sche total eval & checkpoint epoch
+
+sync_bn = False
+enable_amp = False
+empty_cache = False
+find_unused_parameters = False
+
+mix_prob = 0
+param_dicts = None  # example: param_dicts = [dict(keyword="block", lr_scale=0.1)]
+
+# model settings
+teacher = dict(
+    type="Audio2Expression",
+    pretrained_encoder_type='wav2vec',
+    pretrained_encoder_path='facebook/wav2vec2-base-960h',
+    wav2vec2_config_path = 'configs/wav2vec2_config.json',
+    num_identity_classes=5016,
+    identity_feat_dim=64,
+    hidden_dim=512,
+    expression_dim=52,
+    norm_type='ln',
+    use_transformer=True,
+    num_attention_heads=8,
+    num_transformer_layers=6,
+    fps=fps,
+    sample_rate=audio_sr,
+)
+
+model = dict(
+    type="DistillationEstimator",
+    backbone=dict(
+        type="Audio2Expression",
+        pretrained_encoder_type='mel_conv',
+        mel_encoder=dict(n_fft=400, hop_length=160, n_mels=80, channels=256, num_layers=8,
+                         kernel_size=5, dilations=(1, 2, 4, 8), output_dim=768),
+        num_identity_classes=5016,
+        identity_feat_dim=64,
+        hidden_dim=512,
+        expression_dim=52,
+        norm_type='ln',
+        use_transformer=True,
+        num_attention_heads=8,
+        num_transformer_layers=6,
+        fps=fps,
+        sample_rate=audio_sr,
+    ),
+    teacher=teacher,
+    teacher_weight=teacher_weight,
+    feature_loss_weight=1.0,  # MSE to the teacher's encoder output
+    output_loss_weight=1.0,  # L1 to the teacher's expressions
+    init_from_teacher=True,  # student decoder starts from the teacher's
+    freeze_decoder=False,
+    criteria=[dict(type="L1Loss", loss_weight=1.0, ignore_index=-1)],  # ground truth term, used when gt_exp is given
+)
+
+dataset_type = 'audio2exp'
+data_root = './'
+data = dict(
+    train=dict(
+        type=dataset_type,
+        split="train",
+        data_root=data_root,
+        test_mode=False,
+    ),
+    val=dict(
+        type=dataset_type,
+        split="val",
+        data_root=data_root,
+        test_mode=False,
+    ),
+    test=dict(
+        type=dataset_type,
+        split="val",
+        data_root=data_root,
+        test_mode=True
+        ),
+)
+
+# hook
+hooks = [
+    dict(type="CheckpointLoader"),
+    dict(type="IterationTimer", warmup_iter=2),
+    dict(type="InformationWriter"),
+    dict(type="SemSegEvaluator"),
+    dict(type="CheckpointSaver", save_freq=None),
+    dict(type="PreciseEvaluator", test_last=False),
+]
+
+# Trainer
+train = dict(type="DefaultTrainer")
+
+# Tester
+infer = dict(type="Audio2ExpressionInfer",
+             verbose=True)
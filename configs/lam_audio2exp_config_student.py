@@ -0,0 +1,144 @@
+# Compact student (6 wav2vec layers, hidden_dim 256, 2 decoder blocks) distilled from the full model over
+# unlabeled audio by the DistillationTrainer; teacher targets are cached in distill.cache_dir. The student
+# checkpoint runs inference with this config (the teacher is only built by the trainer).
+weight = 'pretrained_models/lam_audio2exp_student.tar'  # path to the distilled student weight
+ex_vol = True # Isolates vocal track from audio file
+audio_input = './assets/sample_audio/BarackObama.wav'  # a file, or a directory of audio files (batched, one json per file in save_path)
+save_json_path = 'bsData.json'
+export_quantization = None  # None (float weights), 'decimal3', 'uint8', 'uint16', optionally with '_delta', e.g. 'uint8_delta'
+stream_codec = dict(bits=16, keyframe_interval=60, threshold=0)  # server ?output=codec, see utils/expression_codec.py
+
+audio_sr = 16000
+fps = 30.0  # model frame rate, encoder features are interpolated straight to it
+output_fps = None  # fps of returned expressions, e.g. 60 or 120, resampled from fps (None: same as fps)
+frame_interpolation = 'monotone'  # resampling method: 'linear', 'cubic' or 'monotone'
+device = 'cuda'  # inference device, e.g. 'cuda', 'cuda:1' or 'cpu'
+fused_inference = True  # channels-last fused conv/LayerNorm/ReLU decoder blocks at inference (models/network.py FusedConvNormRelu)
+prune_unused_modules = True  # drop submodules inference never runs (models/network.py INFERENCE_UNUSED_MODULES) before loading weights
+encoder_layers = None  # early exit: run only the first K of the 12 wav2vec transformer layers (None: all), infer.set_encoder_layers(K) at runtime
+encoder_layer_heads = dict()  # K -> checkpoint whose decoder head was fine-tuned for that depth, e.g. {6: 'pretrained_models/lam_audio2exp_k6.tar'} (--options encoder_layer_heads.6=...)
+infer_batch_size = 8  # clips per forward pass when audio_input is a directory (infer_batch)
+infer_max_batch_seconds = None  # cap on clips x longest clip (seconds) per batch, None: no cap
+feature_cache_dir = None  # offline encoder outputs cached on disk by audio hash, e.g. 'cache/features'
+feature_cache_level = 'hidden'  # 'hidden' (skip the whole audio encoder) or 'extractor' (conv features only, survives encoder fine-tuning)
+
+movement_smooth = True
+brow_movement = True
+id_idx = 153
+
+profile_latency = False  # per-stage latency histograms written to save_path/latency.json
+latency_window_size = 1000  # latest samples per stage kept for the histograms
+latency_write_period = 20  # requests between two histogram writes
+
+resume = False  # whether to resume training process
+evaluate = False  # unlabeled audio, no validation targets
+test_only = False  # test process
+
+seed = None  # train process will init a random seed and record
+save_path = "exp/audio2exp"
+num_worker = 16  # total worker in all gpu
+batch_size = 16  # total batch size in all gpu
+batch_size_val = None  # auto adapt to bs 1 for each gpu
+batch_size_test = None  # auto adapt to bs 1 for each gpu
+epoch = 100  # total epoch, data loop = epoch // eval_epoch
+eval_epoch = 100  # sche total eval & checkpoint epoch
+
+sync_bn = False
+enable_amp = False
+empty_cache = False
+find_unused_parameters = False
+
+mix_prob = 0
+param_dicts = None  # example: param_dicts = [dict(keyword="block", lr_scale=0.1)]
+
+# model settings
+model = dict(
+    type="DistillationEstimator",
+    backbone=dict(
+        type="Audio2Expression",
+        pretrained_encoder_type='wav2vec',
+        pretrained_encoder_path='facebook/wav2vec2-base-960h',
+        wav2vec2_config_path = 'configs/wav2vec2_config.json',
+        num_encoder_layers=6,  # first 6 of the 12 wav2vec layers, initialized from the teacher's
+        num_identity_classes=5016,
+        identity_feat_dim=64,
+        hidden_dim=256,
+        expression_dim=52,
+        norm_type='ln',
+        decoder_depth=2,
+        use_transformer=True,
+        num_attention_heads=4,
+        num_transformer_layers=2,
+        fps=fps,
+        sample_rate=audio_sr,
+    ),
+    teacher=None,  # targets come from the DistillationTrainer
+    feature_loss_weight=1.0,  # MSE to the teacher's encoder output, needs distill.cache_hidden
+    output_loss_weight=1.0,  # L1 to the teacher's expressions
+    init_from_teacher=True,  # copy teacher weights with matching names and shapes
+    freeze_decoder=False,
+    criteria=[],  # unlabeled audio, no ground truth term
+)
+
+distill = dict(
+    teacher=dict(
+        type="Audio2Expression",
+        pretrained_encoder_type='wav2vec',
+        pretrained_encoder_path='facebook/wav2vec2-base-960h',
+        wav2vec2_config_path = 'configs/wav2vec2_config.json',
+        num_identity_classes=5016,
+        identity_feat_dim=64,
+        hidden_dim=512,
+        expression_dim=52,
+        norm_type='ln',
+        use_transformer=True,
+        num_attention_heads=8,
+        num_transformer_layers=6,
+        fps=fps,
+        sample_rate=audio_sr,
+    ),
+    teacher_weight='pretrained_models/lam_audio2exp.tar',
+    cache_dir='cache/teacher_targets',  # teacher outputs on disk, filled during the first epoch
+    cache_hidden=True,  # also cache teacher encoder outputs [T, 768] for the feature loss (~15x the disk)
+)
+
+optimizer = dict(type="AdamW", lr=1e-4, weight_decay=0.01)
+scheduler = dict(type="CosineAnnealingLR", eta_min=1e-6)
+
+dataset_type = 'audio2exp'
+data_root = './'
+data = dict(
+    train=dict(
+        type=dataset_type,
+        split="train",
+        data_root=data_root,
+        test_mode=False,
+    ),
+    val=dict(
+        type=dataset_type,
+        split="val",
+        data_root=data_root,
+        test_mode=False,
+    ),
+    test=dict(
+        type=dataset_type,
+        split="val",
+        data_root=data_root,
+        test_mode=True
+        ),
+)
+
+# hook
+hooks = [
+    dict(type="CheckpointLoader"),
+    dict(type="IterationTimer", warmup_iter=2),
+    dict(type="InformationWriter"),
+    dict(type="CheckpointSaver", save_freq=None),
+]
+
+# Trainer
+train = dict(type="DistillationTrainer")
+
+# Tester
+infer = dict(type="Audio2ExpressionInfer",
+             verbose=True)
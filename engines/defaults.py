@@ -144,4 +144,48 @@ def default_setup(cfg):
     rank = comm.get_rank()
     seed = None if cfg.seed is None else cfg.seed * cfg.num_worker_per_gpu + rank
     set_seed(seed)
+    setup_model_fps(cfg)
+    setup_compile(cfg)
     return cfg
+
+
+def setup_model_fps(cfg):
+    """
+    Sets ``fps`` of the model configs (``model.backbone``, ``model.teacher``, ``distill.teacher``)
+    to ``cfg.fps``. The config files copy the top-level value when they are read, so without this
+    an ``--options fps=60`` override (or a later ``cfg.fps`` change) would not reach the model.
+    """
+    if cfg.get("fps", None) is None:
+        return
+    model = cfg.get("model", None) or {}
+    distill = cfg.get("distill", None) or {}
+    for model_cfg in (model.get("backbone", None), model.get("teacher", None), distill.get("teacher", None)):
+        if model_cfg is not None and "fps" in model_cfg:
+            model_cfg["fps"] = cfg.fps
+
+
+def setup_compile(cfg):
+    """
+    Process-wide torch.compile settings for ``cfg.compile_model`` (no-op otherwise), applied once
+    at startup by default_setup, before any engine compiles: the inductor kernel cache directory
+    (``cfg.compile_cache_dir`` -> TORCHINDUCTOR_CACHE_DIR), the FX graph cache, and a dynamo
+    recompile limit large enough for one graph per compile bucket and batch size plus the
+    streaming window. They affect every compiled model of the process.
+    """
+    if not cfg.get("compile_model", False):
+        return
+    import torch
+    if not hasattr(torch, "compile"):
+        raise RuntimeError("compile_model requires torch>=2.0")
+    import torch._dynamo as dynamo
+    import torch._inductor.config as inductor_config
+
+    cache_dir = cfg.get("compile_cache_dir", None)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        os.environ["TORCHINDUCTOR_CACHE_DIR"] = os.path.abspath(cache_dir)
+    if hasattr(inductor_config, "fx_graph_cache"):
+        inductor_config.fx_graph_cache = True
+    buckets = len(cfg.get("compile_buckets_seconds", []))
+    dynamo.config.cache_size_limit = max(dynamo.config.cache_size_limit,
+                                         buckets * cfg.get("infer_batch_size", 8) + 1)
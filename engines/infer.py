@@ -16,8 +16,14 @@ limitations under the License.
 """
 
 import os
+import glob
+import contextlib
 import math
 import time
+import shutil
+import tempfile
+import threading
+import subprocess
 import librosa
 import numpy as np
 from collections import OrderedDict
@@ -29,18 +35,111 @@ import torch.nn.functional as F
 from .defaults import create_ddp_model
 import utils.comm as comm
 from models import build_model
+from models.network import prune_inference_modules, is_pruned_key, DECODER_HEAD_MODULES
+from models.default import backbone_state_dict
 from utils.logger import get_root_logger
 from utils.registry import Registry
+from utils.events import EventStorage, JSONWriter
+from utils.timer import StageTimer
 from utils.misc import (
     AverageMeter,
 )
 
 from models.utils import smooth_mouth_movements, apply_frame_blending, apply_savitzky_golay_smoothing, apply_random_brow_movement, \
     symmetrize_blendshapes, apply_random_eye_blinks, apply_random_eye_blinks_context, export_blendshape_animation, \
-    RETURN_CODE, DEFAULT_CONTEXT, ARKitBlendShape
+    resample_frames, resample_frames_streaming, RETURN_CODE, DEFAULT_CONTEXT, ARKitBlendShape, IdleMotionGenerator
+from models.feature_cache import ArrayDiskCache, FEATURE_CACHE_LEVELS, audio_hash, module_fingerprint
 
 INFER = Registry("infer")
 
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg", ".m4a")
+
+# cfg.infer_precision -> autocast dtype of model forwards (None: plain float32)
+INFER_PRECISIONS = dict(fp32=None, bf16=torch.bfloat16, fp16=torch.float16)
+
+# cfg keys an InferRequest may override: they only change inputs and post-processing, not the loaded model
+REQUEST_OVERRIDES = ("id_idx", "ex_vol", "movement_smooth", "brow_movement", "output_fps", "frame_interpolation",
+                     "export_quantization", "infer_batch_size", "infer_max_batch_seconds", "streaming_window_seconds",
+                     "idle_motion_seed")
+
+
+def pad_arrays(arrays: list) -> np.ndarray:
+    """Stacks float32 arrays that differ in their last dimension, zero-padded to the longest."""
+    padded = np.zeros((len(arrays),) + arrays[0].shape[:-1] + (max(a.shape[-1] for a in arrays),), dtype=np.float32)
+    for row, array in enumerate(arrays):
+        padded[row, ..., :array.shape[-1]] = array
+    return padded
+
+
+class InferRequest:
+    """Inputs and cfg overrides of one ``Audio2ExpressionInfer.infer`` call.
+
+    Carries everything that used to be written into the shared cfg before a call, so one engine
+    can serve concurrent requests from a thread pool.
+
+    Example:
+        infer.infer(InferRequest(audio_input="speech.wav", id_idx=12, output_fps=60))
+        infer.infer(InferRequest(speech_array=audio, sample_rate=16000, save_json_path="out.json"))
+    """
+
+    def __init__(self,
+                 audio_input: str = None,
+                 speech_array: np.ndarray = None,
+                 sample_rate: int = None,
+                 save_json_path: str = None,
+                 **overrides):
+        """
+        Args:
+            audio_input: Audio file, or a directory of audio files (one json per file in ``cfg.save_path``)
+            speech_array: In-memory mono waveform, used instead of ``audio_input``
+            sample_rate: Sample rate of ``speech_array`` (``cfg.audio_sr`` if None)
+            save_json_path: Animation json written for a single clip; for a directory, any
+                            non-None value enables the per-file export. None: no export
+            overrides: Values of ``REQUEST_OVERRIDES`` cfg keys for this request; None values are ignored
+
+        Raises:
+            ValueError: If neither or both audio inputs are given, or an override is not in ``REQUEST_OVERRIDES``
+        """
+        if (audio_input is None) == (speech_array is None):
+            raise ValueError("InferRequest needs exactly one of audio_input and speech_array")
+        unknown = sorted(set(overrides) - set(REQUEST_OVERRIDES))
+        if unknown:
+            raise ValueError(f"cfg keys {unknown} cannot be overridden per request, allowed: {REQUEST_OVERRIDES}")
+        self.audio_input = audio_input
+        self.speech_array = speech_array
+        self.sample_rate = sample_rate
+        self.save_json_path = save_json_path
+        self.overrides = {key: value for key, value in overrides.items() if value is not None}
+
+
+class RequestConfig:
+    """Read-only view of a cfg with per-request overrides on top (see ``InferBase.request_config``)."""
+
+    def __init__(self, cfg, overrides: dict):
+        object.__setattr__(self, "_cfg", cfg)
+        object.__setattr__(self, "_overrides", overrides)
+
+    def __getattr__(self, name):
+        overrides = object.__getattribute__(self, "_overrides")
+        if name in overrides:
+            return overrides[name]
+        return getattr(object.__getattribute__(self, "_cfg"), name)
+
+    def __getitem__(self, name):
+        return self._overrides[name] if name in self._overrides else self._cfg[name]
+
+    def __contains__(self, name):
+        return name in self._overrides or name in self._cfg
+
+    def get(self, name, default=None):
+        return self._overrides[name] if name in self._overrides else self._cfg.get(name, default)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"cfg is read-only during a request, pass {name} as an InferRequest override")
+
+    __setitem__ = __setattr__
+
+
 class InferBase:
     def __init__(self, cfg, model=None, verbose=False) -> None:
         torch.multiprocessing.set_sharing_strategy("file_system")
@@ -49,7 +148,10 @@ class InferBase:
             file_mode="a" if cfg.resume else "w",
         )
         self.logger.info("=> Loading config ...")
-        self.cfg = cfg
+        # treated as immutable once the engine is built, per-call values go through request_config
+        self._cfg = cfg
+        self._request_local = threading.local()
+        self.device = torch.device(cfg.get("device", "cuda"))
         self.verbose = verbose
         if self.verbose:
             self.logger.info(f"Save path: {cfg.save_path}")
@@ -60,18 +162,48 @@ class InferBase:
         else:
             self.model = model
 
+    @property
+    def cfg(self):
+        """The engine cfg, seen through the overrides of the request running on this thread."""
+        return getattr(self._request_local, "cfg", None) or self._cfg
+
+    @contextlib.contextmanager
+    def request_config(self, overrides: dict = None):
+        """
+        Applies cfg ``overrides`` (``REQUEST_OVERRIDES`` keys) to ``self.cfg`` on this thread only.
+        Nested calls layer their overrides on top of the enclosing ones.
+        """
+        if not overrides:
+            yield
+            return
+        unknown = sorted(set(overrides) - set(REQUEST_OVERRIDES))
+        if unknown:
+            raise ValueError(f"cfg keys {unknown} cannot be overridden per request, allowed: {REQUEST_OVERRIDES}")
+        previous = getattr(self._request_local, "cfg", None)
+        self._request_local.cfg = RequestConfig(self.cfg, overrides)
+        try:
+            yield
+        finally:
+            self._request_local.cfg = previous
+
     def build_model(self):
         model = build_model(self.cfg.model)
+        pruned = self.pruned_modules = []
+        if self.cfg.get("prune_unused_modules", False):
+            n_before = sum(p.numel() for p in model.parameters())
+            pruned = self.pruned_modules = prune_inference_modules(model)
+            n_pruned = n_before - sum(p.numel() for p in model.parameters())
+            self.logger.info(f"Pruned {n_pruned} unused params ({n_pruned * 4 / 2 ** 20:.1f} MB fp32): {', '.join(pruned)}")
         n_parameters = sum(p.numel() for p in model.parameters() if p.requires_grad)
         self.logger.info(f"Num params: {n_parameters}")
         model = create_ddp_model(
-            model.cuda(),
+            model.to(self.device),
             broadcast_buffers=False,
             find_unused_parameters=self.cfg.find_unused_parameters,
         )
         if os.path.isfile(self.cfg.weight):
             self.logger.info(f"Loading weight at: {self.cfg.weight}")
-            checkpoint = torch.load(self.cfg.weight)
+            checkpoint = torch.load(self.cfg.weight, map_location=self.device)
             weight = OrderedDict()
             for key, value in checkpoint["state_dict"].items():
                 if key.startswith("module."):
@@ -80,6 +212,8 @@ class InferBase:
                 else:
                     if comm.get_world_size() > 1:
                         key = "module." + key  # xxx.xxx -> module.xxx.xxx
+                if is_pruned_key(key[7:] if key.startswith("module.") else key, pruned):
+                    continue
                 weight[key] = value
             model.load_state_dict(weight, strict=True)
             self.logger.info(
@@ -99,89 +233,637 @@ class InferBase:
 
 @INFER.register_module()
 class Audio2ExpressionInfer(InferBase):
-    def infer(self):
+    def __init__(self, cfg, model=None, verbose=False) -> None:
+        super().__init__(cfg, model=model, verbose=verbose)
+        self.precision = cfg.get("infer_precision", "fp32")
+        if self.precision not in INFER_PRECISIONS:
+            raise ValueError(f"infer_precision must be one of {tuple(INFER_PRECISIONS)}, got {self.precision}")
+        if self.precision == "fp16" and self.device.type != "cuda":
+            raise ValueError("infer_precision='fp16' needs a CUDA device, use 'bf16' on CPU")
+        if cfg.get("fused_inference", False):
+            self.backbone.fuse_inference_blocks()
+        if hasattr(self.backbone.audio_encoder, "set_attention_implementation"):
+            self.backbone.audio_encoder.set_attention_implementation(cfg.get("encoder_attention", "eager"))
+        if hasattr(self.backbone.audio_encoder, "set_feature_chunk"):
+            self.backbone.audio_encoder.set_feature_chunk(cfg.get("feature_chunk_seconds", None), cfg.audio_sr)
+        # serializes set_encoder_layers, which swaps decoder head weights in place
+        self._encoder_layers_lock = threading.Lock()
+        self.set_encoder_layers(cfg.get("encoder_layers", None))
+        self.timer = self.build_timer()
+        # built once here, request threads only read it
+        self.feature_cache = self.build_feature_cache()
+        self.compiled_model = self.build_compiled_model()
+        if self.compiled_model is not None and cfg.get("compile_warmup", False):
+            self.warmup_compiled_model()
+
+    def set_encoder_layers(self, num_layers=None):
+        """
+        Early exit: run only the first ``num_layers`` wav2vec transformer layers (None: all).
+
+        If ``cfg.encoder_layer_heads`` maps this depth to a checkpoint, its fine-tuned
+        DECODER_HEAD_MODULES replace the current ones (the checkpoint's head is restored for
+        depths without one). The weights are swapped in place under a lock, so concurrent calls
+        are serialized, but this is an engine-wide setting, not a per-request one: requests
+        running while it switches may see either head. Switch between requests.
+        """
+        with self._encoder_layers_lock:
+            backbone = self.backbone
+            heads = {int(k): v for k, v in (self.cfg.get("encoder_layer_heads", None) or {}).items()}
+            if heads:
+                if not hasattr(self, "_decoder_heads"):
+                    # the loaded checkpoint's head, used at every depth without its own
+                    self._decoder_heads = {None: {key: value.detach().clone() for key, value in backbone.state_dict().items()
+                                                  if key.split(".", 1)[0] in DECODER_HEAD_MODULES}}
+                    self._active_head = None
+                head = num_layers if num_layers in heads else None
+                if head not in self._decoder_heads:
+                    self._decoder_heads[head] = backbone_state_dict(heads[head], DECODER_HEAD_MODULES)
+                if head != self._active_head:
+                    backbone.load_state_dict(self._decoder_heads[head], strict=False)
+                    self._active_head = head
+                    if backbone.fused_decoder is not None:
+                        backbone.fuse_inference_blocks()
+                        if hasattr(self, "timer"):
+                            self.timer.attach(backbone.fused_identity_net, "identity_encoder")
+                            self.timer.attach(backbone.fused_decoder, "decoder")
+                    self.logger.info(f"Decoder head for {num_layers} encoder layers: {heads.get(head, self.cfg.weight)}")
+            backbone.encoder_layers = num_layers
+
+    @property
+    def output_fps(self):
+        """Frame rate of returned expressions; model outputs are resampled from ``cfg.fps``."""
+        return self.cfg.get("output_fps", None) or self.cfg.fps
+
+    @property
+    def backbone(self):
+        model = self.model.module if hasattr(self.model, "module") else self.model
+        return model.backbone
+
+    def build_timer(self):
+        enabled = self.cfg.get("profile_latency", False)
+        if not enabled:
+            return StageTimer(enabled=False)
+        storage = EventStorage()
+        writers = [JSONWriter(os.path.join(self.cfg.save_path, "latency.json"))] if comm.is_main_process() else []
+        timer = StageTimer(storage=storage,
+                           writers=writers,
+                           window_size=self.cfg.get("latency_window_size", 1000),
+                           write_period=self.cfg.get("latency_write_period", 20),
+                           cuda_sync=self.device.type == "cuda")
+        backbone = self.backbone
+        # extract_features, not feature_extractor.forward: the padded and chunked paths run its conv layers directly
+        timer.attach_method(backbone.audio_encoder, "extract_features", "encoder_feature_extractor")
+        timer.attach(backbone.audio_encoder.encoder, "encoder_transformer")
+        if backbone.fused_decoder is not None:
+            # the fused path bypasses identity_encoder.forward, its transformer is not timed
+            timer.attach(backbone.fused_identity_net, "identity_encoder")
+            timer.attach(backbone.fused_decoder, "decoder")
+        else:
+            timer.attach(backbone.identity_encoder, "identity_encoder")
+            timer.attach(backbone.decoder[0], "decoder")
+        self.logger.info(f"Latency profiling enabled, writing to {os.path.join(self.cfg.save_path, 'latency.json')}")
+        return timer
+
+    def build_compiled_model(self):
+        """
+        torch.compile'd ``self.model`` (None unless ``cfg.compile_model``), see ``forward_model``.
+
+        Graphs are specialized on input shapes (dynamic=False): the streaming window is one shape,
+        offline audio is zero-padded to ``cfg.compile_buckets_seconds``. The kernel cache directory
+        and the recompile limit are process-wide and set at startup by
+        engines.defaults.setup_compile (called by default_setup), not here.
+        """
+        if not self.cfg.get("compile_model", False):
+            return None
+        if not hasattr(torch, "compile"):
+            raise RuntimeError("compile_model requires torch>=2.0")
+        mode = self.cfg.get("compile_mode", "default")
+        self.logger.info(f"torch.compile (mode={mode}), buckets {self.cfg.get('compile_buckets_seconds')} s, "
+                         f"cache {os.environ.get('TORCHINDUCTOR_CACHE_DIR', 'torch default')}")
+        return torch.compile(self.model, mode=mode, dynamic=False)
+
+    @property
+    def compile_buckets(self):
+        """Padded lengths (samples) of offline audio for the compiled model, ascending."""
+        return sorted(int(round(seconds * self.cfg.audio_sr)) for seconds in self.cfg.get("compile_buckets_seconds", []))
+
+    def forward_model(self, input_dict, bucketed=True):
+        """
+        ``self.model(input_dict)`` in ``cfg.infer_precision``, through the compiled model when
+        ``cfg.compile_model`` is set. ``pred_exp`` is always returned as float32.
+
+        With ``bucketed``, the audio batch is zero-padded to the shortest compile bucket that holds
+        it and run as a masked batch (``audio_lengths``, tensor ``time_steps``,
+        ``padded_time_steps``), so all audio of a bucket shares one graph; ``pred_exp`` is trimmed
+        back to the unpadded frame count. Audio longer than the largest bucket and cached encoder
+        features run eagerly.
+        """
+        with self.autocast():
+            if self.compiled_model is None:
+                output_dict = self.model(input_dict)
+            elif not bucketed:
+                output_dict = self.compiled_model(input_dict)
+            else:
+                padded_dict = self.bucketed_inputs(input_dict)
+                if padded_dict is None:
+                    output_dict = self.model(input_dict)
+                else:
+                    output_dict = self.compiled_model(padded_dict)
+                    output_dict['pred_exp'] = output_dict['pred_exp'][:, :int(padded_dict['time_steps'].max())]
+        output_dict['pred_exp'] = output_dict['pred_exp'].float()
+        return output_dict
+
+    def bucketed_inputs(self, input_dict):
+        """``input_dict`` with its audio zero-padded to a compile bucket, None if no bucket holds it."""
+        audio = input_dict.get('input_audio_array', None)
+        bucket = None if audio is None else next((b for b in self.compile_buckets if b >= audio.shape[1]), None)
+        if bucket is None:
+            return None
+        batch_size = audio.shape[0]
+        time_steps = input_dict['time_steps']
+        time_steps = [time_steps] * batch_size if isinstance(time_steps, int) else [int(t) for t in time_steps]
+        lengths = input_dict.get('audio_lengths', None)
+        lengths = [audio.shape[1]] * batch_size if lengths is None else [int(length) for length in lengths]
+        return dict(input_dict,
+                    input_audio_array=F.pad(audio, (0, bucket - audio.shape[1])),
+                    audio_lengths=torch.tensor(lengths, device=self.device),
+                    time_steps=torch.tensor(time_steps, device=self.device),
+                    padded_time_steps=math.ceil(bucket / self.cfg.audio_sr * self.cfg.fps))
+
+    def autocast(self):
+        """Autocast context of ``cfg.infer_precision`` (a no-op for 'fp32')."""
+        dtype = INFER_PRECISIONS[self.precision]
+        if dtype is None:
+            return contextlib.nullcontext()
+        return torch.autocast(device_type=self.device.type, dtype=dtype)
+
+    def warmup_compiled_model(self):
+        """Compiles the graph of every offline bucket and of the streaming window ahead of the first request."""
+        start = time.time()
+        self.model.eval()
+        for bucket in self.compile_buckets:
+            self.infer_audio_array(np.zeros(bucket, dtype=np.float32), self.cfg.audio_sr)
+        self._infer_streaming_audio(np.zeros(self.cfg.audio_sr // 10, dtype=np.float32), self.cfg.audio_sr, None)
+        self.logger.info(f"Compiled {len(self.compile_buckets)} offline buckets and the streaming window "
+                         f"in {time.time() - start:.1f} s")
+
+    def infer(self, request: InferRequest = None):
+        """Runs one request: an audio file, a directory of audio files or an in-memory waveform.
+
+        Args:
+            request: Inputs and cfg overrides; None builds one from ``cfg.audio_input`` / ``cfg.save_json_path``
+
+        Returns:
+            Post-processed blendshape weights [num_frames, 52], or a dict of them by file name for a directory
+        """
+        if request is None:
+            request = InferRequest(audio_input=self.cfg.audio_input, save_json_path=self.cfg.get("save_json_path", None))
         logger = get_root_logger()
         logger.info(">>>>>>>>>>>>>>>> Start Inference >>>>>>>>>>>>>>>>")
-        batch_time = AverageMeter()
         self.model.eval()
 
+        with self.request_config(request.overrides):
+            if request.speech_array is not None:
+                pred_exp = self.infer_audio_array(request.speech_array, request.sample_rate or self.cfg.audio_sr)
+                self.export(pred_exp, request.save_json_path)
+                return pred_exp
+
+            if os.path.isdir(request.audio_input):
+                return self.infer_directory(request.audio_input,
+                                            self.cfg.save_path if request.save_json_path is not None else None)
+
+            with self.timer.request():
+                pred_exp = self.infer_audio_file(request.audio_input)
+                self.export(pred_exp, request.save_json_path)
+
+        logger.info("<<<<<<<<<<<<<<<<< End Evaluation <<<<<<<<<<<<<<<<<")
+        return pred_exp
+
+    def infer_audio_file(self, audio_path: str) -> np.ndarray:
+        """Offline inference on one audio file, after vocal separation when ``cfg.ex_vol`` is set."""
+        logger = get_root_logger()
+        batch_time = AverageMeter()
         # process audio-input
-        assert os.path.exists(self.cfg.audio_input)
-        if(self.cfg.ex_vol):
-            logger.info("Extract vocals ...")
-            vocal_path = self.extract_vocal_track(self.cfg.audio_input)
-            logger.info("=> Extract vocals at: {}".format(vocal_path if os.path.exists(vocal_path) else '... Failed'))
-            if(os.path.exists(vocal_path)):
-                self.cfg.audio_input = vocal_path
+        assert os.path.exists(audio_path)
+        with contextlib.ExitStack() as stack:
+            if(self.cfg.ex_vol):
+                logger.info("Extract vocals ...")
+                with self.timer.stage("vocal_separation"):
+                    vocal_path = self.extract_vocal_track(audio_path, stack.enter_context(self.vocal_track_dir()))
+                logger.info("=> Extract vocals at: {}".format(vocal_path if os.path.exists(vocal_path) else '... Failed'))
+                if(os.path.exists(vocal_path)):
+                    audio_path = vocal_path
 
-        with torch.no_grad():
-            input_dict = {}
-            input_dict['id_idx'] = F.one_hot(torch.tensor(self.cfg.id_idx),
-                                             self.cfg.model.backbone.num_identity_classes).cuda(non_blocking=True)[None,...]
-            speech_array, ssr = librosa.load(self.cfg.audio_input, sr=16000)
-            input_dict['input_audio_array'] = torch.FloatTensor(speech_array).cuda(non_blocking=True)[None,...]
-
-            end = time.time()
-            output_dict = self.model(input_dict)
-            batch_time.update(time.time() - end)
-
-            logger.info(
-                "Infer: [{}] "
-                "Running Time: {batch_time.avg:.3f} ".format(
-                    self.cfg.audio_input,
-                    batch_time=batch_time,
-                )
+            with self.timer.stage("audio_load"):
+                speech_array, ssr = librosa.load(audio_path, sr=16000)
+
+        end = time.time()
+        pred_exp = self.infer_audio_array(speech_array, ssr)
+        batch_time.update(time.time() - end)
+
+        logger.info(
+            "Infer: [{}] "
+            "Running Time: {batch_time.avg:.3f} ".format(
+                audio_path,
+                batch_time=batch_time,
             )
+        )
+        return pred_exp
 
-        out_exp = output_dict['pred_exp'].squeeze().cpu().numpy()
+    def export(self, pred_exp: np.ndarray, json_path: str) -> None:
+        """Writes an animation json (``cfg.export_quantization``) unless ``json_path`` is None."""
+        if json_path is None:
+            return
+        with self.timer.stage("export"):
+            export_blendshape_animation(pred_exp,
+                                        json_path,
+                                        ARKitBlendShape,
+                                        fps=self.output_fps,
+                                        quantization=self.cfg.get("export_quantization", None))
+
+    def infer_directory(self, audio_dir: str, save_dir: str = None) -> dict:
+        """Batched inference over every audio file in ``audio_dir``, one json per file in ``save_dir`` (None: no export)."""
+        logger = get_root_logger()
+        paths = sorted(p for p in glob.glob(os.path.join(audio_dir, "*")) if p.lower().endswith(AUDIO_EXTENSIONS))
+        names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+        with contextlib.ExitStack() as stack:
+            if self.cfg.ex_vol:
+                logger.info("Extract vocals ...")
+                with self.timer.stage("vocal_separation"):
+                    vocal_dir = stack.enter_context(self.vocal_track_dir())
+                    vocal_paths = [self.extract_vocal_track(path, vocal_dir) for path in paths]
+                paths = [vocal if os.path.exists(vocal) else path for path, vocal in zip(paths, vocal_paths)]
+
+            with self.timer.stage("audio_load"):
+                speech_arrays = [librosa.load(path, sr=self.cfg.audio_sr)[0] for path in paths]
+
+        end = time.time()
+        pred_exps = self.infer_batch(speech_arrays, self.cfg.audio_sr)
+        logger.info("Infer: [{} files in {}] Running Time: {:.3f} ".format(len(paths), audio_dir, time.time() - end))
+
+        if save_dir is not None:
+            for name, pred_exp in zip(names, pred_exps):
+                self.export(pred_exp, os.path.join(save_dir, name + ".json"))
+
+        logger.info("<<<<<<<<<<<<<<<<< End Evaluation <<<<<<<<<<<<<<<<<")
+        return dict(zip(names, pred_exps))
+
+    def infer_audio_array(self,
+                          speech_array: np.ndarray,
+                          ssr: int,
+                          id_idx: int = None) -> np.ndarray:
+        """Runs offline inference on an in-memory waveform.
+
+        Args:
+            speech_array: Mono waveform sampled at ``ssr``
+            ssr: Sample rate of ``speech_array``
+            id_idx: Identity style index (``cfg.id_idx`` if None)
+
+        Returns:
+            Post-processed blendshape weights [num_frames, 52]
+        """
+        if id_idx is None:
+            id_idx = self.cfg.id_idx
+
+        with self.timer.request():
+            if ssr != self.cfg.audio_sr:
+                with self.timer.stage("resample"):
+                    speech_array = librosa.resample(speech_array.astype(np.float32), orig_sr=ssr, target_sr=self.cfg.audio_sr)
+                ssr = self.cfg.audio_sr
+
+            with torch.no_grad():
+                input_dict = self.audio_inputs([speech_array], ssr)
+                with self.timer.stage("device_transfer"):
+                    input_dict['id_idx'] = F.one_hot(torch.tensor(id_idx),
+                                                     self.cfg.model.backbone.num_identity_classes).to(self.device, non_blocking=True)[None,...]
+                with self.timer.stage("model"):
+                    output_dict = self.forward_model(input_dict)
+
+            with self.timer.stage("device_transfer"):
+                out_exp = output_dict['pred_exp'].squeeze().cpu().numpy()
 
-        frame_length = math.ceil(speech_array.shape[0] / ssr * 30)
-        volume = librosa.feature.rms(y=speech_array, frame_length=int(1 / 30 * ssr), hop_length=int(1 / 30 * ssr))[0]
-        if (volume.shape[0] > frame_length):
-            volume = volume[:frame_length]
+            return self.offline_postprocess(out_exp, speech_array, ssr)
+
+    def infer_batch(self,
+                    speech_arrays: list,
+                    ssr: int,
+                    id_idx: int = None,
+                    batch_size: int = None,
+                    max_batch_seconds: float = None) -> list:
+        """Runs offline inference on many waveforms in length-bucketed, zero-padded batches.
+
+        Clips are sorted by length and cut into batches of at most ``batch_size`` clips (and at
+        most ``max_batch_seconds`` of padded audio), so clips of similar length share a batch.
+        Padding is masked through the encoder and decoder, every output is trimmed to its own
+        frame count and post-processed as in ``infer_audio_array``.
+
+        Args:
+            speech_arrays: Mono waveforms sampled at ``ssr``
+            ssr: Sample rate of the waveforms
+            id_idx: Identity style index (``cfg.id_idx`` if None)
+            batch_size: Clips per forward pass (``cfg.infer_batch_size`` if None)
+            max_batch_seconds: Cap on batch_size x longest clip in seconds
+                               (``cfg.infer_max_batch_seconds`` if None, no cap when unset)
+
+        Returns:
+            Post-processed blendshape weights [num_frames, 52] per input, in input order
+        """
+        if id_idx is None:
+            id_idx = self.cfg.id_idx
+        if batch_size is None:
+            batch_size = self.cfg.get("infer_batch_size", 8)
+        if max_batch_seconds is None:
+            max_batch_seconds = self.cfg.get("infer_max_batch_seconds", None)
+
+        if ssr != self.cfg.audio_sr:
+            with self.timer.stage("resample"):
+                speech_arrays = [librosa.resample(np.asarray(a, dtype=np.float32), orig_sr=ssr, target_sr=self.cfg.audio_sr)
+                                 for a in speech_arrays]
+            ssr = self.cfg.audio_sr
+
+        results = [None] * len(speech_arrays)
+        for batch in self.length_buckets([a.shape[0] for a in speech_arrays], ssr, batch_size, max_batch_seconds):
+            with self.timer.request():
+                clips = [speech_arrays[i] for i in batch]
+                time_steps = [math.ceil(clip.shape[0] / ssr * self.cfg.fps) for clip in clips]
+
+                with torch.no_grad():
+                    input_dict = self.audio_inputs(clips, ssr)
+                    with self.timer.stage("device_transfer"):
+                        input_dict['id_idx'] = F.one_hot(torch.tensor([id_idx] * len(clips)),
+                                                         self.cfg.model.backbone.num_identity_classes).to(self.device, non_blocking=True)
+                    with self.timer.stage("model"):
+                        output_dict = self.forward_model(input_dict)
+                    with self.timer.stage("device_transfer"):
+                        pred_exp = output_dict['pred_exp'].cpu().numpy()
+
+                for row, index in enumerate(batch):
+                    results[index] = self.offline_postprocess(pred_exp[row, :time_steps[row]], clips[row], ssr)
+        return results
+
+    def infer_identities(self,
+                         speech_array: np.ndarray,
+                         ssr: int,
+                         id_indices: list,
+                         batch_size: int = None) -> list:
+        """Renders one waveform for several identities with a single audio encoder pass.
+
+        The encoder output (or the feature cache entry) is shared, only ``Audio2Expression.decode``
+        (feature projection, identity encoder, decoder) runs for every identity, in batches of
+        ``batch_size`` identities.
+
+        Args:
+            speech_array: Mono waveform sampled at ``ssr``
+            ssr: Sample rate of ``speech_array``
+            id_indices: Identity style indices
+            batch_size: Identities per decoder pass (``cfg.infer_batch_size`` if None)
+
+        Returns:
+            Post-processed blendshape weights [num_frames, 52] per identity, in ``id_indices`` order
+        """
+        if batch_size is None:
+            batch_size = self.cfg.get("infer_batch_size", 8)
+
+        with self.timer.request():
+            if ssr != self.cfg.audio_sr:
+                with self.timer.stage("resample"):
+                    speech_array = librosa.resample(speech_array.astype(np.float32), orig_sr=ssr, target_sr=self.cfg.audio_sr)
+                ssr = self.cfg.audio_sr
+
+            pred_exps = []
+            with torch.no_grad():
+                input_dict = self.audio_inputs([speech_array], ssr)
+                with self.timer.stage("model"), self.autocast():
+                    if 'hidden_states' in input_dict:
+                        hidden_states = input_dict['hidden_states']
+                    else:
+                        hidden_states, _ = self.backbone.encode(input_dict)
+                    for start in range(0, len(id_indices), batch_size):
+                        ids = list(id_indices[start:start + batch_size])
+                        identity = F.one_hot(torch.tensor(ids),
+                                             self.cfg.model.backbone.num_identity_classes).to(self.device, non_blocking=True)
+                        pred_exps.append(self.backbone.decode(hidden_states.expand(len(ids), -1, -1), identity))
+                with self.timer.stage("device_transfer"):
+                    pred_exps = torch.cat(pred_exps).float().cpu().numpy()
+
+            volume = self.frame_volume(speech_array, ssr)
+            return [self.offline_postprocess(pred_exp, speech_array, ssr, volume) for pred_exp in pred_exps]
+
+    def audio_inputs(self, clips: list, ssr: int) -> dict:
+        """Encoder entries of ``input_dict`` for a batch of clips.
+
+        Zero-padded audio with ``audio_lengths`` (when lengths differ) and ``time_steps``, or the
+        encoder features read from the feature cache when ``cfg.feature_cache_dir`` is set.
+        """
+        time_steps = [math.ceil(clip.shape[0] / ssr * self.cfg.fps) for clip in clips]
+        if self.feature_cache is not None:
+            return self.cached_audio_inputs(clips, ssr, time_steps)
+
+        with self.timer.stage("device_transfer"):
+            lengths = [clip.shape[0] for clip in clips]
+            input_dict = dict(input_audio_array=torch.from_numpy(pad_arrays(clips)).to(self.device, non_blocking=True))
+            if len(set(lengths)) > 1:
+                input_dict['audio_lengths'] = torch.tensor(lengths)
+                input_dict['time_steps'] = time_steps
+            else:
+                input_dict['time_steps'] = time_steps[0]
+        return input_dict
+
+    def build_feature_cache(self):
+        """ArrayDiskCache of encoder outputs (see models/feature_cache.py), None unless ``cfg.feature_cache_dir`` is set."""
+        if not self.cfg.get("feature_cache_dir", None):
+            return None
+        level = self.cfg.get("feature_cache_level", "hidden")
+        if level not in FEATURE_CACHE_LEVELS:
+            raise ValueError(f"feature_cache_level must be one of {FEATURE_CACHE_LEVELS}, got {level}")
+        encoder = self.backbone.audio_encoder
+        # the cached arrays are only valid for the weights they were computed with
+        self._feature_cache_fingerprint = module_fingerprint(
+            encoder.feature_extractor if level == "extractor" else encoder)
+        return ArrayDiskCache(self.cfg.feature_cache_dir)
+
+    def cached_audio_inputs(self, clips: list, ssr: int, time_steps: list) -> dict:
+        level = self.cfg.get("feature_cache_level", "hidden")
+        cache = self.feature_cache
+        with self.timer.stage("feature_cache"):
+            # hidden states also depend on the early-exit depth, keys of full-depth entries are unchanged
+            depth = [] if level != "hidden" or self.backbone.encoder_layers is None else [self.backbone.encoder_layers]
+            keys = [cache.key(level, self._feature_cache_fingerprint, audio_hash(clip, ssr),
+                              steps if level == "hidden" else "", *depth)
+                    for clip, steps in zip(clips, time_steps)]
+            arrays = [cache.get(key) for key in keys]
+
+        missing = [i for i, array in enumerate(arrays) if array is None]
+        if missing:
+            with self.timer.stage("encoder"):
+                computed = self.encode_clips([clips[i] for i in missing], ssr, level)
+            with self.timer.stage("feature_cache"):
+                for i, array in zip(missing, computed):
+                    cache.put(keys[i], array)
+                    arrays[i] = array
+
+        with self.timer.stage("device_transfer"):
+            if level == "hidden":
+                # [T, 768] per clip
+                hidden_states = np.ascontiguousarray(pad_arrays([array.T for array in arrays]).transpose(0, 2, 1))
+                return dict(hidden_states=torch.from_numpy(hidden_states).to(self.device, non_blocking=True),
+                            time_steps=time_steps)
+            # [512, T50] per clip
+            feature_lengths = [array.shape[1] for array in arrays]
+            input_dict = dict(extract_features=torch.from_numpy(pad_arrays(arrays)).to(self.device, non_blocking=True))
+            if len(set(feature_lengths)) > 1:
+                input_dict['feature_lengths'] = feature_lengths
+                input_dict['time_steps'] = time_steps
+            else:
+                input_dict['time_steps'] = time_steps[0]
+        return input_dict
+
+    def encode_clips(self, clips: list, ssr: int, level: str) -> list:
+        """
+        Uncached encoder outputs per clip: conv features [512, T50] ('extractor') or hidden states [T, 768] ('hidden').
+        Always float32 (cache entries do not depend on ``cfg.infer_precision``).
+        """
+        time_steps = [math.ceil(clip.shape[0] / ssr * self.cfg.fps) for clip in clips]
+        lengths = [clip.shape[0] for clip in clips]
+        audio = torch.from_numpy(pad_arrays(clips)).to(self.device)
+        encoder = self.backbone.audio_encoder
+        with torch.no_grad():
+            if level == "extractor":
+                audio_lengths = torch.tensor(lengths, device=self.device) if len(set(lengths)) > 1 else None
+                features = encoder.extract_features(audio, audio_lengths).cpu().numpy()
+                feature_lengths = encoder._get_feat_extract_output_lengths(torch.tensor(lengths)).tolist()
+                return [features[row, :, :length] for row, length in enumerate(feature_lengths)]
+            input_dict = dict(input_audio_array=audio, time_steps=time_steps)
+            if len(set(lengths)) > 1:
+                input_dict['audio_lengths'] = torch.tensor(lengths)
+            else:
+                input_dict['time_steps'] = time_steps[0]
+            hidden_states, _ = self.backbone.encode(input_dict)
+            hidden_states = hidden_states.cpu().numpy()
+        return [hidden_states[row, :steps] for row, steps in enumerate(time_steps)]
+
+    @staticmethod
+    def length_buckets(lengths: list, ssr: int, batch_size: int, max_batch_seconds: float = None) -> list:
+        """Groups clip indices into batches of similar length (shortest first)."""
+        batches, batch = [], []
+        for index in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+            # sorted ascending, so the new clip is the longest of the batch
+            full = len(batch) >= batch_size or (
+                max_batch_seconds is not None and batch
+                and (len(batch) + 1) * lengths[index] / ssr > max_batch_seconds)
+            if full:
+                batches.append(batch)
+                batch = []
+            batch.append(index)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def frame_volume(self, speech_array: np.ndarray, ssr: int) -> np.ndarray:
+        """RMS volume per model frame."""
+        with self.timer.stage("rms"):
+            frame_length = math.ceil(speech_array.shape[0] / ssr * self.cfg.fps)
+            volume = librosa.feature.rms(y=speech_array, frame_length=int(1 / self.cfg.fps * ssr), hop_length=int(1 / self.cfg.fps * ssr))[0]
+            if (volume.shape[0] > frame_length):
+                volume = volume[:frame_length]
+        return volume
+
+    def offline_postprocess(self,
+                            out_exp: np.ndarray,
+                            speech_array: np.ndarray,
+                            ssr: int,
+                            volume: np.ndarray = None) -> np.ndarray:
+        """Volume-driven smoothing, blendshape post-processing and output frame-rate resampling of one clip."""
+        if volume is None:
+            volume = self.frame_volume(speech_array, ssr)
+        idle_motion = self.build_idle_motion(blink_at_start=True, blink_interval=(60, 120))
 
         if(self.cfg.movement_smooth):
-            out_exp = smooth_mouth_movements(out_exp, 0, volume)
+            with self.timer.stage("post_smooth_mouth"):
+                out_exp = smooth_mouth_movements(out_exp, 0, volume)
 
         if (self.cfg.brow_movement):
-            out_exp = apply_random_brow_movement(out_exp, volume)
+            with self.timer.stage("post_brow_movement"):
+                out_exp = apply_random_brow_movement(out_exp, volume, idle_motion)
 
-        pred_exp = self.blendshape_postprocess(out_exp)
+        out_exp = self.blendshape_postprocess(out_exp, idle_motion)
 
-        if(self.cfg.save_json_path is not None):
-            export_blendshape_animation(pred_exp,
-                                        self.cfg.save_json_path,
-                                        ARKitBlendShape,
-                                        fps=self.cfg.fps)
+        if self.output_fps != self.cfg.fps:
+            with self.timer.stage("post_resample"):
+                out_exp = np.clip(resample_frames(out_exp,
+                                                  self.cfg.fps,
+                                                  self.output_fps,
+                                                  self.cfg.get("frame_interpolation", "monotone")), 0, 1)
+        return out_exp
 
-        logger.info("<<<<<<<<<<<<<<<<< End Evaluation <<<<<<<<<<<<<<<<<")
+    def build_idle_motion(self, **kwargs) -> IdleMotionGenerator:
+        """Blink / brow generator of one clip or stream at ``cfg.fps``, seeded with ``cfg.idle_motion_seed`` (None: random)."""
+        return IdleMotionGenerator(self.cfg.get("idle_motion_seed", None), fps=self.cfg.fps, **kwargs)
+
+    @property
+    def streaming_window_samples(self):
+        """
+        Audio samples the model sees per streaming call (stream history + the new chunk),
+        ``cfg.streaming_window_seconds``. Chunks must not be longer; change it between streams only.
+        """
+        return int(self.cfg.get("streaming_window_seconds", 64 / 30) * self.cfg.audio_sr)
 
     def infer_streaming_audio(self,
                            audio: np.ndarray,
                            ssr: float,
-                           context: dict):
+                           context: dict,
+                           overrides: dict = None):
+        """Processes one chunk of a stream; ``overrides`` are per-stream cfg values (``REQUEST_OVERRIDES``),
+        pass the same ones with every chunk of a stream."""
+        with self.timer.request(), self.request_config(overrides):
+            return self._infer_streaming_audio(audio, ssr, context)
+
+    def _infer_streaming_audio(self,
+                               audio: np.ndarray,
+                               ssr: float,
+                               context: dict):
 
         if (context is None):
             context = DEFAULT_CONTEXT.copy()
-        max_frame_length = 64
+        # the model sees a fixed window of audio: the history of the stream + this chunk
+        window_audio_length = self.streaming_window_samples
+        max_frame_length = math.ceil(window_audio_length / self.cfg.audio_sr * self.cfg.fps)
 
-        frame_length = math.ceil(audio.shape[0] / ssr * 30)
+        # frames owed to this chunk, counted from the start of the stream so chunks that are not a
+        # whole number of frames (e.g. 250 ms at 30 fps) neither drift nor duplicate frames
+        streamed_samples = context.get('streamed_samples', 0)
+        frame_length = (math.ceil((streamed_samples + audio.shape[0]) * self.cfg.fps / ssr)
+                        - math.ceil(streamed_samples * self.cfg.fps / ssr))
         output_context = DEFAULT_CONTEXT.copy()
+        output_context['streamed_samples'] = streamed_samples + audio.shape[0]
+        # one blink schedule per stream, kept across chunks
+        idle_motion = context.get('idle_motion') or self.build_idle_motion()
+        output_context['idle_motion'] = idle_motion
+        frame_offset = math.ceil(streamed_samples * self.cfg.fps / ssr)
 
-        volume = librosa.feature.rms(y=audio, frame_length=int(1 / 30 * ssr), hop_length=int(1 / 30 * ssr))[0]
-        if (volume.shape[0] > frame_length):
-            volume = volume[:frame_length]
+        with self.timer.stage("rms"):
+            volume = librosa.feature.rms(y=audio, frame_length=int(1 / self.cfg.fps * ssr), hop_length=int(1 / self.cfg.fps * ssr))[0]
+            if (volume.shape[0] > frame_length):
+                volume = volume[:frame_length]
 
         # resample audio
         if (ssr != self.cfg.audio_sr):
-            in_audio = librosa.resample(audio.astype(np.float32), orig_sr=ssr, target_sr=self.cfg.audio_sr)
+            with self.timer.stage("resample"):
+                in_audio = librosa.resample(audio.astype(np.float32), orig_sr=ssr, target_sr=self.cfg.audio_sr)
         else:
             in_audio = audio.copy()
 
-        start_frame = int(max_frame_length - in_audio.shape[0] / self.cfg.audio_sr * 30)
+        if in_audio.shape[0] > window_audio_length:
+            self.logger.error('Error: audio chunk of {:.3f} s is longer than the streaming window of {:.3f} s'.format(
+                in_audio.shape[0] / self.cfg.audio_sr, window_audio_length / self.cfg.audio_sr))
+            return {"code": RETURN_CODE['AUDIO_LENGTH_ERROR'],
+                    "expression": None,
+                    "headpose": None}, context
+
+        start_frame = max_frame_length - frame_length
 
         if (context['is_initial_input'] or (context['previous_audio'] is None)):
-            blank_audio_length = self.cfg.audio_sr * max_frame_length // 30 - in_audio.shape[0]
+            blank_audio_length = window_audio_length - in_audio.shape[0]
             blank_audio = np.zeros(blank_audio_length, dtype=np.float32)
 
             # pre-append
@@ -189,34 +871,43 @@ class Audio2ExpressionInfer(InferBase):
             output_context['previous_audio'] = input_audio
 
         else:
-            clip_pre_audio_length = self.cfg.audio_sr * max_frame_length // 30 - in_audio.shape[0]
+            clip_pre_audio_length = window_audio_length - in_audio.shape[0]
             clip_pre_audio = context['previous_audio'][-clip_pre_audio_length:]
             input_audio = np.concatenate([clip_pre_audio, in_audio])
             output_context['previous_audio'] = input_audio
 
         with torch.no_grad():
             try:
-                input_dict = {}
-                input_dict['id_idx'] = F.one_hot(torch.tensor(self.cfg.id_idx),
-                                                 self.cfg.model.backbone.num_identity_classes).cuda(non_blocking=True)[
-                    None, ...]
-                input_dict['input_audio_array'] = torch.FloatTensor(input_audio).cuda(non_blocking=True)[None, ...]
-                output_dict = self.model(input_dict)
-                out_exp = output_dict['pred_exp'].squeeze().cpu().numpy()[start_frame:, :]
-            except:
-                self.logger.error('Error: faided to predict expression.')
-                output_dict['pred_exp'] = torch.zeros((max_frame_length, 52)).float()
-                return
+                with self.timer.stage("device_transfer"):
+                    input_dict = {}
+                    input_dict['id_idx'] = F.one_hot(torch.tensor(self.cfg.id_idx),
+                                                     self.cfg.model.backbone.num_identity_classes).to(self.device, non_blocking=True)[
+                        None, ...]
+                    input_dict['input_audio_array'] = torch.FloatTensor(input_audio).to(self.device, non_blocking=True)[None, ...]
+                    input_dict['time_steps'] = max_frame_length
+                with self.timer.stage("model"):
+                    # the window always has the same shape, no bucketing needed
+                    output_dict = self.forward_model(input_dict, bucketed=False)
+                with self.timer.stage("device_transfer"):
+                    out_exp = output_dict['pred_exp'].squeeze().cpu().numpy()[start_frame:, :]
+            except Exception as e:
+                self.logger.error('Error: faided to predict expression: {}'.format(e))
+                return {"code": RETURN_CODE['MODEL_INFERENCE_ERROR'],
+                        "expression": None,
+                        "headpose": None}, context
 
 
         # post-process
         if (context['previous_expression'] is None):
-            out_exp = self.apply_expression_postprocessing(out_exp, audio_volume=volume)
+            out_exp = self.apply_expression_postprocessing(out_exp, audio_volume=volume,
+                                                           idle_motion=idle_motion, frame_offset=frame_offset)
         else:
             previous_length = context['previous_expression'].shape[0]
             out_exp = self.apply_expression_postprocessing(expression_params = np.concatenate([context['previous_expression'], out_exp], axis=0),
                                                            audio_volume=np.concatenate([context['previous_volume'], volume], axis=0),
-                                                           processed_frames=previous_length)[previous_length:, :]
+                                                           processed_frames=previous_length,
+                                                           idle_motion=idle_motion,
+                                                           frame_offset=frame_offset)[previous_length:, :]
 
         if (context['previous_expression'] is not None):
             output_context['previous_expression'] = np.concatenate([context['previous_expression'], out_exp], axis=0)[
@@ -228,14 +919,49 @@ class Audio2ExpressionInfer(InferBase):
 
         output_context['first_input_flag'] = False
 
+        if self.output_fps != self.cfg.fps:
+            with self.timer.stage("post_resample"):
+                out_exp, output_context['resample_state'] = resample_frames_streaming(
+                    out_exp,
+                    self.cfg.fps,
+                    self.output_fps,
+                    self.cfg.get("frame_interpolation", "monotone"),
+                    context.get('resample_state'))
+                out_exp = np.clip(out_exp, 0, 1)
+
         return {"code": RETURN_CODE['SUCCESS'],
                 "expression": out_exp,
                 "headpose": None}, output_context
+
+    def flush_streaming_audio(self, context: dict, overrides: dict = None):
+        """Ends a stream and returns the expression frames the frame-rate resampler still holds.
+
+        Spline interpolation (``frame_interpolation``) keeps back the output frames that depend on
+        the newest model frame until the next chunk arrives; call this after the last chunk to get them.
+        Returns an empty expression when ``output_fps`` equals ``fps``. ``overrides`` are the stream's
+        cfg overrides, as passed to ``infer_streaming_audio``.
+        """
+        out_exp = np.zeros((0, len(ARKitBlendShape)), dtype=np.float32)
+        with self.request_config(overrides):
+            if context is not None and self.output_fps != self.cfg.fps:
+                out_exp, _ = resample_frames_streaming(None,
+                                                       self.cfg.fps,
+                                                       self.output_fps,
+                                                       self.cfg.get("frame_interpolation", "monotone"),
+                                                       context.get('resample_state'),
+                                                       flush=True)
+                out_exp = np.clip(out_exp, 0, 1)
+        return {"code": RETURN_CODE['SUCCESS'],
+                "expression": out_exp,
+                "headpose": None}
+
     def apply_expression_postprocessing(
             self,
             expression_params: np.ndarray,
             processed_frames: int = 0,
-            audio_volume: np.ndarray = None
+            audio_volume: np.ndarray = None,
+            idle_motion: IdleMotionGenerator = None,
+            frame_offset: int = 0
     ) -> np.ndarray:
         """Applies full post-processing pipeline to facial expression parameters.
 
@@ -243,43 +969,74 @@ class Audio2ExpressionInfer(InferBase):
             expression_params: Raw output from animation model [num_frames, num_parameters]
             processed_frames: Number of frames already processed in previous batches
             audio_volume: Optional volume array for audio-visual synchronization
+            idle_motion: Blink schedule of the stream (a new one if None)
+            frame_offset: Stream index of the first unprocessed frame
 
         Returns:
             Processed expression parameters ready for animation synthesis
         """
         # Pipeline execution order matters - maintain sequence
-        expression_params = smooth_mouth_movements(expression_params, processed_frames, audio_volume)
-        expression_params = apply_frame_blending(expression_params, processed_frames)
-        expression_params, _ = apply_savitzky_golay_smoothing(expression_params, window_length=5)
-        expression_params = symmetrize_blendshapes(expression_params)
-        expression_params = apply_random_eye_blinks_context(expression_params, processed_frames=processed_frames)
+        with self.timer.stage("post_smooth_mouth"):
+            expression_params = smooth_mouth_movements(expression_params, processed_frames, audio_volume)
+        with self.timer.stage("post_frame_blending"):
+            expression_params = apply_frame_blending(expression_params, processed_frames)
+        with self.timer.stage("post_savgol"):
+            expression_params, _ = apply_savitzky_golay_smoothing(expression_params, window_length=5)
+        with self.timer.stage("post_symmetrize"):
+            expression_params = symmetrize_blendshapes(expression_params)
+        with self.timer.stage("post_eye_blinks"):
+            expression_params = apply_random_eye_blinks_context(expression_params,
+                                                                processed_frames=processed_frames,
+                                                                idle_motion=idle_motion or self.build_idle_motion(),
+                                                                frame_offset=frame_offset)
 
         return expression_params
 
     def extract_vocal_track(
             self,
-            input_audio_path: str
+            input_audio_path: str,
+            output_dir: str
     ) -> str:
         """Isolates vocal track from audio file using source separation.
 
         Args:
             input_audio_path: Path to input audio file containing vocals+accompaniment
+            output_dir: Directory spleeter writes into, one per request (see ``vocal_track_dir``)
 
         Returns:
-            Path to isolated vocal track in WAV format
+            Path to isolated vocal track in WAV format (missing if the separation failed)
         """
-        separation_command = f'spleeter separate -p spleeter:2stems -o {self.cfg.save_path} {input_audio_path}'
-        os.system(separation_command)
+        try:
+            subprocess.run(["spleeter", "separate", "-p", "spleeter:2stems", "-o", output_dir, input_audio_path],
+                           check=False)
+        except OSError as e:
+            get_root_logger().warning(f"spleeter failed: {e}")
 
         base_name = os.path.splitext(os.path.basename(input_audio_path))[0]
-        return os.path.join(self.cfg.save_path, base_name, 'vocals.wav')
+        return os.path.join(output_dir, base_name, 'vocals.wav')
+
+    @contextlib.contextmanager
+    def vocal_track_dir(self):
+        """Temporary directory under ``cfg.save_path`` for the vocal tracks of one request, removed on exit."""
+        os.makedirs(self.cfg.save_path, exist_ok=True)
+        output_dir = tempfile.mkdtemp(prefix="vocals_", dir=self.cfg.save_path)
+        try:
+            yield output_dir
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
 
     def blendshape_postprocess(self,
-                               bs_array: np.ndarray
+                               bs_array: np.ndarray,
+                               idle_motion: IdleMotionGenerator = None
                                )->np.array:
 
-        bs_array, _ = apply_savitzky_golay_smoothing(bs_array, window_length=5)
-        bs_array = symmetrize_blendshapes(bs_array)
-        bs_array = apply_random_eye_blinks(bs_array)
+        with self.timer.stage("post_savgol"):
+            bs_array, _ = apply_savitzky_golay_smoothing(bs_array, window_length=5)
+        with self.timer.stage("post_symmetrize"):
+            bs_array = symmetrize_blendshapes(bs_array)
+        if idle_motion is None:
+            idle_motion = self.build_idle_motion(blink_at_start=True, blink_interval=(60, 120))
+        with self.timer.stage("post_eye_blinks"):
+            bs_array = apply_random_eye_blinks(bs_array, idle_motion=idle_motion)
 
         return bs_array
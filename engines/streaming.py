@@ -0,0 +1,195 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.logger import get_root_logger
+
+
+class _StreamSession:
+    """Per-connection streaming state owned by :class:`AsyncStreamingEngine`."""
+
+    def __init__(self, session_id, sample_rate, overrides=None):
+        self.session_id = session_id
+        self.sample_rate = sample_rate
+        # per-session cfg overrides (see engines.infer.REQUEST_OVERRIDES)
+        self.overrides = overrides
+        self.context = None
+        # FIFO lock: chunks of one session reach the model in arrival order
+        self.lock = asyncio.Lock()
+        self.closed = False
+
+
+class AsyncStreamingEngine:
+    """Asyncio front-end for :meth:`Audio2ExpressionInfer.infer_streaming_audio`.
+
+    Model execution is pushed to a bounded thread pool so the event loop stays
+    free while a chunk is being processed. Chunks of one session are processed
+    strictly in order, at most ``max_pending`` chunks (over all sessions) are
+    queued or running at any time, and cancelling a stream drops its context.
+
+    Example:
+        engine = AsyncStreamingEngine(infer, max_workers=2)
+        async for output in engine.stream(session_id, audio_chunks):
+            send(output['expression'])
+    """
+
+    def __init__(self,
+                 infer,
+                 max_workers: int = 1,
+                 max_pending: int = None,
+                 sample_rate: int = 16000):
+        """
+        Args:
+            infer: A built ``Audio2ExpressionInfer`` with its model loaded
+            max_workers: Number of threads running model forwards
+            max_pending: Max chunks queued or running in the executor; callers
+                         wait for a free slot once it is reached (default: 2 * max_workers)
+            sample_rate: Default sample rate of incoming audio chunks
+        """
+        self.infer = infer
+        self.infer.model.eval()
+        self.sample_rate = sample_rate
+        self.max_workers = max_workers
+        self.max_pending = max_pending if max_pending is not None else 2 * max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="audio2exp-stream")
+        self.logger = get_root_logger()
+        self._sessions = {}
+        self._slots = None
+        self._loop = None
+
+    @property
+    def num_sessions(self) -> int:
+        return len(self._sessions)
+
+    def open_session(self, session_id, sample_rate: int = None, overrides: dict = None) -> _StreamSession:
+        """Registers a new streaming session.
+
+        Args:
+            session_id: Hashable id of the stream, unique among open sessions
+            sample_rate: Sample rate of the chunks (engine default if None)
+            overrides: cfg overrides of this session, e.g. ``dict(id_idx=12)``
+                       (keys of ``engines.infer.REQUEST_OVERRIDES``)
+
+        Raises:
+            KeyError: If a session with the same id is already open
+        """
+        if session_id in self._sessions:
+            raise KeyError(f"Streaming session {session_id} is already open")
+        session = _StreamSession(session_id, sample_rate or self.sample_rate, overrides)
+        self._sessions[session_id] = session
+        return session
+
+    def close_session(self, session_id) -> None:
+        """Drops a session and its streaming context. Unknown ids are ignored."""
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.closed = True
+            session.context = None
+
+    async def push(self, session_id, audio: np.ndarray) -> dict:
+        """Processes one audio chunk of an open session.
+
+        Returns:
+            The output dict of ``infer_streaming_audio`` for this chunk
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Streaming session {session_id} is not open")
+
+        async with session.lock:
+            if session.closed:
+                raise KeyError(f"Streaming session {session_id} was closed")
+            output, context = await self._run(session, audio)
+            if not session.closed:
+                session.context = context
+        return output
+
+    async def flush(self, session_id) -> dict:
+        """Returns the expression frames still held back for a session after its last chunk.
+
+        Only non-empty when the output frame rate is resampled with a spline method.
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Streaming session {session_id} is not open")
+
+        async with session.lock:
+            return self.infer.flush_streaming_audio(session.context, session.overrides)
+
+    async def stream(self, session_id, audio_chunks, sample_rate: int = None, overrides: dict = None):
+        """Yields one output dict per audio chunk of ``audio_chunks``, followed by one with the
+        frames held back by the frame-rate resampler if there are any.
+
+        Args:
+            session_id: Hashable id of the stream, unique among open sessions
+            audio_chunks: Iterable or async iterable of 1D float audio arrays
+            sample_rate: Sample rate of the chunks (engine default if None)
+            overrides: cfg overrides of this stream (see :meth:`open_session`)
+        """
+        self.open_session(session_id, sample_rate, overrides)
+        try:
+            if hasattr(audio_chunks, "__aiter__"):
+                async for audio in audio_chunks:
+                    yield await self.push(session_id, audio)
+            else:
+                for audio in audio_chunks:
+                    yield await self.push(session_id, audio)
+            output = await self.flush(session_id)
+            if output["expression"].shape[0] > 0:
+                yield output
+        finally:
+            # Also reached on cancellation / aclose(): free the session context
+            self.close_session(session_id)
+
+    async def _run(self, session: _StreamSession, audio: np.ndarray):
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+        slots = self._slots
+
+        # Backpressure: wait here until the executor has a free slot
+        await slots.acquire()
+        try:
+            future = self.executor.submit(self.infer.infer_streaming_audio,
+                                          audio,
+                                          session.sample_rate,
+                                          session.context,
+                                          session.overrides)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is held until the worker thread is done, even if the awaiting
+        # task gets cancelled, so cancelled chunks cannot oversubscribe the pool
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(slots.release))
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True) -> None:
+        for session_id in list(self._sessions.keys()):
+            self.close_session(session_id)
+        self.executor.shutdown(wait=wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown(wait=False)
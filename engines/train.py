@@ -4,7 +4,9 @@ The code is base on https://github.com/Pointcept/Pointcept
 
 import os
 import sys
+import math
 import weakref
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.utils.data
@@ -21,6 +23,8 @@ from .hooks import HookBase, build_hooks
 import utils.comm as comm
 from datasets import build_dataset, point_collate_fn, collate_fn
 from models import build_model
+from models.default import build_teacher
+from models.feature_cache import ArrayDiskCache, audio_hash, module_fingerprint
 from utils.logger import get_root_logger
 from utils.optimizer import build_optimizer
 from utils.scheduler import build_scheduler
@@ -199,6 +203,9 @@ class Trainer(TrainerBase):
 
     def build_model(self):
         model = build_model(self.cfg.model)
+        if getattr(model, "init_from_teacher", False) and not self.cfg.resume:
+            # before the optimizer and the CheckpointLoader, whose weights replace the copy
+            model.copy_from_teacher(getattr(self, "teacher", None))
         if self.cfg.sync_bn:
             model = nn.SyncBatchNorm.convert_sync_batchnorm(model)
         n_parameters = sum(p.numel() for p in model.parameters() if p.requires_grad)
@@ -297,3 +304,85 @@ class MultiDatasetTrainer(Trainer):
         )
         self.comm_info["iter_per_epoch"] = len(train_loader)
         return train_loader
+
+
+@TRAINERS.register_module("DistillationTrainer")
+class DistillationTrainer(Trainer):
+    """
+    Trains a compact student (``model = DistillationEstimator``) on the outputs of a frozen
+    full Audio2Expression teacher over unlabeled audio.
+
+    Teacher targets are cached on disk (``distill.cache_dir``, models/feature_cache.py) by
+    teacher weights, audio, identity and frame count, so once the first epoch has filled the
+    cache, later epochs only pay for the student's forward and backward passes. Hits need the
+    dataset to return the same segments every epoch (no random crops). Config:
+
+        distill = dict(
+            teacher=dict(type="Audio2Expression", ...),   # teacher backbone config
+            teacher_weight="pretrained_models/lam_audio2exp.tar",
+            cache_dir="cache/teacher_targets",
+            cache_hidden=False,   # also cache encoder outputs [T, 768] for the feature loss
+        )
+    """
+
+    def build_model(self):
+        distill = self.cfg.distill
+        self.logger.info(f"=> Building teacher from {distill.teacher_weight} ...")
+        self.teacher = build_teacher(distill.teacher, distill.get("teacher_weight", None)).cuda()
+        self.cache_hidden = distill.get("cache_hidden", False)
+        self.teacher_cache = ArrayDiskCache(distill.cache_dir)
+        self.teacher_fingerprint = module_fingerprint(self.teacher)
+        return super().build_model()
+
+    def teacher_targets(self, input_dict):
+        """Adds ``teacher_exp`` (and ``teacher_hidden``) [B, T, C] to a training batch."""
+        audio = input_dict["input_audio_array"].flatten(start_dim=1)
+        sample_rate, fps = self.teacher.sample_rate, self.teacher.fps
+        audio_lengths = input_dict.get("audio_lengths", None)
+        lengths = [audio.shape[1]] * audio.shape[0] if audio_lengths is None else [int(n) for n in audio_lengths]
+        time_steps = input_dict.get("time_steps", None)
+        if time_steps is None:
+            time_steps = [math.ceil(length / sample_rate * fps) for length in lengths]
+        elif isinstance(time_steps, int):
+            time_steps = [time_steps] * audio.shape[0]
+        time_steps = [int(steps) for steps in time_steps]
+        identities = input_dict["id_idx"].reshape(audio.shape[0], -1).argmax(-1).tolist()
+        clips = audio.cpu().numpy()
+
+        keys = [self.teacher_cache.key("teacher", self.teacher_fingerprint, audio_hash(clips[i, :length], sample_rate),
+                                       identities[i], time_steps[i], "hidden" if self.cache_hidden else "")
+                for i, length in enumerate(lengths)]
+        # each entry: expressions [T, 52] or, with cache_hidden, [T, 52 + 768]
+        targets = [self.teacher_cache.get(key) for key in keys]
+        missing = [i for i, target in enumerate(targets) if target is None]
+        if missing:
+            teacher_input = dict(input_audio_array=audio[missing].cuda(non_blocking=True),
+                                 id_idx=input_dict["id_idx"][missing].cuda(non_blocking=True))
+            if len({lengths[i] for i in missing}) > 1:
+                teacher_input["audio_lengths"] = torch.tensor([lengths[i] for i in missing])
+                teacher_input["time_steps"] = [time_steps[i] for i in missing]
+            else:
+                teacher_input["time_steps"] = time_steps[missing[0]]
+            with torch.no_grad():
+                hidden_states, frame_mask = self.teacher.encode(teacher_input)
+                expressions = self.teacher.decode(hidden_states, teacher_input["id_idx"], frame_mask)
+                computed = torch.cat([expressions, hidden_states], dim=2) if self.cache_hidden else expressions
+            computed = computed.float().cpu().numpy()
+            for row, i in enumerate(missing):
+                targets[i] = computed[row, :time_steps[i]]
+                self.teacher_cache.put(keys[i], targets[i])
+
+        padded = np.zeros((len(targets), max(time_steps), targets[0].shape[1]), dtype=np.float32)
+        for i, target in enumerate(targets):
+            padded[i, :target.shape[0]] = target
+        padded = torch.from_numpy(padded)
+        num_expressions = self.teacher.output_proj.out_features
+        input_dict["teacher_exp"] = padded[:, :, :num_expressions]
+        if self.cache_hidden:
+            input_dict["teacher_hidden"] = padded[:, :, num_expressions:]
+        return 1.0 - len(missing) / len(targets)
+
+    def run_step(self):
+        hit_rate = self.teacher_targets(self.comm_info["input_dict"])
+        super().run_step()
+        self.comm_info["model_output_dict"]["teacher_cache_hit_rate"] = torch.tensor(hit_rate)
@@ -28,6 +28,7 @@ def main_worker(cfg):
     cfg = default_setup(cfg)
     infer = INFER.build(dict(type=cfg.infer.type, cfg=cfg))
     infer.infer()
+    infer.timer.close()
 
 
 def main():
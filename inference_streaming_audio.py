@@ -28,9 +28,9 @@ from tqdm import tqdm
 import time
 
 
-def export_json(bs_array, json_path):
+def export_json(bs_array, json_path, fps=30.0):
     from models.utils import export_blendshape_animation, ARKitBlendShape
-    export_blendshape_animation(bs_array, json_path, ARKitBlendShape, fps=30.0)
+    export_blendshape_animation(bs_array, json_path, ARKitBlendShape, fps=fps)
 
 if __name__ == '__main__':
     args = default_argument_parser().parse_args()
@@ -44,8 +44,8 @@ if __name__ == '__main__':
 
     audio, sample_rate = librosa.load(cfg.audio_input, sr=16000)
     context = None
-    input_num = audio.shape[0]//16000+1
-    gap = 16000
+    gap = int(cfg.get("streaming_chunk_ms", 1000) * sample_rate / 1000)
+    input_num = audio.shape[0]//gap+1
     all_exp = []
     for i in tqdm(range(input_num)):
 
@@ -54,7 +54,13 @@ if __name__ == '__main__':
         end = time.time()
         print('Inference time {}'.format(end - start))
         all_exp.append(output['expression'])
+    all_exp.append(infer.flush_streaming_audio(context)['expression'])
 
     all_exp = np.concatenate(all_exp,axis=0)
 
-    export_json(all_exp, cfg.save_json_path)
\ No newline at end of file
+    if infer.timer.enabled:
+        for stage, stats in infer.timer.summary().items():
+            print('{:<28s} n={count:<5d} p50={p50:.4f}s p95={p95:.4f}s p99={p99:.4f}s'.format(stage, **stats))
+        infer.timer.close()
+
+    export_json(all_exp, cfg.save_json_path, fps=infer.output_fps)
\ No newline at end of file
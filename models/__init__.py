@@ -1,6 +1,6 @@
 from .builder import build_model
 
-from .default import DefaultEstimator
+from .default import DefaultEstimator, DistillationEstimator
 
 # Backbones
 from .network import Audio2Expression
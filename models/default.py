@@ -1,4 +1,8 @@
+from collections import OrderedDict
+
+import torch
 import torch.nn as nn
+import torch.nn.functional as F
 
 from models.losses import build_criteria
 from .builder import MODELS, build_model
@@ -23,3 +27,144 @@ class DefaultEstimator(nn.Module):
         # infer
         else:
             return dict(pred_exp=pred_exp)
+
+
+def backbone_state_dict(path, modules=None):
+    """
+    ``backbone.*`` entries of a DefaultEstimator checkpoint, keyed relative to the backbone.
+
+    Args:
+        path: Checkpoint path
+        modules: Only keep these top-level backbone submodules, e.g. ("decoder", "output_proj")
+    """
+    checkpoint = torch.load(path, map_location="cpu")
+    weight = OrderedDict()
+    for key, value in checkpoint["state_dict"].items():
+        if key.startswith("module."):
+            key = key[7:]  # module.xxx.xxx -> xxx.xxx
+        if key.startswith("backbone."):
+            key = key[len("backbone."):]
+            if modules is None or key.split(".", 1)[0] in modules:
+                weight[key] = value
+    return weight
+
+
+def load_backbone_weights(backbone, path, modules=None):
+    """Loads the ``backbone.*`` entries of a DefaultEstimator checkpoint into ``backbone``."""
+    return backbone.load_state_dict(backbone_state_dict(path, modules), strict=False)
+
+
+def build_teacher(teacher, teacher_weight=None):
+    """Frozen eval-mode backbone built from the ``teacher`` config, loaded from ``teacher_weight``."""
+    model = build_model(teacher)
+    if teacher_weight is not None:
+        load_backbone_weights(model, teacher_weight)
+    model.requires_grad_(False)
+    return model.eval()
+
+
+@MODELS.register_module()
+class DistillationEstimator(nn.Module):
+    """
+    Trains ``backbone`` (a mel_conv or otherwise compact Audio2Expression) against a frozen
+    wav2vec Audio2Expression teacher.
+
+    loss = feature_loss_weight * MSE(student encoder output, teacher encoder output)
+         + output_loss_weight * L1(student expressions, teacher expressions)
+         + criteria(student expressions, gt_exp)          (when gt_exp is given)
+
+    Teacher targets come from ``input_dict['teacher_exp']`` [B, T, 52] (and optionally
+    ``teacher_hidden`` [B, T, 768]) when present, e.g. from the DistillationTrainer's disk
+    cache; otherwise the ``teacher`` config is run online. The feature term needs student and
+    teacher encoder outputs of the same width and is skipped without teacher hidden states.
+
+    The online teacher is built on first use and is not a registered submodule, so checkpoints
+    only hold the student and load into a DefaultEstimator with the same backbone (inference
+    with this config never builds the teacher). With ``init_from_teacher`` the trainer calls
+    ``copy_from_teacher`` when it builds the model, before the optimizer and the checkpoint
+    loader, and skips it when resuming: the student starts from every teacher weight whose name
+    and shape match (the decoder of a mel_conv student, the first layers of a truncated wav2vec
+    one). ``freeze_decoder`` keeps everything after the audio encoder fixed from construction.
+    """
+
+    def __init__(self,
+                 backbone=None,
+                 teacher=None,
+                 teacher_weight=None,
+                 criteria=None,
+                 feature_loss_weight=1.0,
+                 output_loss_weight=1.0,
+                 init_from_teacher=True,
+                 freeze_decoder=False):
+        super().__init__()
+        self.backbone = build_model(backbone)
+        self.criteria = build_criteria(criteria)
+        self.teacher_cfg = teacher
+        self.teacher_weight = teacher_weight
+        self.feature_loss_weight = feature_loss_weight
+        self.output_loss_weight = output_loss_weight
+        self.init_from_teacher = init_from_teacher
+        self.freeze_decoder = freeze_decoder
+        self._teacher = None
+        if freeze_decoder:
+            for name, param in self.backbone.named_parameters():
+                if not name.startswith("audio_encoder."):
+                    param.requires_grad = False
+
+    @property
+    def teacher(self):
+        device = next(self.backbone.parameters()).device
+        if self._teacher is None:
+            if self.teacher_cfg is None:
+                raise ValueError("DistillationEstimator needs a teacher config or teacher_exp targets in input_dict")
+            # bypass nn.Module registration, see the class docstring
+            object.__setattr__(self, "_teacher", build_teacher(self.teacher_cfg, self.teacher_weight))
+        # not a submodule, so it does not follow model.cuda(); built at model build, it is still on the CPU
+        if next(self._teacher.parameters()).device != device:
+            self._teacher.to(device)
+        return self._teacher
+
+    def copy_from_teacher(self, teacher=None):
+        """
+        Copies every teacher weight whose name and shape match into the student.
+
+        Args:
+            teacher: Teacher backbone, e.g. the DistillationTrainer's; defaults to the online teacher
+        """
+        teacher = self.teacher if teacher is None else teacher
+        student_state = self.backbone.state_dict()
+        weight = {key: value.to(student_state[key].device) for key, value in teacher.state_dict().items()
+                  if key in student_state and student_state[key].shape == value.shape}
+        self.backbone.load_state_dict(weight, strict=False)
+
+    def forward(self, input_dict):
+        if not self.training:
+            pred_exp = self.backbone(input_dict)
+            if "gt_exp" in input_dict.keys():
+                return dict(loss=self.criteria(pred_exp, input_dict["gt_exp"]), pred_exp=pred_exp)
+            return dict(pred_exp=pred_exp)
+
+        if "teacher_exp" in input_dict.keys():
+            teacher_exp, teacher_hidden = input_dict["teacher_exp"], input_dict.get("teacher_hidden", None)
+        else:
+            teacher = self.teacher
+            with torch.no_grad():
+                teacher_hidden, frame_mask = teacher.encode(input_dict)
+                teacher_exp = teacher.decode(teacher_hidden, input_dict["id_idx"], frame_mask)
+        student_hidden, frame_mask = self.backbone.encode(input_dict)
+        pred_exp = self.backbone.decode(student_hidden, input_dict["id_idx"], frame_mask)
+
+        valid = (lambda x: x[frame_mask]) if frame_mask is not None else (lambda x: x)
+        output_loss = F.l1_loss(valid(pred_exp), valid(teacher_exp)) * self.output_loss_weight
+        loss = output_loss
+        output = dict(output_loss=output_loss.detach())
+        if teacher_hidden is not None and self.feature_loss_weight > 0:
+            feature_loss = F.mse_loss(valid(student_hidden), valid(teacher_hidden)) * self.feature_loss_weight
+            output["feature_loss"] = feature_loss.detach()
+            loss = loss + feature_loss
+        if "gt_exp" in input_dict.keys() and len(self.criteria.criteria) > 0:
+            gt_loss = self.criteria(pred_exp, input_dict["gt_exp"])
+            output["gt_loss"] = gt_loss.detach()
+            loss = loss + gt_loss
+        output["loss"] = loss
+        return output
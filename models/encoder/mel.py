@@ -0,0 +1,208 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Lightweight log-mel + dilated Conv1d audio encoder (pretrained_encoder_type='mel_conv'), a
+Meshtalk-style drop-in for the wav2vec encoder meant to be distilled from it
+(models/default.py DistillationEstimator).
+
+It follows the Wav2Vec2Model interface Audio2Expression relies on: ``feature_extractor``
+(parameter-free log-mel frontend, 100 Hz), ``encoder`` (conv stack, 50 Hz),
+``extract_features`` / ``_get_feat_extract_output_lengths`` for the feature cache, and a
+``forward`` returning a BaseModelOutput of ``output_dim`` features interpolated to
+``frame_num``. Every layer is local in time and padded frames are zeroed after every block,
+so zero-padded batches give the same valid frames as single clips.
+"""
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from transformers.modeling_outputs import BaseModelOutput
+
+from models.encoder.wav2vec import linear_interpolation, padded_linear_interpolation
+
+
+def mel_filterbank(sample_rate: int, n_fft: int, n_mels: int, f_min: float = 0.0, f_max: float = None) -> np.ndarray:
+    """HTK mel filterbank [n_fft // 2 + 1, n_mels] with triangular, unnormalized filters."""
+    f_max = sample_rate / 2.0 if f_max is None else f_max
+    hz_to_mel = lambda hz: 2595.0 * np.log10(1.0 + hz / 700.0)
+    mel_to_hz = lambda mel: 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+    fft_freqs = np.linspace(0, sample_rate / 2.0, n_fft // 2 + 1)
+    mel_freqs = mel_to_hz(np.linspace(hz_to_mel(f_min), hz_to_mel(f_max), n_mels + 2))
+    lower = (fft_freqs[:, None] - mel_freqs[None, :-2]) / (mel_freqs[1:-1] - mel_freqs[:-2])
+    upper = (mel_freqs[None, 2:] - fft_freqs[:, None]) / (mel_freqs[2:] - mel_freqs[1:-1])
+    return np.maximum(0.0, np.minimum(lower, upper)).astype(np.float32)
+
+
+class LogMelSpectrogram(nn.Module):
+    """
+    log(mel power spectrogram + eps) [B, n_mels, num_samples // hop_length + 1].
+
+    Frames are centered with zero padding (not reflection), so a clip's frames do not depend
+    on what follows it in a zero-padded batch.
+    """
+
+    def __init__(self, sample_rate=16000, n_fft=400, hop_length=160, n_mels=80, eps=1e-6):
+        super().__init__()
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.eps = eps
+        self.register_buffer("window", torch.hann_window(n_fft))
+        self.register_buffer("filterbank", torch.from_numpy(mel_filterbank(sample_rate, n_fft, n_mels)))
+
+    def _freeze_parameters(self):
+        # parameter-free, kept for the Wav2Vec2 feature encoder interface
+        self._requires_grad = False
+
+    def forward(self, input_values):
+        spectrum = torch.stft(input_values, self.n_fft, hop_length=self.hop_length, window=self.window,
+                              center=True, pad_mode="constant", return_complex=True)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        return torch.log(torch.matmul(power.transpose(1, 2), self.filterbank) + self.eps).transpose(1, 2)
+
+
+class DilatedConvBlock(nn.Module):
+    """Residual dilated Conv1d -> LayerNorm (over channels) -> GELU."""
+
+    def __init__(self, channels, kernel_size=5, dilation=1):
+        super().__init__()
+        self.conv = nn.Conv1d(channels, channels, kernel_size, dilation=dilation,
+                              padding=dilation * (kernel_size - 1) // 2)
+        self.norm = nn.LayerNorm(channels)
+
+    def forward(self, x, mask=None):
+        out = self.norm(self.conv(x).transpose(1, 2)).transpose(1, 2)
+        out = x + F.gelu(out)
+        if mask is not None:
+            out = out * mask[:, None, :]
+        return out
+
+
+class MelConvStack(nn.Module):
+    """Strided stem (100 Hz log-mel -> 50 Hz) followed by DilatedConvBlocks."""
+
+    def __init__(self, n_mels=80, channels=256, num_layers=8, kernel_size=5, dilations=(1, 2, 4, 8)):
+        super().__init__()
+        self.stem = nn.Conv1d(n_mels, channels, kernel_size=3, stride=2, padding=1)
+        self.layers = nn.ModuleList([
+            DilatedConvBlock(channels, kernel_size, dilations[i % len(dilations)]) for i in range(num_layers)
+        ])
+
+    @staticmethod
+    def output_lengths(lengths):
+        return torch.div(lengths - 1, 2, rounding_mode="floor") + 1
+
+    def forward(self, features, mask=None):
+        hidden_states = F.gelu(self.stem(features))
+        if mask is not None:
+            hidden_states = hidden_states * mask[:, None, :]
+        for layer in self.layers:
+            hidden_states = layer(hidden_states, mask)
+        return hidden_states
+
+
+class MelConvEncoder(nn.Module):
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 n_fft: int = 400,
+                 hop_length: int = 160,
+                 n_mels: int = 80,
+                 channels: int = 256,
+                 num_layers: int = 8,
+                 kernel_size: int = 5,
+                 dilations: tuple = (1, 2, 4, 8),
+                 output_dim: int = 768,
+                 fps: float = 30.0,
+                 ):
+        """
+        Args:
+            sample_rate: Input audio sample rate
+            n_fft: STFT window (400 samples = 25 ms at 16 kHz)
+            hop_length: STFT hop (160 samples = 100 Hz log-mel frames)
+            n_mels: Mel bins
+            channels: Width of the conv stack
+            num_layers: Dilated residual blocks after the stem
+            kernel_size: Kernel of the dilated blocks
+            dilations: Dilations, cycled over the blocks
+            output_dim: Output features, 768 to match the wav2vec hidden states it is distilled from
+            fps: Output frame rate, the Audio2Expression ``fps``
+        """
+        super().__init__()
+        self.output_dim = output_dim
+        self.hop_length = hop_length
+        self.feature_fps = sample_rate / hop_length / 2.0
+        self.fps = fps
+        self.feature_extractor = LogMelSpectrogram(sample_rate, n_fft, hop_length, n_mels)
+        self.encoder = MelConvStack(n_mels, channels, num_layers, kernel_size, dilations)
+        self.output_proj = nn.Linear(channels, output_dim)
+
+    def _get_feat_extract_output_lengths(self, audio_lengths):
+        """Log-mel frames of clips with ``audio_lengths`` samples."""
+        return torch.div(torch.as_tensor(audio_lengths), self.hop_length, rounding_mode="floor") + 1
+
+    def extract_features(self, input_values, audio_lengths=None):
+        """Log-mel features [B, n_mels, T100], frames past a clip's length are zeroed."""
+        features = self.feature_extractor(input_values)
+        if audio_lengths is not None:
+            mel_lengths = self._get_feat_extract_output_lengths(audio_lengths).to(features.device)
+            features = features * (torch.arange(features.shape[2], device=features.device)[None, :]
+                                   < mel_lengths[:, None])[:, None, :]
+        return features
+
+    def forward(self, input_values, attention_mask=None, frame_num=None, features=None, feature_lengths=None,
+                padded_frame_num=None, **kwargs):
+        """
+        Args:
+            input_values: Audio [B, num_samples] (unused when ``features`` is given)
+            attention_mask: Valid samples [B, num_samples] of a zero-padded batch
+            frame_num: Output frames, an int or one per clip
+            features: Precomputed ``extract_features`` output [B, n_mels, T100]
+            feature_lengths: Valid frames of ``features`` per clip when they are zero-padded
+            padded_frame_num: Output frames of a zero-padded batch (max of ``frame_num`` if None)
+
+        Returns:
+            BaseModelOutput with ``last_hidden_state`` [B, T, output_dim]
+        """
+        if features is None:
+            audio_lengths = None
+            if attention_mask is not None:
+                audio_lengths = attention_mask.sum(-1)
+                feature_lengths = self._get_feat_extract_output_lengths(audio_lengths)
+            features = self.extract_features(input_values, audio_lengths)
+
+        if feature_lengths is None:
+            hidden_states = self.encoder(features).transpose(1, 2)
+            if frame_num is None:
+                frame_num = int(hidden_states.shape[1] * self.fps / self.feature_fps)
+            # interpolation and the affine projection commute, project the (fewer) output frames
+            hidden_states = linear_interpolation(hidden_states, self.feature_fps, self.fps, output_len=frame_num)
+            return BaseModelOutput(last_hidden_state=self.output_proj(hidden_states))
+
+        # zero-padded batch: mask padded frames after every layer, then interpolate each clip
+        # from its own valid frames to its own frame count
+        feature_lengths = torch.as_tensor(feature_lengths, device=features.device)
+        lengths = MelConvStack.output_lengths(feature_lengths)
+        mask = torch.arange(MelConvStack.output_lengths(torch.tensor(features.shape[2])).item(),
+                            device=features.device)[None, :] < lengths[:, None]
+        hidden_states = self.encoder(features, mask).transpose(1, 2)
+        if frame_num is None:
+            frame_num = (lengths * self.fps / self.feature_fps).long()
+        elif isinstance(frame_num, int):
+            frame_num = [frame_num] * features.shape[0]
+        frame_num = torch.as_tensor(frame_num, device=features.device)
+        if padded_frame_num is None:
+            padded_frame_num = int(frame_num.max())
+        output = padded_linear_interpolation(hidden_states, lengths, frame_num, padded_frame_num)
+        return BaseModelOutput(last_hidden_state=self.output_proj(output))
@@ -8,6 +8,7 @@ from torch.nn import BCEWithLogitsLoss, CrossEntropyLoss, MSELoss
 
 from dataclasses import dataclass
 from transformers import Wav2Vec2Model, Wav2Vec2PreTrainedModel
+from transformers.models.wav2vec2.modeling_wav2vec2 import Wav2Vec2Attention
 from transformers.modeling_outputs import BaseModelOutput
 from transformers.file_utils import ModelOutput
 
@@ -78,10 +79,242 @@ def linear_interpolation(features, input_fps, output_fps, output_len=None):
     return output_features.transpose(1, 2)
 
 
+def masked_group_norm(norm: nn.GroupNorm, hidden_states, lengths):
+    """GroupNorm whose statistics only use the first lengths[b] frames of every clip (padded frames are zeroed)."""
+    batch_size, channels, num_frames = hidden_states.shape
+    mask = torch.arange(num_frames, device=hidden_states.device)[None, :] < lengths.to(hidden_states.device)[:, None]
+    mask = mask[:, None, None, :]
+    # statistics in (at least) float32 under autocast
+    grouped = hidden_states.reshape(batch_size, norm.num_groups, channels // norm.num_groups, num_frames)
+    grouped = grouped.to(torch.promote_types(grouped.dtype, torch.float32))
+    count = mask.sum(-1, keepdim=True) * grouped.shape[2]
+    mean = (grouped * mask).sum((2, 3), keepdim=True) / count
+    centered = (grouped - mean) * mask
+    var = (centered * centered).sum((2, 3), keepdim=True) / count
+    output = (centered * torch.rsqrt(var + norm.eps)).reshape(batch_size, channels, num_frames)
+    if norm.affine:
+        output = output * norm.weight[:, None] + norm.bias[:, None]
+    return (output * mask[:, 0]).to(hidden_states.dtype)
+
+
+def padded_linear_interpolation(features, input_lengths, output_lengths, num_frames):
+    """
+    linear_interpolation of every clip of a zero-padded batch [B, T, C] from its own
+    input_lengths[b] valid frames to output_lengths[b] frames, as one gather (no per-clip
+    shapes, so compiled graphs only depend on the padded sizes). Returns [B, num_frames, C],
+    frames past output_lengths[b] are 0.
+    """
+    device = features.device
+    input_lengths = torch.as_tensor(input_lengths, device=device)[:, None]
+    output_lengths = torch.as_tensor(output_lengths, device=device)[:, None]
+    # align_corners=True source positions, as in F.interpolate (never in half precision)
+    dtype = torch.promote_types(features.dtype, torch.float32)
+    scale = (input_lengths - 1).to(dtype) / (output_lengths - 1).clamp(min=1).to(dtype)
+    source = torch.arange(num_frames, device=device, dtype=dtype)[None, :] * scale
+    lower = torch.minimum(source.floor().long(), input_lengths - 1)
+    upper = torch.minimum(lower + 1, input_lengths - 1)
+    weight = (source - lower.to(dtype)).to(features.dtype)[:, :, None]
+    channels = features.shape[2]
+    output = (torch.gather(features, 1, lower[:, :, None].expand(-1, -1, channels)) * (1 - weight)
+              + torch.gather(features, 1, upper[:, :, None].expand(-1, -1, channels)) * weight)
+    valid = torch.arange(num_frames, device=device)[None, :] < output_lengths
+    return output * valid[:, :, None]
+
+
+def conv_stack_geometry(kernels, strides):
+    """(receptive field, hop) in input samples of one output frame of a stack of unpadded convs."""
+    receptive_field, hop = 1, 1
+    for kernel, stride in zip(kernels, strides):
+        receptive_field += (kernel - 1) * hop
+        hop *= stride
+    return receptive_field, hop
+
+
+class Wav2Vec2SdpaAttention(Wav2Vec2Attention):
+    """
+    Wav2Vec2Attention through F.scaled_dot_product_attention, which never materializes the
+    T x T attention matrix on its fused/memory-efficient kernels. Falls back to the eager HF
+    implementation when attention weights, a head mask or cross-attention are requested.
+    """
+
+    def forward(self, hidden_states, key_value_states=None, past_key_value=None, attention_mask=None,
+                layer_head_mask=None, output_attentions=False):
+        if output_attentions or key_value_states is not None or past_key_value is not None \
+                or layer_head_mask is not None:
+            return super().forward(hidden_states, key_value_states, past_key_value, attention_mask,
+                                   layer_head_mask, output_attentions)
+
+        bsz, tgt_len, _ = hidden_states.size()
+        query_states = self._shape(self.q_proj(hidden_states), tgt_len, bsz)
+        key_states = self._shape(self.k_proj(hidden_states), tgt_len, bsz)
+        value_states = self._shape(self.v_proj(hidden_states), tgt_len, bsz)
+        # default scale 1 / sqrt(head_dim) == self.scaling; attention_mask: additive
+        # (bsz, 1, tgt_len, src_len), broadcast over the heads
+        attn_output = F.scaled_dot_product_attention(query_states, key_states, value_states,
+                                                     attn_mask=attention_mask,
+                                                     dropout_p=self.dropout if self.training else 0.0)
+        attn_output = attn_output.transpose(1, 2).reshape(bsz, tgt_len, self.embed_dim)
+        return self.out_proj(attn_output), None, None
+
+
+WAV2VEC2_ATTENTION_CLASSES = {"eager": Wav2Vec2Attention, "sdpa": Wav2Vec2SdpaAttention}
+
+
 class Wav2Vec2Model(Wav2Vec2Model):
     def __init__(self, config):
         super().__init__(config)
         self.lm_head = nn.Linear(1024, 32)
+        # output frames per chunk of chunked_extract_features, None: single pass
+        self.feature_chunk_frames = None
+        # output frame rate when frame_num is not given, set to the Audio2Expression fps
+        self.fps = 30.0
+
+    def set_attention_implementation(self, implementation: str):
+        """
+        Rebuilds the encoder self-attention modules as 'sdpa' or 'eager' ones and loads the
+        current weights into them (same device, dtype and train/eval mode). The model is built
+        eager; 'sdpa' is an inference switch (cfg.encoder_attention).
+        """
+        if implementation not in WAV2VEC2_ATTENTION_CLASSES:
+            raise ValueError(f"attention implementation must be one of {tuple(WAV2VEC2_ATTENTION_CLASSES)}, "
+                             f"got {implementation}")
+        attention_class = WAV2VEC2_ATTENTION_CLASSES[implementation]
+        for layer in self.encoder.layers:
+            old = layer.attention
+            if type(old) is attention_class:
+                continue
+            new = attention_class(embed_dim=old.embed_dim, num_heads=old.num_heads, dropout=old.dropout,
+                                  is_decoder=old.is_decoder, bias=old.k_proj.bias is not None,
+                                  config=getattr(old, "config", None))
+            new.load_state_dict(old.state_dict())
+            layer.attention = new.to(device=old.k_proj.weight.device, dtype=old.k_proj.weight.dtype).train(old.training)
+        return self
+
+    def set_feature_chunk(self, seconds=None, sample_rate=16000):
+        """Runs the conv feature encoder in chunks of ``seconds`` of audio (None: single pass)."""
+        _, hop = conv_stack_geometry(self.config.conv_kernel, self.config.conv_stride)
+        self.feature_chunk_frames = None if seconds is None else max(1, int(seconds * sample_rate / hop))
+        return self
+
+    def num_feature_frames(self, num_samples: int) -> int:
+        """Output frames of the conv feature encoder for ``num_samples`` samples (plain int arithmetic)."""
+        receptive_field, hop = conv_stack_geometry(self.config.conv_kernel, self.config.conv_stride)
+        return max(0, (num_samples - receptive_field) // hop + 1)
+
+    def extract_features(self, input_values, audio_lengths=None):
+        """
+        Conv feature encoder (50 Hz). With audio_lengths (zero-padded batch), the group norm of
+        the first conv layer only uses each clip's valid frames, so valid frames match the
+        unpadded result; the other layers are local in time. Inputs longer than
+        ``feature_chunk_frames`` go through chunked_extract_features.
+        """
+        if self.feature_chunk_frames is not None and not self.training \
+                and self.num_feature_frames(input_values.shape[1]) > self.feature_chunk_frames:
+            return self.chunked_extract_features(input_values, self.feature_chunk_frames, audio_lengths)
+        if audio_lengths is None:
+            return self.feature_extractor(input_values)
+        hidden_states = input_values[:, None]
+        lengths = audio_lengths
+        for layer_id, conv_layer in enumerate(self.feature_extractor.conv_layers):
+            lengths = torch.div(lengths - self.config.conv_kernel[layer_id],
+                                self.config.conv_stride[layer_id], rounding_mode="floor") + 1
+            if isinstance(getattr(conv_layer, "layer_norm", None), nn.GroupNorm):
+                hidden_states = conv_layer.conv(hidden_states)
+                hidden_states = masked_group_norm(conv_layer.layer_norm, hidden_states, lengths)
+                hidden_states = conv_layer.activation(hidden_states)
+            else:
+                hidden_states = conv_layer(hidden_states)
+        return hidden_states
+
+    def chunked_extract_features(self, input_values, chunk_frames, audio_lengths=None):
+        """
+        ``extract_features`` with peak memory bounded by ``chunk_frames`` output frames.
+
+        Output frame j of the unpadded conv stack only sees samples [j * hop, j * hop +
+        receptive_field), so every chunk of output frames is computed from its own slice of the
+        waveform (consecutive slices overlap by receptive_field - hop samples) and the chunks are
+        concatenated as is. The one non-local op, the per-channel group norm of the first layer
+        ('group' feat_extract_norm), takes its statistics from a first pass over the waveform.
+        Outputs match the single pass up to float rounding (the statistics are summed in
+        float64 in a different order), not bit for bit.
+        """
+        config = self.config
+        conv_layers = self.feature_extractor.conv_layers
+        receptive_field, hop = conv_stack_geometry(config.conv_kernel, config.conv_stride)
+        batch_size, num_samples = input_values.shape
+        num_frames = self.num_feature_frames(num_samples)
+        first_norm = getattr(conv_layers[0], "layer_norm", None)
+        group_norm = isinstance(first_norm, nn.GroupNorm)
+
+        # frames of the first conv layer, per clip
+        first_lengths = torch.full((batch_size,), num_samples) if audio_lengths is None else torch.as_tensor(
+            audio_lengths).cpu()
+        first_lengths = torch.div(first_lengths - config.conv_kernel[0], config.conv_stride[0],
+                                  rounding_mode="floor") + 1
+        first_lengths = first_lengths.to(input_values.device)
+        first_frames_per_frame = hop // config.conv_stride[0]
+        if group_norm:
+            mean, inv_std = self.first_layer_statistics(input_values, first_lengths,
+                                                        chunk_frames * first_frames_per_frame)
+            # group norm folded into one per-channel affine map
+            scale = inv_std * first_norm.weight[:, None]
+            shift = first_norm.bias[:, None] - mean * scale
+
+        output = input_values.new_empty(batch_size, config.conv_dim[-1], num_frames)
+        for start in range(0, num_frames, chunk_frames):
+            stop = min(start + chunk_frames, num_frames)
+            hidden_states = input_values[:, None, start * hop:(stop - 1) * hop + receptive_field]
+            for layer_id, conv_layer in enumerate(conv_layers):
+                if layer_id == 0 and group_norm:
+                    hidden_states = torch.addcmul(shift, conv_layer.conv(hidden_states), scale)
+                    if audio_lengths is not None:
+                        # padded frames are zeroed, as by masked_group_norm
+                        frame_index = start * first_frames_per_frame + torch.arange(
+                            hidden_states.shape[2], device=hidden_states.device)
+                        hidden_states = hidden_states * (frame_index[None, :] < first_lengths[:, None])[:, None, :]
+                    hidden_states = conv_layer.activation(hidden_states)
+                else:
+                    hidden_states = conv_layer(hidden_states)
+            output[:, :, start:stop] = hidden_states
+        return output
+
+    def first_layer_statistics(self, input_values, first_lengths, chunk_frames):
+        """
+        Per-clip, per-channel mean and 1 / std of the first conv layer over its valid frames.
+
+        The layer is linear in its input windows u_t (kernel samples at stride), so with
+        S = sum_t u_t and G = sum_t u_t u_t^T, channel c (weight w_c, bias b_c) over n frames has
+        sum w_c.S + n b_c and sum of squares w_c^T G w_c + 2 b_c w_c.S + n b_c^2. Only S and the
+        kernel x kernel matrix G are accumulated (in float64, over chunks of the waveform), the
+        512-channel activation is never built.
+        """
+        config = self.config
+        conv = self.feature_extractor.conv_layers[0].conv
+        eps = self.feature_extractor.conv_layers[0].layer_norm.eps
+        kernel, stride = config.conv_kernel[0], config.conv_stride[0]
+        batch_size = input_values.shape[0]
+        window_sum = torch.zeros(batch_size, kernel, dtype=torch.float64, device=input_values.device)
+        window_gram = torch.zeros(batch_size, kernel, kernel, dtype=torch.float64, device=input_values.device)
+        num_frames = int(first_lengths.max())
+        for start in range(0, num_frames, chunk_frames):
+            stop = min(start + chunk_frames, num_frames)
+            windows = input_values[:, start * stride:(stop - 1) * stride + kernel].unfold(-1, kernel, stride).double()
+            valid = (start + torch.arange(stop - start, device=input_values.device))[None, :] < first_lengths[:, None]
+            windows = windows * valid[:, :, None]
+            window_sum += windows.sum(1)
+            window_gram += torch.matmul(windows.transpose(1, 2), windows)
+
+        weight = conv.weight[:, 0].double()                                   # [C, kernel]
+        count = first_lengths.to(torch.float64)[:, None]
+        total = torch.matmul(window_sum, weight.T)                            # [B, C]
+        total_sq = torch.einsum("ck,bkl,cl->bc", weight, window_gram, weight)
+        if conv.bias is not None:
+            bias = conv.bias.double()[None, :]
+            total_sq = total_sq + 2 * bias * total + count * bias ** 2
+            total = total + count * bias
+        mean = total / count
+        var = (total_sq / count - mean ** 2).clamp(min=0)
+        return mean.float()[:, :, None], torch.rsqrt(var + eps).float()[:, :, None]
 
     def forward(
             self,
@@ -90,32 +323,59 @@ class Wav2Vec2Model(Wav2Vec2Model):
             output_attentions=None,
             output_hidden_states=None,
             return_dict=None,
-            frame_num=None
+            frame_num=None,
+            features=None,
+            feature_lengths=None,
+            num_layers=None,
+            padded_frame_num=None,
     ):
-        self.config.output_attentions = True
+        """
+        Args:
+            input_values: Audio [B, num_samples] (unused when ``features`` is given)
+            attention_mask: Valid samples [B, num_samples] of a zero-padded batch
+            frame_num: Output frames, an int or one per clip
+            features: Precomputed ``extract_features`` output [B, 512, T50]
+            feature_lengths: Valid frames of ``features`` per clip when they are zero-padded
+            num_layers: Run only the first ``num_layers`` transformer layers (early exit, eval only)
+            padded_frame_num: Output frames of a zero-padded batch (max of ``frame_num`` if None)
+        """
         output_attentions = output_attentions if output_attentions is not None else self.config.output_attentions
         output_hidden_states = (
             output_hidden_states if output_hidden_states is not None else self.config.output_hidden_states
         )
         return_dict = return_dict if return_dict is not None else self.config.use_return_dict
 
-        hidden_states = self.feature_extractor(input_values)
-        hidden_states = hidden_states.transpose(1, 2)
-
-        hidden_states = linear_interpolation(hidden_states, 50, 30, output_len=frame_num)
-
-        if attention_mask is not None:
-            output_lengths = self._get_feat_extract_output_lengths(attention_mask.sum(-1))
-            attention_mask = torch.zeros(
-                hidden_states.shape[:2], dtype=hidden_states.dtype, device=hidden_states.device
-            )
-            attention_mask[
-                (torch.arange(attention_mask.shape[0], device=hidden_states.device), output_lengths - 1)
-            ] = 1
-            attention_mask = attention_mask.flip([-1]).cumsum(-1).flip([-1]).bool()
+        if features is None:
+            audio_lengths = None
+            if attention_mask is not None:
+                audio_lengths = attention_mask.sum(-1)
+                feature_lengths = self._get_feat_extract_output_lengths(audio_lengths)
+            features = self.extract_features(input_values, audio_lengths)
+        features = features.transpose(1, 2)
+
+        attention_mask = None
+        if feature_lengths is None:
+            hidden_states = linear_interpolation(features, 50, self.fps, output_len=frame_num)
+        else:
+            # zero-padded batch: every clip is interpolated from its own valid features to its
+            # own frame count (frame_num, one per clip), the mask then marks the valid frames
+            feature_lengths = torch.as_tensor(feature_lengths, device=features.device)
+            if frame_num is None:
+                frame_num = (feature_lengths * self.fps / 50).long()
+            elif isinstance(frame_num, int):
+                frame_num = [frame_num] * features.shape[0]
+            frame_num = torch.as_tensor(frame_num, device=features.device)
+            if padded_frame_num is None:
+                padded_frame_num = int(frame_num.max())
+            hidden_states = padded_linear_interpolation(features, feature_lengths, frame_num, padded_frame_num)
+            attention_mask = (torch.arange(padded_frame_num, device=hidden_states.device)[None, :]
+                              < frame_num[:, None])
 
         hidden_states = self.feature_projection(hidden_states)[0]
 
+        if num_layers is not None and num_layers < len(self.encoder.layers) and not self.training:
+            return BaseModelOutput(last_hidden_state=self.truncated_encoder(hidden_states, attention_mask, num_layers))
+
         encoder_outputs = self.encoder(
             hidden_states,
             attention_mask=attention_mask,
@@ -133,6 +393,25 @@ class Wav2Vec2Model(Wav2Vec2Model):
             attentions=encoder_outputs.attentions,
         )
 
+    def truncated_encoder(self, hidden_states, attention_mask, num_layers):
+        """Eval-mode Wav2Vec2Encoder(StableLayerNorm).forward over the first ``num_layers`` layers only."""
+        encoder = self.encoder
+        if attention_mask is not None:
+            # padded frames output 0, as in the full encoder
+            hidden_states = hidden_states.masked_fill(~attention_mask[:, :, None], 0.0)
+            attention_mask = (1.0 - attention_mask[:, None, None, :].to(hidden_states.dtype)) * torch.finfo(
+                hidden_states.dtype).min
+            attention_mask = attention_mask.expand(-1, 1, attention_mask.shape[-1], -1)
+
+        hidden_states = hidden_states + encoder.pos_conv_embed(hidden_states)
+        if not self.config.do_stable_layer_norm:
+            hidden_states = encoder.layer_norm(hidden_states)
+        for layer in encoder.layers[:num_layers]:
+            hidden_states = layer(hidden_states, attention_mask=attention_mask)[0]
+        if self.config.do_stable_layer_norm:
+            hidden_states = encoder.layer_norm(hidden_states)
+        return hidden_states
+
 
 @dataclass
 class SpeechClassifierOutput(ModelOutput):
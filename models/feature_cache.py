@@ -0,0 +1,108 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+On-disk cache of audio encoder outputs.
+
+The wav2vec conv feature extractor is frozen, so its output only depends on the audio; the
+full encoder output additionally depends on the encoder weights and on the frame count it is
+interpolated to. Entries are keyed by a hash of the audio and a fingerprint of the weights
+they were computed with, so a new checkpoint never reads stale features:
+
+    level       stored array                        depends on
+    extractor   conv features [512, T50]            audio, feature_extractor weights
+    hidden      encoder output [T, 768]             audio, audio_encoder weights, T (time_steps)
+
+Everything downstream (identity, decoder, post-processing) can then be re-run from the cache.
+"""
+
+import os
+import hashlib
+import tempfile
+
+import numpy as np
+import torch
+
+FEATURE_CACHE_LEVELS = ("extractor", "hidden")
+
+
+def audio_hash(audio: np.ndarray, sample_rate: int) -> str:
+    """sha1 of the float32 samples and the sample rate."""
+    digest = hashlib.sha1(np.ascontiguousarray(audio, dtype=np.float32).tobytes())
+    digest.update(str(sample_rate).encode())
+    return digest.hexdigest()
+
+
+def module_fingerprint(module: torch.nn.Module) -> str:
+    """sha1 over the names and values of a module's parameters and buffers."""
+    digest = hashlib.sha1()
+    for name, tensor in sorted(module.state_dict().items()):
+        digest.update(name.encode())
+        digest.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ArrayDiskCache:
+    """Directory of ``.npy`` files addressed by string keys.
+
+    Writes go through a temporary file and ``os.replace``, so concurrent readers never see
+    partial entries and concurrent writers of the same key are harmless.
+
+    Example:
+        cache = ArrayDiskCache("cache/features")
+        key = cache.key("hidden", fingerprint, audio_hash(audio, 16000), time_steps)
+        hidden = cache.get(key)
+        if hidden is None:
+            hidden = run_encoder(audio)
+            cache.put(key, hidden)
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(*parts) -> str:
+        return hashlib.sha1("/".join(str(part) for part in parts).encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".npy")
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def get(self, key: str):
+        """Cached array or None."""
+        try:
+            array = np.load(self.path(key))
+        except (FileNotFoundError, ValueError, EOFError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return array
+
+    def put(self, key: str, array: np.ndarray) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
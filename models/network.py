@@ -5,15 +5,64 @@ import torch
 
 import torch.nn as nn
 import torch.nn.functional as F
-import torchaudio as ta
 
 from models.encoder.wav2vec import Wav2Vec2Model
 from models.encoder.wavlm import WavLMModel
+from models.encoder.mel import MelConvEncoder
 
 from models.builder import MODELS
 
 from transformers.models.wav2vec2.configuration_wav2vec2 import Wav2Vec2Config
 
+# names moved to models.baselines, still importable from here; resolved lazily so that
+# importing Audio2Expression does not pull in torchaudio
+BASELINE_NAMES = (
+    "audio_chunking", "MeshtalkEncoder", "PeriodicPositionalEncoding", "GeneratorTransformer",
+    "linear_interpolation", "init_biased_mask", "enc_dec_mask", "BaseModel", "UniTalkerDecoderTransformer",
+)
+
+
+def __getattr__(name):
+    if name in BASELINE_NAMES:
+        from models import baselines
+        return getattr(baselines, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# submodules / parameters of Audio2Expression that inference never runs
+INFERENCE_UNUSED_MODULES = (
+    "identity_encoder.grus",            # GRU built by AudioIdentityEncoder, not called in forward
+    "audio_encoder.lm_head",            # CTC head added by models.encoder.wav2vec.Wav2Vec2Model
+    "audio_encoder.masked_spec_embed",  # SpecAugment embedding, training-time masking only
+)
+
+# Audio2Expression submodules after the audio encoder, fine-tuned per early-exit depth (encoder_layer_heads)
+DECODER_HEAD_MODULES = ("feature_projection", "identity_encoder", "decoder", "output_proj")
+
+
+def prune_inference_modules(model: nn.Module) -> list:
+    """
+    Deletes INFERENCE_UNUSED_MODULES from every Audio2Expression inside ``model``.
+
+    Returns:
+        list: Removed names relative to ``model``, usable as state dict key prefixes
+    """
+    removed = []
+    targets = [(prefix, module) for prefix, module in model.named_modules() if isinstance(module, Audio2Expression)]
+    for prefix, module in targets:
+        for name in INFERENCE_UNUSED_MODULES:
+            parent_name, _, attr = name.rpartition(".")
+            parent = module.get_submodule(parent_name) if parent_name else module
+            if hasattr(parent, attr):
+                delattr(parent, attr)
+                removed.append(f"{prefix}.{name}" if prefix else name)
+    return removed
+
+
+def is_pruned_key(key: str, removed: list) -> bool:
+    return any(key == name or key.startswith(name + ".") for name in removed)
+
+
 @MODELS.register_module("Audio2Expression")
 class Audio2Expression(nn.Module):
     def __init__(self,
@@ -30,22 +79,35 @@ class Audio2Expression(nn.Module):
                  use_transformer: bool = False,
                  num_attention_heads: int = 8,
                  num_transformer_layers: int = 6,
+                 fps: float = 30.0,
+                 sample_rate: int = 16000,
+                 mel_encoder: dict = None,
+                 num_encoder_layers: int = None,
                  ):
         super().__init__()
 
         self.device = device
+        self.fps = fps
+        self.sample_rate = sample_rate
 
         # Initialize audio feature encoder
         if pretrained_encoder_type == 'wav2vec':
+            # num_encoder_layers: compact students keep only the first transformer layers
+            config_overrides = {} if num_encoder_layers is None else dict(num_hidden_layers=num_encoder_layers)
             if os.path.exists(pretrained_encoder_path):
-                self.audio_encoder = Wav2Vec2Model.from_pretrained(pretrained_encoder_path)
+                self.audio_encoder = Wav2Vec2Model.from_pretrained(pretrained_encoder_path, **config_overrides)
             else:
-                config = Wav2Vec2Config.from_pretrained(wav2vec2_config_path)
+                config = Wav2Vec2Config.from_pretrained(wav2vec2_config_path, **config_overrides)
                 self.audio_encoder = Wav2Vec2Model(config)
+            self.audio_encoder.fps = fps
             encoder_output_dim = 768
         elif pretrained_encoder_type == 'wavlm':
             self.audio_encoder = WavLMModel.from_pretrained(pretrained_encoder_path)
             encoder_output_dim = 768
+        elif pretrained_encoder_type == 'mel_conv':
+            # lightweight CPU encoder, trained by distillation from the wav2vec model
+            self.audio_encoder = MelConvEncoder(sample_rate=sample_rate, fps=fps, **(mel_encoder or {}))
+            encoder_output_dim = self.audio_encoder.output_dim
         else:
             raise NotImplementedError(f"Encoder type {pretrained_encoder_type} not supported")
 
@@ -70,6 +132,25 @@ class Audio2Expression(nn.Module):
 
         self.output_proj = nn.Linear(hidden_dim, expression_dim)
 
+        # early exit: run only this many wav2vec transformer layers at inference (None: all)
+        self.encoder_layers = None
+
+        # channels-last inference blocks, built by fuse_inference_blocks()
+        self.fused_identity_net = None
+        self.fused_decoder = None
+
+    def fuse_inference_blocks(self):
+        """
+        Switches eval-mode decoding to channels-last FusedConvNormRelu blocks (norm_type='ln' only).
+
+        The fused blocks copy the current weights, call this again after loading new ones.
+        Training mode always uses the original blocks.
+        """
+        device = self.output_proj.weight.device
+        self.fused_identity_net = FusedBlockStack(self.identity_encoder.first_net.conv_layers).to(device)
+        self.fused_decoder = FusedBlockStack(self.decoder[0]).to(device)
+        return self
+
     def freeze_encoder_parameters(self, do_freeze=False):
 
         for name, param in self.audio_encoder.named_parameters():
@@ -79,25 +160,102 @@ class Audio2Expression(nn.Module):
                 param.requires_grad = (not do_freeze)
 
     def forward(self, input_dict):
+        """
+        Args:
+            input_dict: ``id_idx`` one-hot [B, num_identity_classes] and the encoder input, see ``encode``
 
-        if 'time_steps' not in input_dict:
-            audio_length = input_dict['input_audio_array'].shape[1]
-            time_steps = math.ceil(audio_length / 16000 * 30)
+        Returns:
+            Expression weights [B, T, expression_dim]; for padded batches frames past a clip's
+            time_steps are undefined and should be trimmed
+        """
+        if 'hidden_states' in input_dict:
+            hidden_states = input_dict['hidden_states']
+            frame_mask = self.frame_mask(input_dict.get('time_steps', None), hidden_states.shape[1], hidden_states.device)
         else:
-            time_steps = input_dict['time_steps']
+            hidden_states, frame_mask = self.encode(input_dict)
+        return self.decode(hidden_states, input_dict['id_idx'], frame_mask)
+
+    def frame_mask(self, time_steps, num_frames, device):
+        """(B, T) valid frames of a padded batch, None when no clip is padded (always a mask for tensor time_steps)."""
+        if time_steps is None or isinstance(time_steps, int):
+            return None
+        if not torch.is_tensor(time_steps) and all(int(t) == num_frames for t in time_steps):
+            return None
+        return (torch.arange(num_frames, device=device)[None, :]
+                < torch.as_tensor(time_steps, device=device)[:, None])
+
+    def encode(self, input_dict):
+        """
+        Audio encoder, its features are interpolated to the output frame rate.
+
+        Args:
+            input_dict: either ``input_audio_array`` [B, num_samples] with optional
+                        ``audio_lengths`` [B] (valid samples per clip when clips are zero-padded
+                        to a common length; padding then does not affect the valid frames), or
+                        ``extract_features`` (feature extractor output, [B, 512, T50] for wav2vec) with
+                        ``time_steps`` and optional ``feature_lengths`` [B].
+                        ``time_steps``: output frames, an int or one per clip (a list or a tensor);
+                        ``padded_time_steps``: frames of a padded batch's output (max of
+                        ``time_steps`` if absent), fixed sizes let compiled graphs be reused
+
+        Returns:
+            tuple: (hidden states [B, T, 768], frame mask [B, T] or None)
+        """
+        time_steps = input_dict.get('time_steps', None)
+        encoder_kwargs = {} if self.encoder_layers is None else dict(num_layers=self.encoder_layers)
+        if input_dict.get('padded_time_steps', None) is not None:
+            encoder_kwargs['padded_frame_num'] = input_dict['padded_time_steps']
+
+        if 'extract_features' in input_dict:
+            if time_steps is None:
+                raise ValueError("time_steps is required with extract_features")
+            hidden_states = self.audio_encoder(None,
+                                               frame_num=time_steps,
+                                               features=input_dict['extract_features'],
+                                               feature_lengths=input_dict.get('feature_lengths', None),
+                                               **encoder_kwargs).last_hidden_state
+            return hidden_states, self.frame_mask(time_steps, hidden_states.shape[1], hidden_states.device)
 
-        # Process audio through encoder
         audio_input = input_dict['input_audio_array'].flatten(start_dim=1)
-        hidden_states = self.audio_encoder(audio_input, frame_num=time_steps).last_hidden_state
+        audio_lengths = input_dict.get('audio_lengths', None)
+        if audio_lengths is None:
+            if time_steps is None:
+                time_steps = math.ceil(audio_input.shape[1] / self.sample_rate * self.fps)
+            return self.audio_encoder(audio_input, frame_num=time_steps, **encoder_kwargs).last_hidden_state, None
+
+        if time_steps is None:
+            time_steps = [math.ceil(int(length) / self.sample_rate * self.fps) for length in audio_lengths]
+        audio_lengths = torch.as_tensor(audio_lengths, device=audio_input.device)
+        sample_mask = torch.arange(audio_input.shape[1], device=audio_input.device)[None, :] < audio_lengths[:, None]
+        hidden_states = self.audio_encoder(audio_input, attention_mask=sample_mask, frame_num=time_steps,
+                                           **encoder_kwargs).last_hidden_state
+        return hidden_states, self.frame_mask(time_steps, hidden_states.shape[1], hidden_states.device)
+
+    def decode(self, hidden_states, identity, frame_mask=None):
+        """
+        Args:
+            hidden_states: Audio encoder output [B, T, 768]
+            identity: One-hot identity [B, num_identity_classes]
+            frame_mask: Valid frames [B, T] of a padded batch
+
+        Returns:
+            Expression weights [B, T, expression_dim]
+        """
+        if self.fused_decoder is not None and not self.training:
+            return self.decode_channels_last(hidden_states, identity, frame_mask)
 
         # Project features to hidden dimension
         audio_features = self.feature_projection(hidden_states).transpose(1, 2)
 
         # Process identity-conditioned features
-        audio_features = self.identity_encoder(audio_features, identity=input_dict['id_idx'])
+        audio_features = self.identity_encoder(audio_features, identity=identity, mask=frame_mask)
 
         # Refine features through decoder
-        audio_features = self.decoder[0](audio_features)
+        if frame_mask is None:
+            audio_features = self.decoder[0](audio_features)
+        else:
+            for layer in self.decoder[0]:
+                audio_features = layer(audio_features, mask=frame_mask)
 
         # Generate output parameters
         audio_features = audio_features.permute(0, 2, 1)
@@ -106,6 +264,25 @@ class Audio2Expression(nn.Module):
         return torch.sigmoid(expression_params)
 
 
+    def decode_channels_last(self, hidden_states, identity, frame_mask=None):
+        """Eval-mode ``decode`` on (B, T, C) tensors with the fused blocks."""
+        identity_encoder = self.identity_encoder
+        audio_features = self.feature_projection(hidden_states)
+
+        # the identity 1x1 conv sees the same one-hot at every frame, evaluate it once
+        identity = identity.reshape(identity.shape[0], -1).to(torch.float32)
+        identity = F.linear(identity, identity_encoder.id_mlp.weight[:, :, 0], identity_encoder.id_mlp.bias)
+        audio_features = torch.cat([audio_features,
+                                    identity[:, None, :].expand(-1, audio_features.shape[1], -1)], dim=2)
+
+        audio_features = self.fused_identity_net(audio_features, mask=frame_mask)
+        if identity_encoder.use_transformer:
+            audio_features = identity_encoder.run_transformer(audio_features, frame_mask)
+
+        audio_features = self.fused_decoder(audio_features, mask=frame_mask)
+        return torch.sigmoid(self.output_proj(audio_features))
+
+
 class AudioIdentityEncoder(nn.Module):
     def __init__(self,
                  hidden_dim,
@@ -136,25 +313,32 @@ class AudioIdentityEncoder(nn.Module):
     def forward(self,
                 audio_features: torch.Tensor,
                 identity: torch.Tensor = None,
-                time_steps: int = None) -> tuple:
+                time_steps: int = None,
+                mask: torch.Tensor = None) -> tuple:
 
         audio_features = self.dropout(audio_features)
         identity = identity.reshape(identity.shape[0], -1, 1).repeat(1, 1, audio_features.shape[2]).to(torch.float32)
         identity = self.id_mlp(identity)
         audio_features = torch.cat([audio_features, identity], dim=1)
 
-        x = self.first_net(audio_features)
+        x = self.first_net(audio_features, mask=mask)
 
         if time_steps is not None:
             x = F.interpolate(x, size=time_steps, align_corners=False, mode='linear')
 
         if(self.use_transformer):
-            x = x.permute(0, 2, 1)
-            x = self.transformer_encoder(x)
-            x = x.permute(0, 2, 1)
+            x = self.run_transformer(x.permute(0, 2, 1), mask).permute(0, 2, 1)
 
         return x
 
+    def run_transformer(self, x, mask=None):
+        """transformer_encoder on (B, T, C); float32 at inference, its padding-mask fast path breaks under CPU autocast."""
+        padding_mask = None if mask is None else ~mask
+        if self.training:
+            return self.transformer_encoder(x, src_key_padding_mask=padding_mask)
+        with torch.autocast(device_type=x.device.type, enabled=False):
+            return self.transformer_encoder(x.float(), src_key_padding_mask=padding_mask)
+
 class ConvNormRelu(nn.Module):
     '''
     (B,C_in,H,W) -> (B, C_out, H, W)
@@ -271,7 +455,11 @@ class ConvNormRelu(nn.Module):
         else:
             self.relu = nn.ReLU()
 
-    def forward(self, x, **kwargs):
+    def forward(self, x, mask=None, **kwargs):
+        if mask is not None:
+            # (B, T) valid frames; padded frames are zeroed so the conv sees the same
+            # zero padding as for an unpadded clip
+            x = x.masked_fill(~mask[:, None, :], 0)
         if self.norm_type == 'ln':
             out = self.dropout(self.conv(x))
             out = self.norm(out.transpose(1,2)).transpose(1,2)
@@ -282,6 +470,87 @@ class ConvNormRelu(nn.Module):
             out += residual
         return self.relu(out)
 
+class FusedConvNormRelu(nn.Module):
+    '''
+    Inference form of a 1d ConvNormRelu with norm='ln', channels-last: (B, T, C_in) -> (B, T, C_out).
+
+    The conv runs as one matmul per kernel tap accumulated in place on the (B, T, C) layout, so
+    LayerNorm needs no transposes; dropout is dropped and residual add + ReLU run in place.
+    Weights are non-persistent buffers derived from the source block (build with from_module
+    after loading a checkpoint), the state dict is unaffected.
+    '''
+
+    def __init__(self, conv: nn.Conv1d, norm: nn.LayerNorm, residual_layer=None, leaky=False):
+        super().__init__()
+        if conv.stride != (1,) or conv.groups != 1 or conv.dilation != (1,) or conv.padding != ((conv.kernel_size[0] - 1) // 2,):
+            raise ValueError("FusedConvNormRelu needs a stride 1, same-padded, ungrouped conv")
+        self.padding = conv.padding[0]
+        self.eps = norm.eps
+        self.leaky = leaky
+        self.residual = residual_layer is not None
+        self.residual_conv = isinstance(residual_layer, nn.Sequential)
+        # (k, C_in, C_out): one right-hand matrix per tap
+        weight, bias = self._tap_weights(conv)
+        self.register_buffer("weight", weight, persistent=False)
+        self.register_buffer("bias", bias, persistent=False)
+        self.register_buffer("norm_weight", norm.weight.detach().clone(), persistent=False)
+        self.register_buffer("norm_bias", norm.bias.detach().clone(), persistent=False)
+        if self.residual_conv:
+            residual_weight, residual_bias = self._tap_weights(residual_layer[0])
+            self.residual_padding = residual_layer[0].padding[0]
+            self.register_buffer("residual_weight", residual_weight, persistent=False)
+            self.register_buffer("residual_bias", residual_bias, persistent=False)
+
+    @staticmethod
+    def _tap_weights(conv: nn.Conv1d):
+        return conv.weight.detach().permute(2, 1, 0).contiguous(), conv.bias.detach().clone()
+
+    @classmethod
+    def from_module(cls, module: ConvNormRelu) -> "FusedConvNormRelu":
+        if module.norm_type != 'ln' or not isinstance(module.conv, nn.Conv1d):
+            raise ValueError("Only 1d ConvNormRelu blocks with norm='ln' can be fused")
+        residual_layer = module.residual_layer if module.residual else None
+        return cls(module.conv, module.norm, residual_layer, isinstance(module.relu, nn.LeakyReLU))
+
+    @staticmethod
+    def _conv(x, weight, bias, padding):
+        num_frames = x.shape[1]
+        x = F.pad(x, (0, 0, padding, padding))
+        out = torch.baddbmm(bias.view(1, 1, -1), x[:, :num_frames], weight[0].expand(x.shape[0], -1, -1))
+        # in-place ops are not autocast, match the dtype autocast picked for the first tap
+        x, weight = x.to(out.dtype), weight.to(out.dtype)
+        for tap in range(1, weight.shape[0]):
+            out.baddbmm_(x[:, tap:tap + num_frames], weight[tap].expand(x.shape[0], -1, -1))
+        return out
+
+    def forward(self, x, mask=None):
+        if mask is not None:
+            x = x.masked_fill(~mask[..., None], 0)
+        out = self._conv(x, self.weight, self.bias, self.padding)
+        out = F.layer_norm(out, self.norm_weight.shape, self.norm_weight, self.norm_bias, self.eps)
+        if self.residual:
+            if self.residual_conv:
+                out += self._conv(x, self.residual_weight, self.residual_bias, self.residual_padding)
+            else:
+                out += x
+        if self.leaky:
+            return F.leaky_relu_(out, 0.2)
+        return out.relu_()
+
+
+class FusedBlockStack(nn.Module):
+    '''Channels-last chain of FusedConvNormRelu blocks: (B, T, C) -> (B, T, C_out).'''
+
+    def __init__(self, blocks):
+        super().__init__()
+        self.blocks = nn.ModuleList([FusedConvNormRelu.from_module(block) for block in blocks])
+
+    def forward(self, x, mask=None):
+        for block in self.blocks:
+            x = block(x, mask=mask)
+        return x
+
+
 """ from https://github.com/ai4r/Gesture-Generation-from-Trimodal-Context.git """
 class SeqTranslator1D(nn.Module):
     '''
@@ -323,324 +592,9 @@ class SeqTranslator1D(nn.Module):
                 self.num_layers += 1
         self.conv_layers = nn.Sequential(*conv_layers)
 
-    def forward(self, x):
-        return self.conv_layers(x)
-
-
-def audio_chunking(audio: torch.Tensor, frame_rate: int = 30, chunk_size: int = 16000):
-    """
-    :param audio: 1 x T tensor containing a 16kHz audio signal
-    :param frame_rate: frame rate for video (we need one audio chunk per video frame)
-    :param chunk_size: number of audio samples per chunk
-    :return: num_chunks x chunk_size tensor containing sliced audio
-    """
-    samples_per_frame = 16000 // frame_rate
-    padding = (chunk_size - samples_per_frame) // 2
-    audio = torch.nn.functional.pad(audio.unsqueeze(0), pad=[padding, padding]).squeeze(0)
-    anchor_points = list(range(chunk_size//2, audio.shape[-1]-chunk_size//2, samples_per_frame))
-    audio = torch.cat([audio[:, i-chunk_size//2:i+chunk_size//2] for i in anchor_points], dim=0)
-    return audio
-
-""" https://github.com/facebookresearch/meshtalk """
-class MeshtalkEncoder(nn.Module):
-    def __init__(self, latent_dim: int = 128, model_name: str = 'audio_encoder'):
-        """
-        :param latent_dim: size of the latent audio embedding
-        :param model_name: name of the model, used to load and save the model
-        """
-        super().__init__()
-
-        self.melspec = ta.transforms.MelSpectrogram(
-            sample_rate=16000, n_fft=2048, win_length=800, hop_length=160, n_mels=80
-        )
-
-        conv_len = 5
-        self.convert_dimensions = torch.nn.Conv1d(80, 128, kernel_size=conv_len)
-        self.weights_init(self.convert_dimensions)
-        self.receptive_field = conv_len
-
-        convs = []
-        for i in range(6):
-            dilation = 2 * (i % 3 + 1)
-            self.receptive_field += (conv_len - 1) * dilation
-            convs += [torch.nn.Conv1d(128, 128, kernel_size=conv_len, dilation=dilation)]
-            self.weights_init(convs[-1])
-        self.convs = torch.nn.ModuleList(convs)
-        self.code = torch.nn.Linear(128, latent_dim)
-
-        self.apply(lambda x: self.weights_init(x))
-
-    def weights_init(self, m):
-        if isinstance(m, torch.nn.Conv1d):
-            torch.nn.init.xavier_uniform_(m.weight)
-            try:
-                torch.nn.init.constant_(m.bias, .01)
-            except:
-                pass
-
-    def forward(self, audio: torch.Tensor):
-        """
-        :param audio: B x T x 16000 Tensor containing 1 sec of audio centered around the current time frame
-        :return: code: B x T x latent_dim Tensor containing a latent audio code/embedding
-        """
-        B, T = audio.shape[0], audio.shape[1]
-        x = self.melspec(audio).squeeze(1)
-        x = torch.log(x.clamp(min=1e-10, max=None))
-        if T == 1:
-            x = x.unsqueeze(1)
-
-        # Convert to the right dimensionality
-        x = x.view(-1, x.shape[2], x.shape[3])
-        x = F.leaky_relu(self.convert_dimensions(x), .2)
-
-        # Process stacks
-        for conv in self.convs:
-            x_ = F.leaky_relu(conv(x), .2)
-            if self.training:
-                x_ = F.dropout(x_, .2)
-            l = (x.shape[2] - x_.shape[2]) // 2
-            x = (x[:, :, l:-l] + x_) / 2
-
-        x = torch.mean(x, dim=-1)
-        x = x.view(B, T, x.shape[-1])
-        x = self.code(x)
-
-        return {"code": x}
-
-class PeriodicPositionalEncoding(nn.Module):
-    def __init__(self, d_model, dropout=0.1, period=15, max_seq_len=64):
-        super(PeriodicPositionalEncoding, self).__init__()
-        self.dropout = nn.Dropout(p=dropout)
-        pe = torch.zeros(period, d_model)
-        position = torch.arange(0, period, dtype=torch.float).unsqueeze(1)
-        div_term = torch.exp(torch.arange(0, d_model, 2).float() * (-math.log(10000.0) / d_model))
-        pe[:, 0::2] = torch.sin(position * div_term)
-        pe[:, 1::2] = torch.cos(position * div_term)
-        pe = pe.unsqueeze(0) # (1, period, d_model)
-        repeat_num = (max_seq_len//period) + 1
-        pe = pe.repeat(1, repeat_num, 1) # (1, repeat_num, period, d_model)
-        self.register_buffer('pe', pe)
-    def forward(self, x):
-        # print(self.pe.shape, x.shape)
-        x = x + self.pe[:, :x.size(1), :]
-        return self.dropout(x)
-
-
-class GeneratorTransformer(nn.Module):
-    def __init__(self,
-                 n_poses,
-                 each_dim: list,
-                 dim_list: list,
-                 training=True,
-                 device=None,
-                 identity=False,
-                 num_classes=0,
-                 ):
-        super().__init__()
-
-        self.training = training
-        self.device = device
-        self.gen_length = n_poses
-
-        norm = 'ln'
-        in_dim = 256
-        out_dim = 256
-
-        self.encoder_choice = 'faceformer'
-
-        self.audio_encoder = Wav2Vec2Model.from_pretrained("facebook/wav2vec2-base-960h")  # "vitouphy/wav2vec2-xls-r-300m-phoneme""facebook/wav2vec2-base-960h"
-        self.audio_encoder.feature_extractor._freeze_parameters()
-        self.audio_feature_map = nn.Linear(768, in_dim)
-
-        self.audio_middle = AudioEncoder(in_dim, out_dim, False, num_classes)
-
-        self.dim_list = dim_list
-
-        self.decoder = nn.ModuleList()
-        self.final_out = nn.ModuleList()
-
-        self.hidden_size = 768
-        self.transformer_de_layer = nn.TransformerDecoderLayer(
-            d_model=self.hidden_size,
-            nhead=4,
-            dim_feedforward=self.hidden_size*2,
-            batch_first=True
-            )
-        self.face_decoder = nn.TransformerDecoder(self.transformer_de_layer, num_layers=4)
-        self.feature2face = nn.Linear(256, self.hidden_size)
-
-        self.position_embeddings = PeriodicPositionalEncoding(self.hidden_size, period=64, max_seq_len=64)
-        self.id_maping = nn.Linear(12,self.hidden_size)
-
-
-        self.decoder.append(self.face_decoder)
-        self.final_out.append(nn.Linear(self.hidden_size, 32))
-
-    def forward(self, in_spec, gt_poses=None, id=None, pre_state=None, time_steps=None):
-        if gt_poses is None:
-            time_steps = 64
-        else:
-            time_steps = gt_poses.shape[1]
-
-        # vector, hidden_state = self.audio_encoder(in_spec, pre_state, time_steps=time_steps)
-        if self.encoder_choice == 'meshtalk':
-            in_spec = audio_chunking(in_spec.squeeze(-1), frame_rate=30, chunk_size=16000)
-            feature = self.audio_encoder(in_spec.unsqueeze(0))["code"].transpose(1, 2)
-        elif self.encoder_choice == 'faceformer':
-            hidden_states = self.audio_encoder(in_spec.reshape(in_spec.shape[0], -1), frame_num=time_steps).last_hidden_state
-            feature = self.audio_feature_map(hidden_states).transpose(1, 2)
-        else:
-            feature, hidden_state = self.audio_encoder(in_spec, pre_state, time_steps=time_steps)
-
-        feature, _ = self.audio_middle(feature, id=None)
-        feature = self.feature2face(feature.permute(0,2,1))
-
-        id = id.unsqueeze(1).repeat(1,64,1).to(torch.float32)
-        id_feature = self.id_maping(id)
-        id_feature = self.position_embeddings(id_feature)
-
-        for i in range(self.decoder.__len__()):
-            mid = self.decoder[i](tgt=id_feature, memory=feature)
-            out = self.final_out[i](mid)
-
-        return out, None
-
-def linear_interpolation(features, output_len: int):
-    features = features.transpose(1, 2)
-    output_features = F.interpolate(
-        features, size=output_len, align_corners=True, mode='linear')
-    return output_features.transpose(1, 2)
-
-def init_biased_mask(n_head, max_seq_len, period):
-
-    def get_slopes(n):
-
-        def get_slopes_power_of_2(n):
-            start = (2**(-2**-(math.log2(n) - 3)))
-            ratio = start
-            return [start * ratio**i for i in range(n)]
-
-        if math.log2(n).is_integer():
-            return get_slopes_power_of_2(n)
-        else:
-            closest_power_of_2 = 2**math.floor(math.log2(n))
-            return get_slopes_power_of_2(closest_power_of_2) + get_slopes(
-                2 * closest_power_of_2)[0::2][:n - closest_power_of_2]
-
-    slopes = torch.Tensor(get_slopes(n_head))
-    bias = torch.div(
-        torch.arange(start=0, end=max_seq_len,
-                     step=period).unsqueeze(1).repeat(1, period).view(-1),
-        period,
-        rounding_mode='floor')
-    bias = -torch.flip(bias, dims=[0])
-    alibi = torch.zeros(max_seq_len, max_seq_len)
-    for i in range(max_seq_len):
-        alibi[i, :i + 1] = bias[-(i + 1):]
-    alibi = slopes.unsqueeze(1).unsqueeze(1) * alibi.unsqueeze(0)
-    mask = (torch.triu(torch.ones(max_seq_len,
-                                  max_seq_len)) == 1).transpose(0, 1)
-    mask = mask.float().masked_fill(mask == 0, float('-inf')).masked_fill(
-        mask == 1, float(0.0))
-    mask = mask.unsqueeze(0) + alibi
-    return mask
-
-
-# Alignment Bias
-def enc_dec_mask(device, T, S):
-    mask = torch.ones(T, S)
-    for i in range(T):
-        mask[i, i] = 0
-    return (mask == 1).to(device=device)
-
-
-# Periodic Positional Encoding
-class PeriodicPositionalEncoding(nn.Module):
-
-    def __init__(self, d_model, dropout=0.1, period=25, max_seq_len=3000):
-        super(PeriodicPositionalEncoding, self).__init__()
-        self.dropout = nn.Dropout(p=dropout)
-        pe = torch.zeros(period, d_model)
-        position = torch.arange(0, period, dtype=torch.float).unsqueeze(1)
-        div_term = torch.exp(
-            torch.arange(0, d_model, 2).float() *
-            (-math.log(10000.0) / d_model))
-        pe[:, 0::2] = torch.sin(position * div_term)
-        pe[:, 1::2] = torch.cos(position * div_term)
-        pe = pe.unsqueeze(0)  # (1, period, d_model)
-        repeat_num = (max_seq_len // period) + 1
-        pe = pe.repeat(1, repeat_num, 1)
-        self.register_buffer('pe', pe)
-
-    def forward(self, x):
-        x = x + self.pe[:, :x.size(1), :]
-        return self.dropout(x)
-
-
-class BaseModel(nn.Module):
-    """Base class for all models."""
-
-    def __init__(self):
-        super(BaseModel, self).__init__()
-        # self.logger = logging.getLogger(self.__class__.__name__)
-
-    def forward(self, *x):
-        """Forward pass logic.
-
-        :return: Model output
-        """
-        raise NotImplementedError
-
-    def freeze_model(self, do_freeze: bool = True):
-        for param in self.parameters():
-            param.requires_grad = (not do_freeze)
-
-    def summary(self, logger, writer=None):
-        """Model summary."""
-        model_parameters = filter(lambda p: p.requires_grad, self.parameters())
-        params = sum([np.prod(p.size())
-                      for p in model_parameters]) / 1e6  # Unit is Mega
-        logger.info('===>Trainable parameters: %.3f M' % params)
-        if writer is not None:
-            writer.add_text('Model Summary',
-                            'Trainable parameters: %.3f M' % params)
-
-
-"""https://github.com/X-niper/UniTalker"""
-class UniTalkerDecoderTransformer(BaseModel):
-
-    def __init__(self, out_dim, identity_num, period=30, interpolate_pos=1) -> None:
-        super().__init__()
-        self.learnable_style_emb = nn.Embedding(identity_num, out_dim)
-        self.PPE = PeriodicPositionalEncoding(
-            out_dim, period=period, max_seq_len=3000)
-        self.biased_mask = init_biased_mask(
-            n_head=4, max_seq_len=3000, period=period)
-        decoder_layer = nn.TransformerDecoderLayer(
-            d_model=out_dim,
-            nhead=4,
-            dim_feedforward=2 * out_dim,
-            batch_first=True)
-        self.transformer_decoder = nn.TransformerDecoder(
-            decoder_layer, num_layers=1)
-        self.interpolate_pos = interpolate_pos
-
-    def forward(self, hidden_states: torch.Tensor, style_idx: torch.Tensor,
-                frame_num: int):
-        style_idx = torch.argmax(style_idx, dim=1)
-        obj_embedding = self.learnable_style_emb(style_idx)
-        obj_embedding = obj_embedding.unsqueeze(1).repeat(1, frame_num, 1)
-        style_input = self.PPE(obj_embedding)
-        tgt_mask = self.biased_mask.repeat(style_idx.shape[0], 1, 1)[:, :style_input.shape[1], :style_input.
-                                    shape[1]].clone().detach().to(
-                                        device=style_input.device)
-        memory_mask = enc_dec_mask(hidden_states.device, style_input.shape[1],
-                                   frame_num)
-        feat_out = self.transformer_decoder(
-            style_input,
-            hidden_states,
-            tgt_mask=tgt_mask,
-            memory_mask=memory_mask)
-        if self.interpolate_pos == 2:
-            feat_out = linear_interpolation(feat_out, output_len=frame_num)
-        return feat_out
\ No newline at end of file
+    def forward(self, x, mask=None):
+        if mask is None:
+            return self.conv_layers(x)
+        for layer in self.conv_layers:
+            x = layer(x, mask=mask)
+        return x
@@ -1,10 +1,15 @@
-import json
 import time
 import warnings
 import numpy as np
 from typing import List, Optional,Tuple
 from scipy.signal import savgol_filter
 
+from utils.blendshapes import (ARKitBlendShape, build_blendshape_animation, export_blendshape_animation,
+                               parse_quantization, quantize_blendshape_weights, dequantize_blendshape_weights,
+                               decode_blendshape_animation)
+from utils.resample import (FRAME_INTERPOLATION_METHODS, resample_frames, resample_frames_streaming,
+                            _frame_tangents, _interpolate_frames)
+
 
 ARKitLeftRightPair = [
         ("jawLeft", "jawRight"),
@@ -29,61 +34,6 @@ ARKitLeftRightPair = [
         ("eyeWideLeft","eyeWideRight")
     ]
 
-ARKitBlendShape =[
-   "browDownLeft",
-   "browDownRight",
-   "browInnerUp",
-   "browOuterUpLeft",
-   "browOuterUpRight",
-   "cheekPuff",
-   "cheekSquintLeft",
-   "cheekSquintRight",
-   "eyeBlinkLeft",
-   "eyeBlinkRight",
-   "eyeLookDownLeft",
-   "eyeLookDownRight",
-   "eyeLookInLeft",
-   "eyeLookInRight",
-   "eyeLookOutLeft",
-   "eyeLookOutRight",
-   "eyeLookUpLeft",
-   "eyeLookUpRight",
-   "eyeSquintLeft",
-   "eyeSquintRight",
-   "eyeWideLeft",
-   "eyeWideRight",
-   "jawForward",
-   "jawLeft",
-   "jawOpen",
-   "jawRight",
-   "mouthClose",
-   "mouthDimpleLeft",
-   "mouthDimpleRight",
-   "mouthFrownLeft",
-   "mouthFrownRight",
-   "mouthFunnel",
-   "mouthLeft",
-   "mouthLowerDownLeft",
-   "mouthLowerDownRight",
-   "mouthPressLeft",
-   "mouthPressRight",
-   "mouthPucker",
-   "mouthRight",
-   "mouthRollLower",
-   "mouthRollUpper",
-   "mouthShrugLower",
-   "mouthShrugUpper",
-   "mouthSmileLeft",
-   "mouthSmileRight",
-   "mouthStretchLeft",
-   "mouthStretchRight",
-   "mouthUpperUpLeft",
-   "mouthUpperUpRight",
-   "noseSneerLeft",
-   "noseSneerRight",
-   "tongueOut"
-]
-
 MOUTH_BLENDSHAPES = [ "mouthDimpleLeft",
                     "mouthDimpleRight",
                     "mouthFrownLeft",
@@ -121,6 +71,9 @@ DEFAULT_CONTEXT ={
     'previous_expression': None,
     'previous_volume': None,
     'previous_headpose': None,
+    'resample_state': None,
+    'streamed_samples': 0,
+    'idle_motion': None,
 }
 
 RETURN_CODE = {
@@ -206,172 +159,51 @@ def apply_random_eye_blinks(
         input: np.ndarray,
         blink_scale: tuple = (0.8, 1.0),
         blink_interval: tuple = (60, 120),
-        blink_duration: int = 7
+        idle_motion: "IdleMotionGenerator" = None
 ) -> np.ndarray:
     """
-    Apply randomized eye blinks to blendshape parameters
+    Replace the eye blink channels of a whole clip with randomized blinks
 
     Args:
-        output: Input array of shape (N, 52) containing blendshape parameters
+        input: Input array of shape (N, 52) containing blendshape parameters
         blink_scale: Tuple (min, max) for random blink intensity scaling
         blink_interval: Tuple (min, max) for random blink spacing in frames
-        blink_duration: Number of frames for blink animation (fixed)
+        idle_motion: Blink schedule to use; an unseeded IdleMotionGenerator with the ranges above if None,
+                     whose first blink starts at frame 0
 
     Returns:
-        None (modifies output array in-place)
+        input, modified in-place
     """
-    # Define eye blink patterns (normalized 0-1)
-
-    # Initialize parameters
-    n_frames = input.shape[0]
-    input[:,8:10] = np.zeros((n_frames,2))
-    current_frame = 0
-
-    # Main blink application loop
-    while current_frame < n_frames - blink_duration:
-        # Randomize blink parameters
-        scale = np.random.uniform(*blink_scale)
-        pattern = BLINK_PATTERNS[np.random.randint(0, 4)]
-
-        # Apply blink animation
-        blink_values = pattern * scale
-        input[current_frame:current_frame + blink_duration, 8] = blink_values
-        input[current_frame:current_frame + blink_duration, 9] = blink_values
-
-        # Advance to next blink position
-        current_frame += blink_duration + np.random.randint(*blink_interval)
-
-    return input
+    if idle_motion is None:
+        idle_motion = IdleMotionGenerator(blink_at_start=True, blink_interval=blink_interval, blink_intensity=blink_scale)
+    return idle_motion.stamp_blinks(input, clear=True)
 
 
 def apply_random_eye_blinks_context(
         animation_params: np.ndarray,
         processed_frames: int = 0,
-        intensity_range: tuple = (0.8, 1.0)
+        idle_motion: "IdleMotionGenerator" = None,
+        frame_offset: int = 0
 ) -> np.ndarray:
-    """Applies random eye blink patterns to facial animation parameters.
+    """Applies random eye blink patterns to the new frames of a streaming chunk.
 
     Args:
         animation_params: Input facial animation parameters array with shape [num_frames, num_features].
                           Columns 8 and 9 typically represent left/right eye blink parameters.
         processed_frames: Number of already processed frames that shouldn't be modified
-        intensity_range: Tuple defining (min, max) scaling for blink intensity
+        idle_motion: Blink schedule of the stream (see IdleMotionGenerator); a fresh unseeded one if None,
+                     which forgets the blinks of earlier chunks
+        frame_offset: Stream index of ``animation_params[processed_frames]``
 
     Returns:
         Modified animation parameters array with random eye blinks added to unprocessed frames
     """
-    remaining_frames = animation_params.shape[0] - processed_frames
-
-    # Only apply blinks if there's enough remaining frames (blink pattern requires 7 frames)
-    if remaining_frames <= 7:
-        return animation_params
-
-    # Configure blink timing parameters
-    min_blink_interval = 40  # Minimum frames between blinks
-    max_blink_interval = 100  # Maximum frames between blinks
-
-    # Find last blink in previously processed frames (column 8 > 0.5 indicates blink)
-    previous_blink_indices = np.where(animation_params[:processed_frames, 8] > 0.5)[0]
-    last_processed_blink = previous_blink_indices[-1] - 7 if previous_blink_indices.size > 0 else processed_frames
-
-    # Calculate first new blink position
-    blink_interval = np.random.randint(min_blink_interval, max_blink_interval)
-    first_blink_start = max(0, blink_interval - last_processed_blink)
-
-    # Apply first blink if there's enough space
-    if first_blink_start <= (remaining_frames - 7):
-        # Randomly select blink pattern and intensity
-        blink_pattern = BLINK_PATTERNS[np.random.randint(0, 4)]
-        intensity = np.random.uniform(*intensity_range)
-
-        # Calculate blink frame range
-        blink_start = processed_frames + first_blink_start
-        blink_end = blink_start + 7
-
-        # Apply pattern to both eyes
-        animation_params[blink_start:blink_end, 8] = blink_pattern * intensity
-        animation_params[blink_start:blink_end, 9] = blink_pattern * intensity
-
-        # Check space for additional blink
-        remaining_after_blink = animation_params.shape[0] - blink_end
-        if remaining_after_blink > min_blink_interval:
-            # Calculate second blink position
-            second_intensity = np.random.uniform(*intensity_range)
-            second_interval = np.random.randint(min_blink_interval, max_blink_interval)
-
-            if (remaining_after_blink - 7) > second_interval:
-                second_pattern = BLINK_PATTERNS[np.random.randint(0, 4)]
-                second_blink_start = blink_end + second_interval
-                second_blink_end = second_blink_start + 7
-
-                # Apply second blink
-                animation_params[second_blink_start:second_blink_end, 8] = second_pattern * second_intensity
-                animation_params[second_blink_start:second_blink_end, 9] = second_pattern * second_intensity
-
+    if idle_motion is None:
+        idle_motion = IdleMotionGenerator()
+    idle_motion.stamp_blinks(animation_params[processed_frames:], frame_offset)
     return animation_params
 
 
-def export_blendshape_animation(
-        blendshape_weights: np.ndarray,
-        output_path: str,
-        blendshape_names: List[str],
-        fps: float,
-        rotation_data: Optional[np.ndarray] = None
-) -> None:
-    """
-    Export blendshape animation data to JSON format compatible with ARKit.
-
-    Args:
-        blendshape_weights: 2D numpy array of shape (N, 52) containing animation frames
-        output_path: Full path for output JSON file (including .json extension)
-        blendshape_names: Ordered list of 52 ARKit-standard blendshape names
-        fps: Frame rate for timing calculations (frames per second)
-        rotation_data: Optional 3D rotation data array of shape (N, 3)
-
-    Raises:
-        ValueError: If input dimensions are incompatible
-        IOError: If file writing fails
-    """
-    # Validate input dimensions
-    if blendshape_weights.shape[1] != 52:
-        raise ValueError(f"Expected 52 blendshapes, got {blendshape_weights.shape[1]}")
-    if len(blendshape_names) != 52:
-        raise ValueError(f"Requires 52 blendshape names, got {len(blendshape_names)}")
-    if rotation_data is not None and len(rotation_data) != len(blendshape_weights):
-        raise ValueError("Rotation data length must match animation frames")
-
-    # Build animation data structure
-    animation_data = {
-        "names":blendshape_names,
-        "metadata": {
-            "fps": fps,
-            "frame_count": len(blendshape_weights),
-            "blendshape_names": blendshape_names
-        },
-        "frames": []
-    }
-
-    # Convert numpy array to serializable format
-    for frame_idx in range(blendshape_weights.shape[0]):
-        frame_data = {
-            "weights": blendshape_weights[frame_idx].tolist(),
-            "time": frame_idx / fps,
-            "rotation": rotation_data[frame_idx].tolist() if rotation_data else []
-        }
-        animation_data["frames"].append(frame_data)
-
-    # Safeguard against data loss
-    if not output_path.endswith('.json'):
-        output_path += '.json'
-
-    # Write to file with error handling
-    try:
-        with open(output_path, 'w', encoding='utf-8') as json_file:
-            json.dump(animation_data, json_file, indent=2, ensure_ascii=False)
-    except Exception as e:
-        raise IOError(f"Failed to write animation data: {str(e)}") from e
-
-
 def apply_savitzky_golay_smoothing(
         input_data: np.ndarray,
         window_length: int = 5,
@@ -681,72 +513,210 @@ BROW3 = np.array([
                 [0.    , 0.    , 0.108 , 0.014 , 0.014 ]])
 
 
-import numpy as np
-from scipy.ndimage import label
-
-
-def apply_random_brow_movement(input_exp, volume):
-    FRAME_SEGMENT = 150
-    HOLD_THRESHOLD = 10
-    VOLUME_THRESHOLD = 0.08
-    MIN_REGION_LENGTH = 6
-    STRENGTH_RANGE = (0.7, 1.3)
-
-    BROW_PEAKS = {
-        0: np.argmax(BROW1[:, 2]),
-        1: np.argmax(BROW2[:, 2])
-    }
+def apply_random_brow_movement(input_exp, volume, idle_motion=None):
+    """Adds volume-driven brow raises (see ``IdleMotionGenerator.stamp_brows``), unseeded if ``idle_motion`` is None."""
+    if idle_motion is None:
+        idle_motion = IdleMotionGenerator()
+    return idle_motion.stamp_brows(input_exp, volume)
 
-    for seg_start in range(0, len(volume), FRAME_SEGMENT):
-        seg_end = min(seg_start + FRAME_SEGMENT, len(volume))
-        seg_volume = volume[seg_start:seg_end]
 
-        candidate_regions = []
+def volume_regions(mask: np.ndarray, min_length: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """Start / end (exclusive) frames of the runs of True in ``mask`` that are at least ``min_length`` long."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    keep = ends - starts >= min_length
+    return starts[keep], ends[keep]
 
-        high_vol_mask = seg_volume > VOLUME_THRESHOLD
-        labeled_array, num_features = label(high_vol_mask)
 
-        for i in range(1, num_features + 1):
-            region = (labeled_array == i)
-            region_indices = np.where(region)[0]
-            if len(region_indices) >= MIN_REGION_LENGTH:
-                candidate_regions.append(region_indices)
+class IdleMotionGenerator:
+    """Procedural eye blinks and brow raises of one request or stream.
 
-        if candidate_regions:
-            selected_region = candidate_regions[np.random.choice(len(candidate_regions))]
-            region_start = selected_region[0]
-            region_end = selected_region[-1]
-            region_length = region_end - region_start + 1
+    All randomness comes from a ``np.random.Generator`` seeded with ``seed`` (split into
+    independent blink and brow streams), so a seed reproduces the same animation and sessions
+    do not share state. Blink events (start frame, ``BLINK_PATTERNS`` entry, intensity) are
+    drawn ahead in blocks of ``schedule_block`` events; brow choices are drawn per
+    ``brow_segment`` frames. Stamping touches only the events that overlap the given frames,
+    so a streaming chunk costs O(events in the chunk) whatever the stream length.
 
-            brow_idx = np.random.randint(0, 2)
-            base_brow = BROW1 if brow_idx == 0 else BROW2
-            peak_idx = BROW_PEAKS[brow_idx]
+    Frames are addressed by their absolute index in the stream: stamp chunks in order
+    (``frame_offset`` never decreasing), events that ended before ``frame_offset`` are dropped.
 
-            if region_length > HOLD_THRESHOLD:
-                local_max_pos = seg_volume[selected_region].argmax()
-                global_peak_frame = seg_start + selected_region[local_max_pos]
+    Patterns, intervals and frame counts are given at 30 fps; at another ``fps`` the patterns
+    are resampled and the counts scaled by fps / 30, so blinks and raises keep their duration
+    in seconds.
+    """
 
+    BLINK_COLUMNS = [ARKitBlendShape.index("eyeBlinkLeft"), ARKitBlendShape.index("eyeBlinkRight")]
+    BLINKS = np.stack(BLINK_PATTERNS)
+    BROWS = (BROW1, BROW2)
+    # frame rate of the patterns and of the frame counts passed to __init__
+    PATTERN_FPS = 30.0
+
+    def __init__(self,
+                 seed=None,
+                 fps: float = PATTERN_FPS,
+                 blink_at_start: bool = False,
+                 blink_interval: tuple = (40, 100),
+                 blink_intensity: tuple = (0.8, 1.0),
+                 brow_strength: tuple = (0.7, 1.3),
+                 brow_segment: int = 150,
+                 brow_volume_threshold: float = 0.08,
+                 brow_min_region: int = 6,
+                 brow_hold_threshold: int = 10,
+                 schedule_block: int = 64):
+        """
+        Args:
+            seed: Seed of ``np.random.SeedSequence`` (None: fresh OS entropy)
+            fps: Frame rate of the stamped frames
+            blink_at_start: Start the first blink at frame 0, as offline clips do; streams wait one interval
+            blink_interval: (min, max) frames between the end of a blink and the next one
+            blink_intensity: (min, max) scale of a blink pattern
+            brow_strength: (min, max) scale of a brow raise
+            brow_segment: Frames per brow segment, at most one raise per segment
+            brow_volume_threshold: RMS volume above which a frame counts as voiced
+            brow_min_region: Shortest voiced run (frames) that gets a raise
+            brow_hold_threshold: Voiced runs longer than this rise to the peak and hold it
+            schedule_block: Blink events drawn at once
+        """
+        blink_sequence, brow_sequence = np.random.SeedSequence(seed).spawn(2)
+        self.blink_rng = np.random.default_rng(blink_sequence)
+        self.brow_rng = np.random.default_rng(brow_sequence)
+        self.fps = fps
+        self.blink_at_start = blink_at_start
+        self.blinks = self.scale_patterns(self.BLINKS.T, fps).T
+        self.brows = tuple(self.scale_patterns(brow, fps) for brow in self.BROWS)
+        # frame of the highest browInnerUp, held while the voice stays loud
+        self.brow_peaks = tuple(int(np.argmax(brow[:, 2])) for brow in self.brows)
+        frames = lambda count: max(1, int(round(count * fps / self.PATTERN_FPS)))
+        self.blink_interval = tuple(frames(count) for count in blink_interval)
+        self.blink_intensity = blink_intensity
+        self.brow_strength = brow_strength
+        self.brow_segment = frames(brow_segment)
+        self.brow_volume_threshold = brow_volume_threshold
+        self.brow_min_region = frames(brow_min_region)
+        self.brow_hold_threshold = frames(brow_hold_threshold)
+        self.schedule_block = schedule_block
+
+        # pending blink events, ascending start frames
+        self.blink_starts = np.zeros(0, dtype=np.int64)
+        self.blink_patterns = np.zeros(0, dtype=np.int64)
+        self.blink_intensities = np.zeros(0)
+        self._blink_schedule_end = 0
+        # per-segment brow draws: region choice in [0, 1), brows index, strength
+        self.brow_choices = np.zeros(0)
+        self.brow_indices = np.zeros(0, dtype=np.int64)
+        self.brow_strengths = np.zeros(0)
+
+    @classmethod
+    def scale_patterns(cls, patterns: np.ndarray, fps: float) -> np.ndarray:
+        """[num_frames, C] patterns at ``PATTERN_FPS`` resampled to ``fps``."""
+        if fps == cls.PATTERN_FPS:
+            return patterns
+        return resample_frames(patterns, cls.PATTERN_FPS, fps, "monotone")
+
+    def _extend_blinks(self, end_frame: int) -> None:
+        """Draws blink events until the schedule covers ``end_frame``."""
+        duration = self.blinks.shape[1]
+        while self._blink_schedule_end < end_frame:
+            n = self.schedule_block
+            intervals = self.blink_rng.integers(*self.blink_interval, size=n)
+            if self.blink_at_start and self._blink_schedule_end == 0:
+                # the interval is counted from the previous blink, the first one has none
+                intervals[0] = 0
+            # each blink starts an interval after the previous one ended
+            starts = self._blink_schedule_end + np.cumsum(intervals) + np.arange(n) * duration
+            self.blink_starts = np.concatenate([self.blink_starts, starts])
+            self.blink_patterns = np.concatenate([self.blink_patterns,
+                                                  self.blink_rng.integers(0, len(self.blinks), size=n)])
+            self.blink_intensities = np.concatenate([self.blink_intensities,
+                                                     self.blink_rng.uniform(*self.blink_intensity, size=n)])
+            self._blink_schedule_end = int(starts[-1]) + duration
+
+    def stamp_blinks(self, expression: np.ndarray, frame_offset: int = 0, clear: bool = False) -> np.ndarray:
+        """Writes the scheduled blinks into the eyeBlink columns of ``expression`` (in place).
+
+        Args:
+            expression: Frames [num_frames, 52] starting at absolute frame ``frame_offset``
+            frame_offset: Stream index of ``expression[0]``
+            clear: Zero the eyeBlink columns first (the model's own blinks are discarded)
+
+        Returns:
+            ``expression``
+        """
+        num_frames = expression.shape[0]
+        end_frame = frame_offset + num_frames
+        duration = self.blinks.shape[1]
+        self._extend_blinks(end_frame)
+
+        # drop events that ended before this chunk
+        first = int(np.searchsorted(self.blink_starts + duration, frame_offset, side="right"))
+        if first:
+            self.blink_starts = self.blink_starts[first:]
+            self.blink_patterns = self.blink_patterns[first:]
+            self.blink_intensities = self.blink_intensities[first:]
+
+        if clear:
+            expression[:, self.BLINK_COLUMNS] = 0
+        last = int(np.searchsorted(self.blink_starts, end_frame, side="left"))
+        for start, pattern, intensity in zip(self.blink_starts[:last], self.blink_patterns[:last],
+                                             self.blink_intensities[:last]):
+            lo, hi = max(start, frame_offset), min(start + duration, end_frame)
+            values = self.blinks[pattern, lo - start:hi - start] * intensity
+            expression[lo - frame_offset:hi - frame_offset, self.BLINK_COLUMNS] = values[:, None]
+        return expression
+
+    def _extend_brows(self, num_segments: int) -> None:
+        n = num_segments - self.brow_choices.shape[0]
+        if n > 0:
+            self.brow_choices = np.concatenate([self.brow_choices, self.brow_rng.random(n)])
+            self.brow_indices = np.concatenate([self.brow_indices, self.brow_rng.integers(0, len(self.brows), size=n)])
+            self.brow_strengths = np.concatenate([self.brow_strengths, self.brow_rng.uniform(*self.brow_strength, size=n)])
+
+    def stamp_brows(self, expression: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """Adds one brow raise per ``brow_segment`` frames on a voiced run of ``volume``.
+
+        A random voiced run of at least ``brow_min_region`` frames is picked per segment; long
+        runs rise to the brow peak at the loudest frame and hold it to the end of the run,
+        short ones get the whole animation centred on the run.
+
+        Args:
+            expression: Frames [num_frames, 52] of a whole clip, brows are added in place
+            volume: RMS volume per frame
+
+        Returns:
+            ``expression`` clipped to [0, 1]
+        """
+        segment = self.brow_segment
+        self._extend_brows(-(-len(volume) // segment))
+        for index, seg_start in enumerate(range(0, len(volume), segment)):
+            seg_end = min(seg_start + segment, len(volume))
+            seg_volume = volume[seg_start:seg_end]
+            starts, ends = volume_regions(seg_volume > self.brow_volume_threshold, self.brow_min_region)
+            if starts.size == 0:
+                continue
+
+            choice = int(self.brow_choices[index] * starts.size)
+            region_start, region_length = int(starts[choice]), int(ends[choice] - starts[choice])
+            brow_idx = int(self.brow_indices[index])
+            base_brow, peak_idx = self.brows[brow_idx], self.brow_peaks[brow_idx]
+            strength = self.brow_strengths[index]
+
+            if region_length > self.brow_hold_threshold:
+                local_max_pos = int(seg_volume[region_start:region_start + region_length].argmax())
+                global_peak_frame = seg_start + region_start + local_max_pos
                 rise_anim = base_brow[:peak_idx + 1]
-                hold_frame = base_brow[peak_idx:peak_idx + 1]
-
                 insert_start = max(global_peak_frame - peak_idx, seg_start)
                 insert_end = min(global_peak_frame + (region_length - local_max_pos), seg_end)
-
-                strength = np.random.uniform(*STRENGTH_RANGE)
-
                 if insert_start + len(rise_anim) <= seg_end:
-                    input_exp[insert_start:insert_start + len(rise_anim), :5] += rise_anim * strength
-                    hold_duration = insert_end - (insert_start + len(rise_anim))
-                    if hold_duration > 0:
-                        input_exp[insert_start + len(rise_anim):insert_end, :5] += np.tile(hold_frame * strength,
-                                                                                           (hold_duration, 1))
+                    expression[insert_start:insert_start + len(rise_anim), :5] += rise_anim * strength
+                    hold_start = insert_start + len(rise_anim)
+                    if insert_end > hold_start:
+                        expression[hold_start:insert_end, :5] += base_brow[peak_idx] * strength
             else:
                 anim_length = base_brow.shape[0]
                 insert_pos = seg_start + region_start + (region_length - anim_length) // 2
                 insert_pos = max(seg_start, min(insert_pos, seg_end - anim_length))
-
                 if insert_pos + anim_length <= seg_end:
-                    strength = np.random.uniform(*STRENGTH_RANGE)
-                    input_exp[insert_pos:insert_pos + anim_length, :5] += base_brow * strength
+                    expression[insert_pos:insert_pos + anim_length, :5] += base_brow * strength
 
-    return np.clip(input_exp, 0, 1)
\ No newline at end of file
+        return np.clip(expression, 0, 1)
@@ -5,12 +5,16 @@ This script combines the LAM_Audio2Expression inference with format conversion.
 """
 
 import os
-import json
 import subprocess
 import argparse
 import sys
 import tempfile
 
+# `python pdxutils/<script>.py` only puts pdxutils/ on sys.path; the pdxutils and utils packages live in the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdxutils.blendshape_formats import load, dump, load_animation, to_values
+
 def generate_blendshapes_complete_pipeline(audio_path, output_path, cleanup_intermediate=True):
     """
     Complete pipeline to generate blendshapes from audio
@@ -152,31 +156,17 @@ find_unused_parameters = False
         # Step 3: Convert to expected format
         print(f"🔄 Converting to expected format...")
         
-        # Load LAM output
-        with open(lam_output, 'r') as f:
-            lam_data = json.load(f)
-        
-        # Convert to expected format
-        names = lam_data['names']
-        frames = lam_data['frames']
-        
-        values = []
-        for frame in frames:
-            values.append(frame['weights'])
-        
-        expected_data = {
-            "names": names,
-            "values": values
-        }
-        
+        # Load LAM output and convert to expected format
+        layout, names, weights, fps = load_animation(load(lam_output))
+        expected_data = to_values(weights, names)
+
         # Save output
-        with open(output_path, 'w') as f:
-            json.dump(expected_data, f, indent=2)
-        
+        dump(expected_data, output_path, indent=2)
+
         print(f"✅ Successfully generated blendshapes!")
         print(f"📁 Output: {output_path}")
-        print(f"📊 Format: {len(values)} frames × {len(names)} blendshapes")
-        print(f"⏱️  Duration: {len(values)/30:.2f} seconds @ 30 FPS")
+        print(f"📊 Format: {len(weights)} frames × {len(names)} blendshapes")
+        print(f"⏱️  Duration: {len(weights)/fps:.2f} seconds @ {fps:g} FPS")
         
         # Cleanup
         if cleanup_intermediate:
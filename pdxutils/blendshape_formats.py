@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Conversion of (N, 52) ARKit blendshape matrices into every JSON layout used around pdxutils.
+
+    lam       {"names": [...52], "metadata": {...}, "frames": [{"weights", "time", "rotation"}]}
+    values    {"names": [...], "values": [[...], ...]}
+    expected  [{"time": t, "blendshapes": {"eyeBlinkLeft": w, ...55 names}}, ...]
+
+The 55-name target order of the expected layout (52 ARKit names plus headRoll, leftEyeRoll,
+rightEyeRoll) lives here only. Columns are reordered with one precomputed index array, rounding
+is vectorized and JSON goes through orjson when it is installed (falls back to json).
+"""
+
+import json
+
+import numpy as np
+
+from utils.blendshapes import ARKitBlendShape, build_blendshape_animation, decode_blendshape_animation
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Target order of the expected layout (from the reference blendshapes-700x9.json)
+EXPECTED_BLENDSHAPE_NAMES = [
+    "eyeBlinkLeft", "eyeLookDownLeft", "eyeLookInLeft", "eyeLookOutLeft",
+    "eyeLookUpLeft", "eyeSquintLeft", "eyeWideLeft", "eyeBlinkRight",
+    "eyeLookDownRight", "eyeLookInRight", "eyeLookOutRight", "eyeLookUpRight",
+    "eyeSquintRight", "eyeWideRight", "jawForward", "jawLeft", "jawRight",
+    "jawOpen", "mouthClose", "mouthFunnel", "mouthPucker", "mouthLeft",
+    "mouthRight", "mouthSmileLeft", "mouthSmileRight", "mouthFrownLeft",
+    "mouthFrownRight", "mouthDimpleLeft", "mouthDimpleRight", "mouthStretchLeft",
+    "mouthStretchRight", "mouthRollLower", "mouthRollUpper", "mouthShrugLower",
+    "mouthShrugUpper", "mouthPressLeft", "mouthPressRight", "mouthLowerDownLeft",
+    "mouthLowerDownRight", "mouthUpperUpLeft", "mouthUpperUpRight", "browDownLeft",
+    "browDownRight", "browInnerUp", "browOuterUpLeft", "browOuterUpRight",
+    "cheekPuff", "cheekSquintLeft", "cheekSquintRight", "noseSneerLeft",
+    "noseSneerRight", "tongueOut", "headRoll", "leftEyeRoll", "rightEyeRoll"
+]
+
+LAYOUTS = ("lam", "values", "expected")
+
+
+def column_permutation(source_names=ARKitBlendShape, target_names=EXPECTED_BLENDSHAPE_NAMES) -> np.ndarray:
+    """
+    Index array mapping target columns to source columns.
+
+    Target names missing from source_names map to len(source_names), the index of the zero
+    column appended by reorder_columns.
+    """
+    source_index = {name: i for i, name in enumerate(source_names)}
+    missing = len(source_names)
+    return np.array([source_index.get(name, missing) for name in target_names], dtype=np.int64)
+
+
+_EXPECTED_PERMUTATION = column_permutation()
+
+
+def reorder_columns(weights: np.ndarray, permutation: np.ndarray = _EXPECTED_PERMUTATION) -> np.ndarray:
+    """Reorders (N, C) weights to the permutation's target order, missing names become 0."""
+    padded = np.zeros((weights.shape[0], weights.shape[1] + 1), dtype=np.float64)
+    padded[:, :-1] = weights
+    return padded[:, permutation]
+
+
+def round_weights(weights: np.ndarray, decimals=None) -> np.ndarray:
+    weights = np.asarray(weights, dtype=np.float64)
+    if decimals is None:
+        return weights
+    # + 0.0 turns -0.0 into 0.0
+    return np.round(weights, decimals) + 0.0
+
+
+def frame_times(num_frames: int, fps: float, decimals=None) -> list:
+    return round_weights(np.arange(num_frames) / fps, decimals).tolist()
+
+
+def to_values(weights, names=ARKitBlendShape, decimals=None) -> dict:
+    """(N, C) -> {"names", "values"}"""
+    return {"names": list(names), "values": round_weights(weights, decimals).tolist()}
+
+
+def to_expected(weights, fps, source_names=ARKitBlendShape, decimals=None, time_decimals=None) -> list:
+    """(N, 52) -> [{"time", "blendshapes"}] in EXPECTED_BLENDSHAPE_NAMES order"""
+    permutation = _EXPECTED_PERMUTATION if source_names is ARKitBlendShape else column_permutation(source_names)
+    rows = round_weights(reorder_columns(weights, permutation), decimals).tolist()
+    times = frame_times(len(rows), fps, time_decimals)
+    names = EXPECTED_BLENDSHAPE_NAMES
+    return [{"time": time, "blendshapes": dict(zip(names, row))} for time, row in zip(times, rows)]
+
+
+def to_lam(weights, fps, decimals=None) -> dict:
+    """(N, 52) -> LAM animation dict (see models.utils.build_blendshape_animation)"""
+    return build_blendshape_animation(round_weights(weights, decimals), ARKitBlendShape, fps)
+
+
+def convert(weights, layout, fps=30.0, decimals=None, time_decimals=None):
+    """Builds ``layout`` (one of LAYOUTS) from a (N, 52) ARKit-ordered matrix."""
+    if layout == "lam":
+        return to_lam(weights, fps, decimals)
+    if layout == "values":
+        return to_values(weights, decimals=decimals)
+    if layout == "expected":
+        return to_expected(weights, fps, decimals=decimals, time_decimals=time_decimals)
+    raise ValueError(f"Unknown layout: {layout}")
+
+
+def load_animation(data, src_fps=None):
+    """
+    Parses any supported layout.
+
+    Returns:
+        tuple: (layout, names, weights (N, C) float64, fps or None if unknown)
+    """
+    if isinstance(data, list):
+        names = list(data[0]['blendshapes'].keys()) if data else []
+        weights = np.array([list(frame['blendshapes'].values()) for frame in data], dtype=np.float64)
+        if src_fps is None and len(data) > 1:
+            # over the whole span, times are often rounded to 4 decimals
+            src_fps = (len(data) - 1) / (data[-1]['time'] - data[0]['time'])
+        return 'expected', names, weights.reshape(len(data), len(names)), src_fps
+    if 'frames' in data:
+        weights = decode_blendshape_animation(data).astype(np.float64)
+        return 'lam', list(data['names']), weights, src_fps or data['metadata']['fps']
+    return 'values', list(data['names']), np.array(data['values'], dtype=np.float64), src_fps
+
+
+def to_arkit(names, weights) -> np.ndarray:
+    """Reorders (N, C) weights with column names ``names`` to the 52 ARKit columns."""
+    if list(names) == ARKitBlendShape:
+        return weights
+    return reorder_columns(weights, column_permutation(names, ARKitBlendShape))
+
+
+def dumps(obj, indent=None) -> bytes:
+    """JSON-encodes obj to UTF-8 bytes, with orjson when available (any indent means 2 spaces there)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=indent, ensure_ascii=False).encode('utf-8')
+
+
+def dump(obj, path, indent=None) -> None:
+    with open(path, 'wb') as f:
+        f.write(dumps(obj, indent))
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load(path):
+    with open(path, 'rb') as f:
+        return loads(f.read())
@@ -4,10 +4,15 @@ Script to convert LAM_Audio2Expression output to the CORRECT expected format.
 The expected format is an array of objects with time and blendshapes properties.
 """
 
-import json
+import os
 import argparse
 import sys
 
+# `python pdxutils/<script>.py` only puts pdxutils/ on sys.path; the pdxutils and utils packages live in the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdxutils.blendshape_formats import EXPECTED_BLENDSHAPE_NAMES, load, dump, load_animation, to_arkit, to_expected
+
 def convert_lam_to_correct_format(input_file, output_file):
     """
     Convert LAM output format to the CORRECT expected format
@@ -47,71 +52,23 @@ def convert_lam_to_correct_format(input_file, output_file):
     
     try:
         # Load LAM output
-        with open(input_file, 'r') as f:
-            lam_data = json.load(f)
-        
-        # Extract names and frames
-        names = lam_data['names']
-        frames = lam_data['frames']
-        
-        # Define the expected blendshape order (from your reference file)
-        expected_blendshapes = [
-            "eyeBlinkLeft", "eyeLookDownLeft", "eyeLookInLeft", "eyeLookOutLeft", 
-            "eyeLookUpLeft", "eyeSquintLeft", "eyeWideLeft", "eyeBlinkRight", 
-            "eyeLookDownRight", "eyeLookInRight", "eyeLookOutRight", "eyeLookUpRight", 
-            "eyeSquintRight", "eyeWideRight", "jawForward", "jawLeft", "jawRight", 
-            "jawOpen", "mouthClose", "mouthFunnel", "mouthPucker", "mouthLeft", 
-            "mouthRight", "mouthSmileLeft", "mouthSmileRight", "mouthFrownLeft", 
-            "mouthFrownRight", "mouthDimpleLeft", "mouthDimpleRight", "mouthStretchLeft", 
-            "mouthStretchRight", "mouthRollLower", "mouthRollUpper", "mouthShrugLower", 
-            "mouthShrugUpper", "mouthPressLeft", "mouthPressRight", "mouthLowerDownLeft", 
-            "mouthLowerDownRight", "mouthUpperUpLeft", "mouthUpperUpRight", "browDownLeft", 
-            "browDownRight", "browInnerUp", "browOuterUpLeft", "browOuterUpRight", 
-            "cheekPuff", "cheekSquintLeft", "cheekSquintRight", "noseSneerLeft", 
-            "noseSneerRight", "tongueOut", "headRoll", "leftEyeRoll", "rightEyeRoll"
-        ]
-        
-        # Create mapping from LAM names to indices
-        lam_name_to_index = {name: i for i, name in enumerate(names)}
-        
-        # Convert to expected format
-        result = []
-        
-        for frame in frames:
-            weights = frame['weights']
-            time = frame['time']
-            
-            # Create blendshapes object
-            blendshapes = {}
-            
-            for blend_name in expected_blendshapes:
-                if blend_name in lam_name_to_index:
-                    # Use LAM value, rounded to 2 decimals
-                    lam_index = lam_name_to_index[blend_name]
-                    blendshapes[blend_name] = round(weights[lam_index], 2)
-                else:
-                    # Default to 0 for missing blendshapes (like headRoll, leftEyeRoll, rightEyeRoll)
-                    blendshapes[blend_name] = 0.0
-            
-            # Add frame to result
-            frame_data = {
-                "time": round(time, 4),  # Round time to 4 decimals for precision
-                "blendshapes": blendshapes
-            }
-            result.append(frame_data)
-        
+        layout, names, weights, fps = load_animation(load(input_file))
+
+        # Reorder to the expected 55 names (missing ones such as headRoll are 0),
+        # values rounded to 2 decimals and time to 4
+        result = to_expected(to_arkit(names, weights), fps, decimals=2, time_decimals=4)
+
         # Save to output file
-        with open(output_file, 'w') as f:
-            json.dump(result, f, indent=2)
-        
+        dump(result, output_file, indent=2)
+
         print(f"✅ Successfully converted {len(result)} frames")
         print(f"📁 Output saved to: {output_file}")
         print(f"📊 Format: Array of {len(result)} frame objects")
-        print(f"🎯 Blendshapes per frame: {len(expected_blendshapes)}")
+        print(f"🎯 Blendshapes per frame: {len(EXPECTED_BLENDSHAPE_NAMES)}")
         print(f"⏱️  Duration: {result[-1]['time']:.2f} seconds")
-        
+
         return True
-        
+
     except Exception as e:
         print(f"❌ Error converting file: {e}")
         return False
@@ -4,10 +4,15 @@ Script to convert LAM_Audio2Expression output to the expected blendshapes format
 Converts from the native LAM format to the format expected in blendshapes-700x9.json
 """
 
-import json
+import os
 import argparse
 import sys
 
+# `python pdxutils/<script>.py` only puts pdxutils/ on sys.path; the pdxutils and utils packages live in the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdxutils.blendshape_formats import load, dump, load_animation, to_values
+
 def convert_lam_to_expected_format(input_file, output_file):
     """
     Convert LAM output format to expected format
@@ -35,34 +40,20 @@ def convert_lam_to_expected_format(input_file, output_file):
     
     try:
         # Load LAM output
-        with open(input_file, 'r') as f:
-            lam_data = json.load(f)
-        
-        # Extract names and values
-        names = lam_data['names']
-        frames = lam_data['frames']
-        
-        # Convert frames to values array
-        values = []
-        for frame in frames:
-            values.append(frame['weights'])
-        
+        layout, names, weights, fps = load_animation(load(input_file))
+
         # Create expected format
-        expected_data = {
-            "names": names,
-            "values": values
-        }
-        
+        expected_data = to_values(weights, names)
+
         # Save to output file
-        with open(output_file, 'w') as f:
-            json.dump(expected_data, f, indent=2)
-        
-        print(f"✅ Successfully converted {len(frames)} frames with {len(names)} blendshapes")
+        dump(expected_data, output_file, indent=2)
+
+        print(f"✅ Successfully converted {len(weights)} frames with {len(names)} blendshapes")
         print(f"📁 Output saved to: {output_file}")
-        print(f"📊 Format: {len(values)} frames × {len(names)} blendshapes")
-        
+        print(f"📊 Format: {len(weights)} frames × {len(names)} blendshapes")
+
         return True
-        
+
     except Exception as e:
         print(f"❌ Error converting file: {e}")
         return False
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Script to generate 60 fps blendshapes from audio with the model running natively at 60 fps
+(encoder features interpolated to 60 fps instead of resampling the 30 fps output).
+"""
+
+import argparse
+import os
+import sys
+
+# `python pdxutils/<script>.py` only puts pdxutils/ on sys.path; the pdxutils, engines and models packages live in the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdxutils.generate_blendshapes_fps import generate_blendshapes_fps
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate 60 fps blendshapes from audio file')
+    parser.add_argument('audio_path', help='Path to input audio file')
+    parser.add_argument('output_path', help='Path to output JSON file')
+    parser.add_argument('--config', default='configs/lam_audio2exp_config_streaming.py',
+                        help='Path to model configuration file')
+    parser.add_argument('--id_idx', type=int, default=0, help='Identity index for the model')
+
+    args = parser.parse_args()
+
+    success = generate_blendshapes_fps(
+        audio_path=args.audio_path,
+        output_path=args.output_path,
+        fps=60.0,
+        mode='native',
+        config_path=args.config,
+        id_idx=args.id_idx
+    )
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,13 @@ and exports them in the same format as your reference blendshapes-700x9.json fil
 """
 
 import os
-import json
 import numpy as np
 import librosa
-import torch
-import torch.nn.functional as F
 from typing import Dict, List
 
 from engines.defaults import default_config_parser, default_setup
-from engines.infer import INFER
-from models.utils import ARKitBlendShape
+from engines.infer import INFER, InferRequest
+from pdxutils.blendshape_formats import to_expected, dump
 
 
 def generate_blendshapes_from_audio(
@@ -44,12 +41,6 @@ def generate_blendshapes_from_audio(
         print(f"Loading configuration from {config_path}...")
         cfg = default_config_parser(config_path, [])
         
-        # Override audio input and other settings
-        cfg.audio_input = audio_path
-        cfg.id_idx = id_idx
-        cfg.fps = fps
-        cfg.save_json_path = None  # We'll handle JSON export ourselves
-        
         # Setup and build model
         print("Setting up model...")
         cfg = default_setup(cfg)
@@ -63,44 +54,10 @@ def generate_blendshapes_from_audio(
             
         speech_array, ssr = librosa.load(audio_path, sr=16000)
         
-        # Run inference
+        # Run inference: identity and output frame rate are per-request overrides, cfg stays untouched
+        # (same post-processing as inference.py; we handle JSON export ourselves)
         print("Running inference...")
-        with torch.no_grad():
-            input_dict = {}
-            input_dict['id_idx'] = F.one_hot(
-                torch.tensor(cfg.id_idx),
-                cfg.model.backbone.num_identity_classes
-            ).cuda(non_blocking=True)[None, ...]
-            input_dict['input_audio_array'] = torch.FloatTensor(speech_array).cuda(non_blocking=True)[None, ...]
-            
-            output_dict = infer.model(input_dict)
-            
-        # Get expression output
-        out_exp = output_dict['pred_exp'].squeeze().cpu().numpy()
-        
-        # Apply post-processing (same as in the original inference)
-        import math
-        frame_length = math.ceil(speech_array.shape[0] / ssr * fps)
-        volume = librosa.feature.rms(
-            y=speech_array, 
-            frame_length=int(1 / fps * ssr), 
-            hop_length=int(1 / fps * ssr)
-        )[0]
-        
-        if volume.shape[0] > frame_length:
-            volume = volume[:frame_length]
-            
-        # Apply smoothing and other post-processing
-        if cfg.movement_smooth:
-            from models.utils import smooth_mouth_movements
-            out_exp = smooth_mouth_movements(out_exp, 0, volume)
-            
-        if cfg.brow_movement:
-            from models.utils import apply_random_brow_movement
-            out_exp = apply_random_brow_movement(out_exp, volume)
-            
-        # Apply final blendshape post-processing
-        pred_exp = infer.blendshape_postprocess(out_exp)
+        pred_exp = infer.infer(InferRequest(speech_array=speech_array, sample_rate=ssr, id_idx=id_idx, output_fps=fps))
         
         # Convert to the expected JSON format
         print("Converting to expected JSON format...")
@@ -108,8 +65,7 @@ def generate_blendshapes_from_audio(
         
         # Save to file
         print(f"Saving blendshapes to {output_path}...")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2)
+        dump(json_data, output_path, indent=2)
             
         print(f"Successfully generated {len(json_data)} frames of blendshapes!")
         print(f"Output saved to: {output_path}")
@@ -132,53 +88,7 @@ def convert_to_expected_format(blendshape_weights: np.ndarray, fps: float) -> Li
         List of dictionaries in the expected format
     """
     
-    # ARKit blendshape names in the order expected by your format
-    # This matches the order in your reference file
-    expected_blendshape_names = [
-        "eyeBlinkLeft", "eyeLookDownLeft", "eyeLookInLeft", "eyeLookOutLeft", 
-        "eyeLookUpLeft", "eyeSquintLeft", "eyeWideLeft", "eyeBlinkRight", 
-        "eyeLookDownRight", "eyeLookInRight", "eyeLookOutRight", "eyeLookUpRight", 
-        "eyeSquintRight", "eyeWideRight", "jawForward", "jawLeft", "jawRight", 
-        "jawOpen", "mouthClose", "mouthFunnel", "mouthPucker", "mouthLeft", 
-        "mouthRight", "mouthSmileLeft", "mouthSmileRight", "mouthFrownLeft", 
-        "mouthFrownRight", "mouthDimpleLeft", "mouthDimpleRight", "mouthStretchLeft", 
-        "mouthStretchRight", "mouthRollLower", "mouthRollUpper", "mouthShrugLower", 
-        "mouthShrugUpper", "mouthPressLeft", "mouthPressRight", "mouthLowerDownLeft", 
-        "mouthLowerDownRight", "mouthUpperUpLeft", "mouthUpperUpRight", "browDownLeft", 
-        "browDownRight", "browInnerUp", "browOuterUpLeft", "browOuterUpRight", 
-        "cheekPuff", "cheekSquintLeft", "cheekSquintRight", "noseSneerLeft", 
-        "noseSneerRight", "tongueOut", "headRoll", "leftEyeRoll", "rightEyeRoll"
-    ]
-    
-    # Create mapping from ARKitBlendShape to expected format
-    arkit_to_expected = {}
-    for i, arkit_name in enumerate(ARKitBlendShape):
-        if arkit_name in expected_blendshape_names:
-            expected_idx = expected_blendshape_names.index(arkit_name)
-            arkit_to_expected[i] = expected_idx
-    
-    # Convert to expected format
-    json_data = []
-    num_frames = blendshape_weights.shape[0]
-    
-    for frame_idx in range(num_frames):
-        # Initialize blendshapes dict with zeros
-        blendshapes = {name: 0.0 for name in expected_blendshape_names}
-        
-        # Map ARKit blendshapes to expected format
-        for arkit_idx, expected_idx in arkit_to_expected.items():
-            expected_name = expected_blendshape_names[expected_idx]
-            blendshapes[expected_name] = float(blendshape_weights[frame_idx, arkit_idx])
-        
-        # Create frame data
-        frame_data = {
-            "time": frame_idx / fps,
-            "blendshapes": blendshapes
-        }
-        
-        json_data.append(frame_data)
-    
-    return json_data
+    return to_expected(blendshape_weights, fps)
 
 
 def main():
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Script to generate blendshapes from an audio file at an arbitrary frame rate.
+
+Two ways to reach the target rate:
+    native       the encoder features are interpolated straight to --fps and the model runs at it
+    interpolate  the model runs at its 30 fps and the output is resampled to --fps
+Use benchmarks/native_fps.py to compare their cost and quality.
+"""
+
+import os
+import json
+import argparse
+import sys
+
+import librosa
+
+# `python pdxutils/<script>.py` only puts pdxutils/ on sys.path; the pdxutils, engines and models packages live in the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.defaults import default_config_parser, default_setup
+from engines.infer import INFER
+from models.utils import FRAME_INTERPOLATION_METHODS
+from pdxutils.generate_blendshapes import convert_to_expected_format
+
+
+def generate_blendshapes_fps(
+    audio_path: str,
+    output_path: str,
+    fps: float = 60.0,
+    mode: str = 'native',
+    method: str = 'monotone',
+    config_path: str = 'configs/lam_audio2exp_config_streaming.py',
+    id_idx: int = 0
+) -> bool:
+    """
+    Generate blendshapes at ``fps`` and save them in the expected JSON format.
+
+    Args:
+        audio_path: Path to input audio file
+        output_path: Path to output JSON file
+        fps: Output frame rate
+        mode: 'native' (model runs at fps) or 'interpolate' (30 fps model output is resampled)
+        method: Interpolation method used by the 'interpolate' mode
+        config_path: Path to model configuration file
+        id_idx: Identity index for the model
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        options = dict(id_idx=id_idx, save_json_path=None, ex_vol=False, frame_interpolation=method)
+        if mode == 'native':
+            options['fps'] = fps
+            options['output_fps'] = None
+        else:
+            options['output_fps'] = fps
+
+        print(f"Loading configuration from {config_path}...")
+        cfg = default_config_parser(config_path, options)
+        cfg = default_setup(cfg)
+        infer = INFER.build(dict(type=cfg.infer.type, cfg=cfg))
+        infer.model.eval()
+
+        print(f"Running {mode} inference at {fps:g} fps...")
+        speech_array, ssr = librosa.load(audio_path, sr=cfg.audio_sr)
+        pred_exp = infer.infer_audio_array(speech_array, ssr)
+
+        json_data = convert_to_expected_format(pred_exp, infer.output_fps)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(json_data, f, indent=2)
+
+        print(f"Successfully generated {len(json_data)} frames of blendshapes!")
+        print(f"Output saved to: {output_path}")
+        return True
+
+    except Exception as e:
+        print(f"Error generating blendshapes: {str(e)}")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate blendshapes from audio file at a given frame rate')
+    parser.add_argument('audio_path', help='Path to input audio file')
+    parser.add_argument('output_path', help='Path to output JSON file')
+    parser.add_argument('--fps', type=float, default=60.0, help='Output frame rate')
+    parser.add_argument('--mode', default='native', choices=['native', 'interpolate'],
+                        help='Run the model at --fps or resample its 30 fps output')
+    parser.add_argument('--method', default='monotone', choices=FRAME_INTERPOLATION_METHODS,
+                        help='Interpolation method for --mode interpolate')
+    parser.add_argument('--config', default='configs/lam_audio2exp_config_streaming.py',
+                        help='Path to model configuration file')
+    parser.add_argument('--id_idx', type=int, default=0, help='Identity index for the model')
+
+    args = parser.parse_args()
+
+    success = generate_blendshapes_fps(
+        audio_path=args.audio_path,
+        output_path=args.output_path,
+        fps=args.fps,
+        mode=args.mode,
+        method=args.method,
+        config_path=args.config,
+        id_idx=args.id_idx
+    )
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
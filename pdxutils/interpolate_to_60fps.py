@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Script to resample an exported blendshape animation to a higher (or lower) frame rate.
+Reads any of the JSON layouts produced in this repo and writes the same layout at --fps:
+
+    LAM format       {"names": [...], "metadata": {"fps": ...}, "frames": [{"weights": [...], "time": ...}]}
+    expected format  [{"time": 0.0, "blendshapes": {"eyeBlinkLeft": 0.1, ...}}, ...]
+    values format    {"names": [...], "values": [[...], ...]}  (source fps from --src-fps)
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# `python pdxutils/<script>.py` only puts pdxutils/ on sys.path; the pdxutils and utils packages live in the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.resample import resample_frames, FRAME_INTERPOLATION_METHODS
+from pdxutils.blendshape_formats import load, dump, load_animation, convert, to_arkit, to_values
+
+
+def dump_animation(layout, names, weights, fps):
+    if layout == 'values':
+        return to_values(weights, names)
+    # the lam and expected layouts are rebuilt from the 52 ARKit columns
+    return convert(to_arkit(names, weights), layout, fps)
+
+
+def interpolate_animation(input_file, output_file, fps=60.0, method='monotone', src_fps=None):
+    try:
+        layout, names, weights, src_fps = load_animation(load(input_file), src_fps)
+        if src_fps is None:
+            src_fps = 30.0
+        resampled = np.clip(resample_frames(weights, src_fps, fps, method), 0.0, 1.0)
+
+        dump(dump_animation(layout, names, resampled, fps), output_file, indent=2)
+
+        print(f"✅ Resampled {len(weights)} frames @ {src_fps:g} fps -> {len(resampled)} frames @ {fps:g} fps ({method})")
+        print(f"📁 Output saved to: {output_file}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error interpolating file: {e}")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resample a blendshape animation JSON to another frame rate')
+    parser.add_argument('input_file', help='Input animation JSON file')
+    parser.add_argument('output_file', help='Output JSON file (same layout as the input)')
+    parser.add_argument('--fps', type=float, default=60.0, help='Output frame rate')
+    parser.add_argument('--method', default='monotone', choices=FRAME_INTERPOLATION_METHODS,
+                        help='Interpolation method')
+    parser.add_argument('--src-fps', type=float, default=None,
+                        help='Input frame rate (read from the file when possible, else 30)')
+
+    args = parser.parse_args()
+
+    success = interpolate_animation(args.input_file, args.output_file, args.fps, args.method, args.src_fps)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
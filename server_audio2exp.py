@@ -0,0 +1,258 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Streaming / offline serving entry point (FastAPI + uvicorn, both shipped with gradio).
+
+    python server_audio2exp.py --config-file configs/lam_audio2exp_config_streaming.py --port 8000
+
+WebSocket  /v1/stream   binary messages of little-endian PCM (``pcm=f32|s16``, mono,
+                        ``sample_rate`` query param); one reply per chunk, JSON text
+                        (default), raw float32 [N, 52] bytes with ``output=binary`` or
+                        delta/keyframe compressed messages with ``output=codec`` (see
+                        utils/expression_codec.py, configured by ``cfg.stream_codec``).
+                        Send the text message ``end`` (or close) to finish the session.
+                        ``id_idx`` selects the identity style of the session.
+HTTP POST  /v1/infer    request body is an audio file; returns the animation JSON
+                        (``output=json``, weights optionally quantized with e.g.
+                        ``quantization=uint8_delta``) or raw float32 [N, 52] bytes (``output=binary``).
+Both reject an unknown ``output`` (or ``pcm``) and an ``id_idx`` outside
+[0, num_identity_classes) with HTTP 400, as do a ``sample_rate`` <= 0 on /v1/stream and a
+``quantization`` with ``output=binary`` on /v1/infer. A stream message that is not a whole
+number of PCM samples closes the session with 1007.
+"""
+
+import io
+import asyncio
+import argparse
+import itertools
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import librosa
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Query, Request, Response, WebSocket, WebSocketDisconnect
+
+from engines.defaults import default_config_parser, default_setup
+from engines.infer import INFER, InferRequest
+from engines.streaming import AsyncStreamingEngine
+from utils.expression_codec import ExpressionEncoder
+from models.utils import build_blendshape_animation, parse_quantization, ARKitBlendShape, RETURN_CODE
+from utils.logger import get_root_logger
+
+STREAM_OUTPUTS = ("json", "binary", "codec")
+OFFLINE_OUTPUTS = ("json", "binary")
+
+PCM_DTYPES = {
+    "f32": np.dtype("<f4"),
+    "s16": np.dtype("<i2"),
+}
+
+
+def decode_pcm(payload: bytes, pcm: str) -> np.ndarray:
+    dtype = PCM_DTYPES[pcm]
+    if len(payload) % dtype.itemsize:
+        raise ValueError(f"{pcm} message of {len(payload)} bytes is not a multiple of {dtype.itemsize}")
+    audio = np.frombuffer(payload, dtype=dtype)
+    if dtype.kind == "i":
+        return audio.astype(np.float32) / 32768.0
+    return audio.astype(np.float32)
+
+
+def request_error(output: str, outputs: tuple, id_idx: int, num_identities: int) -> str:
+    """Reason a request is rejected with 400 (unknown ``output``, ``id_idx`` out of range), None if valid."""
+    if output not in outputs:
+        return f"output must be one of {outputs}, got {output}"
+    if id_idx is not None and not 0 <= id_idx < num_identities:
+        return f"id_idx must be in [0, {num_identities}), got {id_idx}"
+    return None
+
+
+def encode_expression(output: dict, frame_offset: int, fmt: str, encoder: ExpressionEncoder = None):
+    expression = output["expression"]
+    if fmt == "codec":
+        return encoder.encode(expression)
+    if fmt == "binary":
+        return np.ascontiguousarray(expression, dtype="<f4").tobytes()
+    return {
+        "code": output["code"],
+        "frame_offset": frame_offset,
+        "expression": expression.tolist(),
+    }
+
+
+def build_app(infer, cfg, max_workers=1, max_pending=None, offline_workers=1) -> FastAPI:
+    app = FastAPI(title="LAM-A2E")
+    logger = get_root_logger()
+    engine = AsyncStreamingEngine(infer,
+                                  max_workers=max_workers,
+                                  max_pending=max_pending,
+                                  sample_rate=cfg.audio_sr)
+    offline_executor = ThreadPoolExecutor(max_workers=offline_workers,
+                                          thread_name_prefix="audio2exp-offline")
+    offline_slots = asyncio.Semaphore(2 * offline_workers)
+    # numeric ids written into codec messages
+    codec_session_ids = itertools.count()
+    num_identities = cfg.model.backbone.num_identity_classes
+
+    @app.on_event("shutdown")
+    def _shutdown():
+        engine.shutdown(wait=False)
+        offline_executor.shutdown(wait=False)
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok", "sessions": engine.num_sessions}
+
+    @app.websocket("/v1/stream")
+    async def stream(websocket: WebSocket,
+                     sample_rate: int = Query(cfg.audio_sr),
+                     pcm: str = Query("f32"),
+                     output: str = Query("json"),
+                     id_idx: int = Query(None)):
+        error = request_error(output, STREAM_OUTPUTS, id_idx, num_identities)
+        if error is None and pcm not in PCM_DTYPES:
+            error = f"pcm must be one of {tuple(PCM_DTYPES)}, got {pcm}"
+        if error is None and sample_rate <= 0:
+            error = f"sample_rate must be positive, got {sample_rate}"
+        if error is not None:
+            try:
+                await websocket.send_denial_response(Response(status_code=400, content=error))
+            except RuntimeError:
+                # server without the websocket denial response extension: the handshake fails with 403
+                await websocket.close(code=1008)
+            return
+        await websocket.accept()
+        encoder = None
+        if output == "codec":
+            encoder = ExpressionEncoder(session_id=next(codec_session_ids) & 0xFFFFFFFF,
+                                        num_channels=len(ARKitBlendShape),
+                                        **cfg.get("stream_codec", {}))
+
+        session_id = uuid.uuid4().hex
+        engine.open_session(session_id, sample_rate, None if id_idx is None else dict(id_idx=id_idx))
+        frame_offset = 0
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes") is None:
+                    if message.get("text") == "end":
+                        # frames held back by the output frame-rate resampler
+                        result = await engine.flush(session_id)
+                        if result["expression"].shape[0] > 0:
+                            payload = encode_expression(result, frame_offset, output, encoder)
+                            if output != "json":
+                                await websocket.send_bytes(payload)
+                            else:
+                                await websocket.send_json(payload)
+                        break
+                    continue
+
+                try:
+                    audio = decode_pcm(message["bytes"], pcm)
+                except ValueError as e:
+                    # a split sample shifts every later one, so the session cannot continue
+                    await websocket.close(code=1007, reason=str(e))
+                    break
+                if audio.shape[0] == 0:
+                    continue
+                result = await engine.push(session_id, audio)
+                if result["code"] != RETURN_CODE["SUCCESS"]:
+                    await websocket.send_json({"code": result["code"], "frame_offset": frame_offset})
+                    continue
+
+                payload = encode_expression(result, frame_offset, output, encoder)
+                frame_offset += result["expression"].shape[0]
+                if output != "json":
+                    await websocket.send_bytes(payload)
+                else:
+                    await websocket.send_json(payload)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            engine.close_session(session_id)
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass
+
+    @app.post("/v1/infer")
+    async def offline_infer(request: Request,
+                            output: str = Query("json"),
+                            id_idx: int = Query(None),
+                            quantization: str = Query(None)):
+        error = request_error(output, OFFLINE_OUTPUTS, id_idx, num_identities)
+        if error is not None:
+            return Response(status_code=400, content=error)
+        if quantization is not None and output == "binary":
+            return Response(status_code=400, content="quantization only applies to output=json")
+        if quantization is not None:
+            try:
+                parse_quantization(quantization)
+            except ValueError as e:
+                return Response(status_code=400, content=str(e))
+        body = await request.body()
+        try:
+            speech_array, ssr = librosa.load(io.BytesIO(body), sr=cfg.audio_sr)
+        except Exception as e:
+            logger.error(f"Failed to decode request audio: {e}")
+            return Response(status_code=400, content="Unsupported or corrupted audio")
+
+        loop = asyncio.get_running_loop()
+        async with offline_slots:
+            pred_exp = await loop.run_in_executor(offline_executor,
+                                                  infer.infer,
+                                                  InferRequest(speech_array=speech_array, sample_rate=ssr, id_idx=id_idx))
+
+        if output == "binary":
+            return Response(content=np.ascontiguousarray(pred_exp, dtype="<f4").tobytes(),
+                            media_type="application/octet-stream",
+                            headers={"X-Frame-Count": str(pred_exp.shape[0]),
+                                     "X-Blendshape-Count": str(pred_exp.shape[1]),
+                                     "X-FPS": str(infer.output_fps)})
+        return build_blendshape_animation(pred_exp, ARKitBlendShape, fps=infer.output_fps,
+                                          quantization=quantization)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LAM-A2E streaming server")
+    parser.add_argument("--config-file", default="configs/lam_audio2exp_config_streaming.py")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="model threads for streaming sessions")
+    parser.add_argument("--max-pending", type=int, default=None, help="max queued streaming chunks")
+    parser.add_argument("--offline-workers", type=int, default=1, help="model threads for /v1/infer")
+    args = parser.parse_args()
+
+    cfg = default_config_parser(args.config_file, None)
+    cfg = default_setup(cfg)
+    # vocal separation goes through spleeter on disk; keep it off the serving path
+    cfg.ex_vol = False
+    infer = INFER.build(dict(type=cfg.infer.type, cfg=cfg))
+    infer.model.eval()
+
+    app = build_app(infer, cfg,
+                    max_workers=args.workers,
+                    max_pending=args.max_pending,
+                    offline_workers=args.offline_workers)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
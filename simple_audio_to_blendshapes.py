@@ -5,12 +5,13 @@ This uses the working approach we've tested.
 """
 
 import os
-import json
 import subprocess
 import argparse
 import sys
 import shutil
 
+from pdxutils.blendshape_formats import EXPECTED_BLENDSHAPE_NAMES, load, dump, load_animation, to_arkit, to_expected
+
 def generate_blendshapes_simple(audio_path, output_path):
     """
     Generate blendshapes using the simple working approach
@@ -68,70 +69,22 @@ def generate_blendshapes_simple(audio_path, output_path):
         print(f"🔄 Converting to expected format...")
         
         # Load and convert
-        with open(temp_output, 'r') as f:
-            lam_data = json.load(f)
-        
-        # Convert to expected format (CORRECT structure)
-        names = lam_data['names']
-        frames = lam_data['frames']
-        
-        # Define the expected blendshape order (from reference file)
-        expected_blendshapes = [
-            "eyeBlinkLeft", "eyeLookDownLeft", "eyeLookInLeft", "eyeLookOutLeft", 
-            "eyeLookUpLeft", "eyeSquintLeft", "eyeWideLeft", "eyeBlinkRight", 
-            "eyeLookDownRight", "eyeLookInRight", "eyeLookOutRight", "eyeLookUpRight", 
-            "eyeSquintRight", "eyeWideRight", "jawForward", "jawLeft", "jawRight", 
-            "jawOpen", "mouthClose", "mouthFunnel", "mouthPucker", "mouthLeft", 
-            "mouthRight", "mouthSmileLeft", "mouthSmileRight", "mouthFrownLeft", 
-            "mouthFrownRight", "mouthDimpleLeft", "mouthDimpleRight", "mouthStretchLeft", 
-            "mouthStretchRight", "mouthRollLower", "mouthRollUpper", "mouthShrugLower", 
-            "mouthShrugUpper", "mouthPressLeft", "mouthPressRight", "mouthLowerDownLeft", 
-            "mouthLowerDownRight", "mouthUpperUpLeft", "mouthUpperUpRight", "browDownLeft", 
-            "browDownRight", "browInnerUp", "browOuterUpLeft", "browOuterUpRight", 
-            "cheekPuff", "cheekSquintLeft", "cheekSquintRight", "noseSneerLeft", 
-            "noseSneerRight", "tongueOut", "headRoll", "leftEyeRoll", "rightEyeRoll"
-        ]
-        
-        # Create mapping from LAM names to indices
-        lam_name_to_index = {name: i for i, name in enumerate(names)}
-        
-        # Convert to correct expected format (array of objects with time and blendshapes)
-        result = []
-        
-        for frame in frames:
-            weights = frame['weights']
-            time = frame['time']
-            
-            # Create blendshapes object
-            blendshapes = {}
-            
-            for blend_name in expected_blendshapes:
-                if blend_name in lam_name_to_index:
-                    # Use LAM value, rounded to 2 decimals
-                    lam_index = lam_name_to_index[blend_name]
-                    blendshapes[blend_name] = round(weights[lam_index], 2)
-                else:
-                    # Default to 0 for missing blendshapes (like headRoll, leftEyeRoll, rightEyeRoll)
-                    blendshapes[blend_name] = 0.0
-            
-            # Add frame to result
-            frame_data = {
-                "time": round(time, 4),  # Round time to 4 decimals for precision
-                "blendshapes": blendshapes
-            }
-            result.append(frame_data)
-        
+        layout, names, weights, fps = load_animation(load(temp_output))
+
+        # Convert to correct expected format (array of objects with time and blendshapes),
+        # values rounded to 2 decimals and time to 4
+        result = to_expected(to_arkit(names, weights), fps, decimals=2, time_decimals=4)
+
         # Save output in correct format
-        with open(output_path, 'w') as f:
-            json.dump(result, f, indent=2)
-        
+        dump(result, output_path, indent=2)
+
         # Cleanup
         os.remove(temp_output)
         
         print(f"✅ Successfully generated blendshapes!")
         print(f"📁 Output: {output_path}")
         print(f"📊 Format: Array of {len(result)} frame objects")
-        print(f"🎯 Blendshapes per frame: {len(expected_blendshapes)}")
+        print(f"🎯 Blendshapes per frame: {len(EXPECTED_BLENDSHAPE_NAMES)}")
         print(f"⏱️  Duration: {result[-1]['time']:.2f} seconds")
         
         return True
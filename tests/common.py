@@ -0,0 +1,86 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Small random-weight Audio2Expression models and inference engines for the tests; no
+checkpoint or download is needed (wav2vec built from configs/wav2vec2_config.json).
+"""
+
+import os
+import math
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from engines.infer import Audio2ExpressionInfer
+from models.default import DefaultEstimator
+from models.network import Audio2Expression
+from utils.config import Config
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RATE = 16000
+NUM_IDENTITIES = 4
+
+
+def backbone_config(**kwargs):
+    """Audio2Expression options with 2 wav2vec layers and a 2-layer identity transformer."""
+    options = dict(pretrained_encoder_path='',
+                   wav2vec2_config_path=os.path.join(REPO_ROOT, 'configs', 'wav2vec2_config.json'),
+                   num_identity_classes=NUM_IDENTITIES,
+                   use_transformer=True,
+                   num_transformer_layers=2,
+                   num_encoder_layers=2,
+                   sample_rate=SAMPLE_RATE)
+    options.update(kwargs)
+    return options
+
+
+def build_backbone(seed=0, **kwargs):
+    """Eval-mode Audio2Expression built from ``backbone_config``."""
+    torch.manual_seed(seed)
+    return Audio2Expression(**backbone_config(**kwargs)).eval()
+
+
+def build_engine(save_path, config='lam_audio2exp_config.py', seed=0, **options):
+    """CPU Audio2ExpressionInfer of ``config`` around a ``build_backbone`` model, logs in ``save_path``."""
+    cfg = Config.fromfile(os.path.join(REPO_ROOT, 'configs', config))
+    cfg.merge_from_dict({'save_path': str(save_path),
+                         'device': 'cpu',
+                         'ex_vol': False,
+                         'id_idx': 1,
+                         'model.backbone.num_identity_classes': NUM_IDENTITIES,
+                         **options})
+    torch.manual_seed(seed)
+    model = DefaultEstimator(backbone=dict(type='Audio2Expression', **backbone_config()))
+    return Audio2ExpressionInfer(cfg, model=model.eval())
+
+
+def random_audio(seconds, seed=0):
+    return torch.from_numpy(np.random.default_rng(seed).uniform(-0.5, 0.5, int(seconds * SAMPLE_RATE)).astype(np.float32))
+
+
+def input_dict(*clips, id_idx=(1, 3)):
+    """``input_dict`` of one clip or a zero-padded batch with ``audio_lengths``, as Audio2ExpressionInfer builds it."""
+    lengths = [clip.shape[0] for clip in clips]
+    inputs = dict(input_audio_array=torch.stack([F.pad(clip, (0, max(lengths) - clip.shape[0])) for clip in clips]),
+                  id_idx=F.one_hot(torch.tensor(id_idx[:len(clips)]), NUM_IDENTITIES))
+    if len(clips) > 1:
+        inputs['audio_lengths'] = torch.tensor(lengths)
+    return inputs
+
+
+def num_frames(clip, fps=30):
+    return math.ceil(clip.shape[0] / SAMPLE_RATE * fps)
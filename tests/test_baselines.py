@@ -0,0 +1,42 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Reference models moved to models.baselines stay importable from models.network.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from models import baselines, network
+
+from tests.common import REPO_ROOT
+
+
+@pytest.mark.parametrize("name", network.BASELINE_NAMES)
+def test_baselines_importable_from_network(name):
+    assert getattr(network, name) is getattr(baselines, name)
+
+
+def test_unknown_network_attribute_raises():
+    with pytest.raises(AttributeError):
+        network.NotAModel
+
+
+def test_network_import_does_not_load_torchaudio():
+    code = "import sys, models.network; print('torchaudio' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
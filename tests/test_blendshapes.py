@@ -0,0 +1,71 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+
+Animation JSON quantization (utils/blendshapes.py export_quantization): every mode, with and
+without ``_delta``, decodes to within half a fixed-point step.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from utils.blendshapes import (ARKitBlendShape, build_blendshape_animation, decode_blendshape_animation,
+                               dequantize_blendshape_weights, parse_quantization, quantize_blendshape_weights)
+
+QUANTIZATIONS = ["uint8", "uint16", "decimal1", "decimal3", "decimal9"]
+
+
+def random_weights(num_frames=40, seed=0):
+    return np.random.default_rng(seed).uniform(0, 1, (num_frames, len(ARKitBlendShape))).astype(np.float32)
+
+
+@pytest.mark.parametrize("delta", [False, True])
+@pytest.mark.parametrize("quantization", QUANTIZATIONS)
+def test_quantize_roundtrip(quantization, delta):
+    spec = quantization + ("_delta" if delta else "")
+    weights = random_weights()
+    values, metadata = quantize_blendshape_weights(weights, spec)
+    assert metadata["delta"] == delta
+    decoded = dequantize_blendshape_weights(values, metadata)
+    assert decoded.dtype == np.float32 and decoded.shape == weights.shape
+    # float32 output, so never tighter than its resolution
+    assert np.abs(decoded - weights).max() <= max(0.5 * metadata["scale"], 1e-7) + 1e-7
+
+
+@pytest.mark.parametrize("quantization", [None, "uint8_delta", "decimal3_delta", "decimal4"])
+def test_animation_json_roundtrip(quantization):
+    weights = random_weights()
+    animation = json.loads(json.dumps(build_blendshape_animation(weights, ARKitBlendShape, fps=30,
+                                                                 quantization=quantization)))
+    decoded = decode_blendshape_animation(animation)
+    tolerance = 1e-7 if quantization is None else 0.5 * parse_quantization(quantization)["scale"] + 1e-7
+    assert np.abs(decoded - weights).max() <= tolerance
+
+
+def test_delta_values_are_frame_differences():
+    weights = random_weights()
+    values, metadata = quantize_blendshape_weights(weights, "uint8_delta")
+    levels = np.rint(weights / metadata["scale"]).astype(np.int64)
+    assert np.array_equal(values[0], levels[0])
+    assert np.array_equal(values[1:], np.diff(levels, axis=0))
+
+
+@pytest.mark.parametrize("quantization", ["decimal0", "decimal10", "int8", "uint8_deltas"])
+def test_invalid_quantization(quantization):
+    with pytest.raises(ValueError):
+        parse_quantization(quantization)
@@ -0,0 +1,70 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+
+DistillationEstimator student initialisation: the teacher copy happens when the model is built,
+so a student resumed from a checkpoint keeps its weights through online-teacher training steps.
+"""
+
+import torch
+
+from models.default import DistillationEstimator
+from tests.common import backbone_config, random_audio, input_dict
+
+
+def build_estimator(**kwargs):
+    torch.manual_seed(0)
+    return DistillationEstimator(backbone=dict(type="Audio2Expression", **backbone_config()),
+                                 teacher=dict(type="Audio2Expression", **backbone_config()),
+                                 **kwargs)
+
+
+def backbone_weights(model):
+    return {key: value.clone() for key, value in model.backbone.state_dict().items()}
+
+
+def test_copy_from_teacher_copies_matching_weights():
+    model = build_estimator()
+    model.copy_from_teacher()
+    teacher_state = model.teacher.state_dict()
+    for key, value in model.backbone.state_dict().items():
+        assert torch.equal(value, teacher_state[key])
+
+
+def test_resumed_student_keeps_its_weights():
+    # a checkpoint of a student that has trained away from the teacher
+    trained = build_estimator()
+    with torch.no_grad():
+        for param in trained.backbone.parameters():
+            param.add_(0.01)
+    checkpoint = trained.state_dict()
+
+    # resume: the trainer skips copy_from_teacher and the CheckpointLoader restores the student
+    model = build_estimator()
+    model.load_state_dict(checkpoint)
+    before = backbone_weights(model)
+    model.train()
+    output = model(input_dict(random_audio(1.0)))
+    assert torch.isfinite(output["loss"])
+    for key, value in model.backbone.state_dict().items():
+        assert torch.equal(value, before[key]), key
+
+
+def test_freeze_decoder_applies_at_construction():
+    model = build_estimator(freeze_decoder=True)
+    decoder = [param for name, param in model.backbone.named_parameters() if not name.startswith("audio_encoder.")]
+    assert decoder and not any(param.requires_grad for param in decoder)
+    assert any(param.requires_grad for param in model.backbone.audio_encoder.parameters())
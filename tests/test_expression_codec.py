@@ -0,0 +1,81 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+
+Stream codec (utils/expression_codec.py) round trips: lossless up to the fixed-point step,
+across keyframes, split reads and interleaved sessions.
+"""
+
+import numpy as np
+import pytest
+
+from utils.expression_codec import ExpressionDecoder, ExpressionEncoder
+
+
+def random_chunks(sizes, seed=0):
+    rng = np.random.default_rng(seed)
+    # smooth, partly constant weights like the model's
+    return [np.clip(rng.normal(0.3, 0.05, (size, 52)).cumsum(axis=0) % 1.0, 0, 1).astype(np.float32)
+            for size in sizes]
+
+
+@pytest.mark.parametrize("bits", [8, 16])
+def test_roundtrip_within_the_quantization_step(bits):
+    encoder = ExpressionEncoder(session_id=3, bits=bits, keyframe_interval=20)
+    decoder = ExpressionDecoder()
+    chunks = random_chunks([8, 1, 0, 25, 16, 40])
+    for sequence, chunk in enumerate(chunks):
+        session_id, decoded_sequence, frames = decoder.decode(encoder.encode(chunk))
+        assert (session_id, decoded_sequence) == (3, sequence)
+        assert frames.shape == chunk.shape
+        np.testing.assert_allclose(frames, chunk, atol=0.5 / ((1 << bits) - 1) + 1e-7)
+
+
+def test_threshold_bounds_the_error():
+    threshold = 4
+    encoder = ExpressionEncoder(threshold=threshold)
+    decoder = ExpressionDecoder()
+    for chunk in random_chunks([30, 30, 30]):
+        _, _, frames = decoder.decode(encoder.encode(chunk))
+        assert np.abs(frames - chunk).max() <= (threshold + 0.5) / 65535 + 1e-7
+
+
+def test_feed_reassembles_interleaved_sessions():
+    encoders = {session_id: ExpressionEncoder(session_id=session_id) for session_id in (1, 2)}
+    chunks = {session_id: random_chunks([10, 12, 7], seed=session_id) for session_id in (1, 2)}
+    stream = b"".join(encoders[session_id].encode(chunks[session_id][i]) for i in range(3) for session_id in (1, 2))
+
+    decoder = ExpressionDecoder()
+    messages = []
+    # arbitrary transport boundaries
+    for start in range(0, len(stream), 37):
+        messages.extend(decoder.feed(stream[start:start + 37]))
+    assert [(session_id, sequence) for session_id, sequence, _ in messages] == \
+        [(session_id, i) for i in range(3) for session_id in (1, 2)]
+    for session_id, sequence, frames in messages:
+        np.testing.assert_allclose(frames, chunks[session_id][sequence], atol=0.5 / 65535 + 1e-7)
+
+
+def test_decoder_joins_at_a_keyframe():
+    encoder = ExpressionEncoder()
+    chunks = random_chunks([10, 10, 10])
+    encoder.encode(chunks[0])
+    delta = encoder.encode(chunks[1])
+    with pytest.raises(ValueError):
+        ExpressionDecoder().decode(delta)
+    encoder.request_keyframe()
+    _, _, frames = ExpressionDecoder().decode(encoder.encode(chunks[2]))
+    np.testing.assert_allclose(frames, chunks[2], atol=0.5 / 65535 + 1e-7)
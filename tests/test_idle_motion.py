@@ -0,0 +1,81 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+
+Seeded procedural eye blinks and brow raises (models.utils.IdleMotionGenerator).
+"""
+
+import numpy as np
+import pytest
+
+from models.utils import ARKitBlendShape, IdleMotionGenerator
+
+BLINK_COLUMNS = [ARKitBlendShape.index("eyeBlinkLeft"), ARKitBlendShape.index("eyeBlinkRight")]
+
+
+def stamped(idle_motion, num_frames=900, chunks=None):
+    expression = np.zeros((num_frames, len(ARKitBlendShape)), dtype=np.float32)
+    bounds = [0, num_frames] if chunks is None else [0, *chunks, num_frames]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        idle_motion.stamp_blinks(expression[start:end], frame_offset=start)
+    return expression
+
+
+def test_seed_reproduces_the_blinks():
+    first, second = stamped(IdleMotionGenerator(7)), stamped(IdleMotionGenerator(7))
+    assert first[:, BLINK_COLUMNS].max() > 0.5
+    np.testing.assert_array_equal(first, second)
+    assert not np.array_equal(first, stamped(IdleMotionGenerator(8)))
+
+
+def test_chunked_stamping_matches_one_pass():
+    whole = stamped(IdleMotionGenerator(3))
+    # chunks shorter than a blink, blinks straddling chunk boundaries
+    chunks = stamped(IdleMotionGenerator(3), chunks=[1, 4, 50, 51, 300, 333, 700])
+    np.testing.assert_array_equal(whole, chunks)
+
+
+def test_brows_are_seeded_and_follow_the_voice():
+    volume = np.zeros(450)
+    volume[40:70] = 0.2
+    volume[200:206] = 0.2
+    first = IdleMotionGenerator(5).stamp_brows(np.zeros((450, len(ARKitBlendShape))), volume)
+    second = IdleMotionGenerator(5).stamp_brows(np.zeros((450, len(ARKitBlendShape))), volume)
+    np.testing.assert_array_equal(first, second)
+    raised = np.flatnonzero(first[:, :5].any(axis=1))
+    # one raise in each voiced 150-frame segment, none in the silent one
+    assert raised.size > 0 and raised.max() < 300
+    assert np.any(raised < 150) and np.any((raised >= 150) & (raised < 300))
+
+
+def test_offline_blinks_start_at_frame_zero():
+    expression = IdleMotionGenerator(1, blink_at_start=True).stamp_blinks(np.zeros((100, len(ARKitBlendShape))))
+    assert expression[:len(IdleMotionGenerator.BLINKS[0]), BLINK_COLUMNS].min(axis=1).max() > 0.5
+    # streams wait one interval first
+    assert not stamped(IdleMotionGenerator(1), num_frames=40)[:, BLINK_COLUMNS].any()
+
+
+def test_patterns_keep_their_duration_at_60_fps():
+    blinks_30 = stamped(IdleMotionGenerator(2, blink_at_start=True), num_frames=1800)[:, BLINK_COLUMNS[0]]
+    blinks_60 = stamped(IdleMotionGenerator(2, fps=60, blink_at_start=True), num_frames=3600)[:, BLINK_COLUMNS[0]]
+    # twice the frames per blink, about as many blinks per minute
+    assert np.count_nonzero(blinks_60) == pytest.approx(2 * np.count_nonzero(blinks_30), rel=0.2)
+
+    generator = IdleMotionGenerator(fps=60)
+    # every other 60 fps frame is a 30 fps pattern frame
+    np.testing.assert_allclose(generator.blinks[:, ::2], IdleMotionGenerator.BLINKS)
+    assert [brow.shape[0] for brow in generator.brows] == [2 * brow.shape[0] for brow in IdleMotionGenerator.BROWS]
+    assert (generator.blink_interval, generator.brow_segment) == ((80, 200), 300)
@@ -0,0 +1,59 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+
+Model frame rate (cfg.fps): overrides reach every model config, and the encoders interpolate
+to the backbone fps.
+"""
+
+import os
+
+import pytest
+import torch
+
+from engines.defaults import setup_model_fps
+from models.encoder.mel import MelConvEncoder
+from utils.config import Config
+from tests.common import REPO_ROOT, SAMPLE_RATE, build_backbone, random_audio, input_dict
+
+
+@pytest.mark.parametrize("config", ["lam_audio2exp_config_streaming.py", "lam_audio2exp_config_mel_distill.py",
+                                    "lam_audio2exp_config_student.py"])
+def test_fps_override_reaches_the_model_configs(config):
+    cfg = Config.fromfile(os.path.join(REPO_ROOT, "configs", config))
+    # as default_config_parser applies --options fps=60
+    cfg.merge_from_dict(dict(fps=60.0))
+    setup_model_fps(cfg)
+    model_cfgs = [cfg.model.backbone, cfg.model.get("teacher", None), cfg.get("distill", {}).get("teacher", None)]
+    assert all(model_cfg.fps == 60.0 for model_cfg in model_cfgs if model_cfg is not None)
+
+
+@pytest.mark.parametrize("fps", [30.0, 60.0])
+def test_encoders_default_to_the_backbone_fps(fps):
+    audio = random_audio(2.0)[None]
+    mel = MelConvEncoder(sample_rate=SAMPLE_RATE, fps=fps).eval()
+    wav2vec = build_backbone(fps=fps).audio_encoder
+    with torch.no_grad():
+        # 2 s of audio give 101 mel encoder and 99 wav2vec feature frames, both at 50 Hz
+        assert mel(audio).last_hidden_state.shape[1] == int(101 * fps / 50)
+        assert wav2vec(audio).last_hidden_state.shape[1] == int(99 * fps / 50)
+
+
+def test_mel_backbone_runs_at_60_fps():
+    backbone = build_backbone(pretrained_encoder_type="mel_conv", fps=60.0)
+    assert backbone.audio_encoder.fps == 60.0
+    with torch.no_grad():
+        assert backbone(input_dict(random_audio(1.5))).shape[1] == 90
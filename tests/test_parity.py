@@ -0,0 +1,83 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+
+Inference-path switches against the plain fp32 forward of the same random-weight model,
+gated per blendshape as in benchmarks/precision.py. Frames past a clip's own length are
+undefined in a padded batch and are not compared.
+"""
+
+import contextlib
+
+import pytest
+import torch
+
+from benchmarks.precision import accuracy, MAX_ABS_TOLERANCE, MEAN_ABS_TOLERANCE
+from engines.infer import INFER_PRECISIONS
+from tests.common import SAMPLE_RATE, build_backbone, random_audio, input_dict, num_frames
+
+
+def fused(backbone):
+    """cfg.fused_inference"""
+    backbone.fuse_inference_blocks()
+    return contextlib.nullcontext()
+
+
+def sdpa(backbone):
+    """cfg.encoder_attention='sdpa'"""
+    backbone.audio_encoder.set_attention_implementation("sdpa")
+    return contextlib.nullcontext()
+
+
+def chunked(backbone):
+    """cfg.feature_chunk_seconds=0.5"""
+    backbone.audio_encoder.set_feature_chunk(0.5, SAMPLE_RATE)
+    return contextlib.nullcontext()
+
+
+def bf16(backbone):
+    """cfg.infer_precision='bf16', as Audio2ExpressionInfer.autocast on CPU"""
+    return torch.autocast(device_type="cpu", dtype=INFER_PRECISIONS["bf16"])
+
+
+# (switch, max abs tolerance, mean abs tolerance); measured max differences in the comments
+PARITY_CASES = [
+    pytest.param(fused, 1e-5, 1e-5, id="fused"),  # ~3e-7
+    pytest.param(sdpa, 1e-4, 1e-4, id="sdpa"),  # ~1e-6
+    pytest.param(chunked, 5e-5, 5e-5, id="chunked"),  # ~1e-6
+    pytest.param(bf16, MAX_ABS_TOLERANCE, MEAN_ABS_TOLERANCE, id="bf16"),  # ~6e-3
+]
+
+CLIPS = [
+    pytest.param([(2.0, 1)], id="single"),
+    pytest.param([(2.0, 1), (1.2, 2)], id="padded_batch"),
+]
+
+
+@pytest.mark.parametrize("clips", CLIPS)
+@pytest.mark.parametrize("switch, max_abs_tolerance, mean_abs_tolerance", PARITY_CASES)
+def test_matches_the_reference_forward(switch, max_abs_tolerance, mean_abs_tolerance, clips):
+    clips = [random_audio(seconds, seed=seed) for seconds, seed in clips]
+    inputs = input_dict(*clips)
+    backbone = build_backbone()
+    with torch.no_grad():
+        reference = backbone(inputs)
+        with switch(backbone):
+            output = backbone(inputs).float()
+    report = accuracy([output[row, :num_frames(clip)].numpy() for row, clip in enumerate(clips)],
+                      [reference[row, :num_frames(clip)].numpy() for row, clip in enumerate(clips)],
+                      max_abs_tolerance, mean_abs_tolerance)
+    assert report["passed"], report["worst_blendshapes"]
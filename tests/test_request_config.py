@@ -0,0 +1,78 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+
+Per-request cfg overrides (InferRequest / InferBase.request_config): visible only on the
+thread running the request, layered when nested, and never written to the engine cfg.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from engines.infer import InferRequest
+from tests.common import SAMPLE_RATE, build_engine, random_audio
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    return build_engine(tmp_path_factory.mktemp("request_config"), idle_motion_seed=0)
+
+
+def test_overrides_are_thread_local(engine):
+    both_inside = threading.Barrier(2)
+
+    def run(id_idx):
+        with engine.request_config(dict(id_idx=id_idx)):
+            # the other request has entered its own overrides by now
+            both_inside.wait(timeout=10)
+            seen = engine.cfg.id_idx
+            both_inside.wait(timeout=10)
+        return seen
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert list(executor.map(run, [2, 3])) == [2, 3]
+    assert engine.cfg.id_idx == 1
+
+
+def test_nested_overrides_layer(engine):
+    with engine.request_config(dict(id_idx=2, output_fps=60)):
+        with engine.request_config(dict(id_idx=3)):
+            assert (engine.cfg.id_idx, engine.output_fps) == (3, 60)
+        assert (engine.cfg.id_idx, engine.output_fps) == (2, 60)
+    assert (engine.cfg.id_idx, engine.output_fps) == (1, engine.cfg.fps)
+
+
+def test_request_cfg_is_read_only(engine):
+    with engine.request_config(dict(id_idx=2)):
+        with pytest.raises(AttributeError):
+            engine.cfg.fps = 60
+    with pytest.raises(ValueError):
+        with engine.request_config(dict(fps=60)):
+            pass
+    with pytest.raises(ValueError):
+        InferRequest(speech_array=np.zeros(16), fps=60)
+
+
+def test_request_overrides_reach_the_output(engine):
+    audio = random_audio(1.0).numpy()
+    output = engine.infer(InferRequest(speech_array=audio, sample_rate=SAMPLE_RATE, id_idx=3, output_fps=60))
+    assert output.shape[0] == 60
+    np.testing.assert_array_equal(engine.infer_audio_array(audio, SAMPLE_RATE, id_idx=3),
+                                  engine.infer(InferRequest(speech_array=audio, sample_rate=SAMPLE_RATE, id_idx=3)))
+    assert engine.cfg.id_idx == 1 and engine.output_fps == engine.cfg.fps
@@ -0,0 +1,41 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Switching the wav2vec self-attention between eager and Wav2Vec2SdpaAttention
+(cfg.encoder_attention); parity with eager is in test_parity.py.
+"""
+
+import torch
+from transformers.models.wav2vec2.modeling_wav2vec2 import Wav2Vec2Attention
+
+from models.encoder.wav2vec import Wav2Vec2SdpaAttention
+from tests.common import build_backbone
+
+
+def test_encoder_is_built_eager():
+    backbone = build_backbone()
+    assert all(type(layer.attention) is Wav2Vec2Attention for layer in backbone.audio_encoder.encoder.layers)
+
+
+def test_switch_rebuilds_modules_with_the_same_weights():
+    backbone = build_backbone()
+    layer = backbone.audio_encoder.encoder.layers[0]
+    eager = layer.attention
+    backbone.audio_encoder.set_attention_implementation("sdpa")
+    assert type(layer.attention) is Wav2Vec2SdpaAttention and layer.attention is not eager
+    assert not layer.attention.training
+    for name, value in eager.state_dict().items():
+        assert torch.equal(layer.attention.state_dict()[name], value)
@@ -0,0 +1,37 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+
+Latency profiling (cfg.profile_latency): every encoder path records its stages.
+"""
+
+import pytest
+
+from tests.common import SAMPLE_RATE, build_engine, random_audio
+
+
+@pytest.mark.parametrize("feature_chunk_seconds", [None, 0.5])
+def test_padded_and_chunked_paths_time_the_feature_extractor(tmp_path, feature_chunk_seconds):
+    engine = build_engine(tmp_path, profile_latency=True, latency_write_period=0,
+                          feature_chunk_seconds=feature_chunk_seconds)
+    clips = [random_audio(1.0, seed=1).numpy(), random_audio(2.3, seed=2).numpy()]
+    engine.infer_batch(clips, SAMPLE_RATE)
+    engine.infer_audio_array(clips[1], SAMPLE_RATE)
+    summary = engine.timer.summary()
+    assert summary["encoder_feature_extractor"]["count"] == 2
+    assert summary["encoder_transformer"]["count"] == 2
+    engine.timer.detach()
+    assert "extract_features" not in vars(engine.backbone.audio_encoder)
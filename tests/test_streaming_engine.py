@@ -0,0 +1,150 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+
+AsyncStreamingEngine scheduling (engines/streaming.py) around a stand-in for
+Audio2ExpressionInfer.infer_streaming_audio: per-session ordering, the max_pending bound
+and cancellation.
+"""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from engines.streaming import AsyncStreamingEngine
+
+
+class FakeModel:
+    def eval(self):
+        return self
+
+
+class FakeInfer:
+    """Returns [[first sample of the chunk, chunks the context has seen before]]; ``gate`` holds every call."""
+
+    def __init__(self, delays=(0.0,)):
+        self.model = FakeModel()
+        self.delays = delays
+        self.gate = threading.Event()
+        self.gate.set()
+        self.started = threading.Semaphore(0)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def infer_streaming_audio(self, audio, ssr, context, overrides=None):
+        with self.lock:
+            delay = self.delays[self.calls % len(self.delays)]
+            self.calls += 1
+        self.started.release()
+        self.gate.wait(timeout=10)
+        time.sleep(delay)
+        count = 0 if context is None else context["count"]
+        expression = np.array([[audio[0], count]], dtype=np.float32)
+        return {"code": 0, "expression": expression, "headpose": None}, {"count": count + 1}
+
+    def flush_streaming_audio(self, context, overrides=None):
+        return {"code": 0, "expression": np.zeros((0, 1), dtype=np.float32), "headpose": None}
+
+
+def count_pending(engine):
+    """Tracks chunks submitted to the executor and not finished yet."""
+    state = {"pending": 0, "max": 0}
+    lock = threading.Lock()
+    submit = engine.executor.submit
+
+    def done(_):
+        with lock:
+            state["pending"] -= 1
+
+    def counted_submit(*args, **kwargs):
+        with lock:
+            state["pending"] += 1
+            state["max"] = max(state["max"], state["pending"])
+        future = submit(*args, **kwargs)
+        future.add_done_callback(done)
+        return future
+
+    engine.executor.submit = counted_submit
+    return state
+
+
+def test_chunks_of_a_session_run_in_order_and_pending_is_bounded():
+    infer = FakeInfer(delays=(0.02, 0.0, 0.01, 0.005))
+    engine = AsyncStreamingEngine(infer, max_workers=3, max_pending=4)
+    pending = count_pending(engine)
+    sessions, num_chunks = range(4), 6
+
+    async def run():
+        for session in sessions:
+            engine.open_session(session)
+        # every chunk of every session in flight at once
+        tasks = [asyncio.ensure_future(engine.push(session, np.array([chunk], dtype=np.float32)))
+                 for chunk in range(num_chunks) for session in sessions]
+        return await asyncio.gather(*tasks)
+
+    outputs = asyncio.run(run())
+    engine.shutdown()
+    for i, output in enumerate(outputs):
+        chunk = i // len(sessions)
+        # chunk k ran on the context left by chunk k - 1 of its session
+        assert output["expression"].tolist() == [[chunk, chunk]]
+    assert pending["max"] == engine.max_pending
+
+
+def test_cancelled_chunk_keeps_its_slot_until_the_worker_is_done():
+    infer = FakeInfer()
+    infer.gate.clear()
+    engine = AsyncStreamingEngine(infer, max_workers=1, max_pending=1)
+
+    async def run():
+        engine.open_session("a")
+        engine.open_session("b")
+        first = asyncio.ensure_future(engine.push("a", np.zeros(1, dtype=np.float32)))
+        await asyncio.get_running_loop().run_in_executor(None, infer.started.acquire)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        # the cancelled chunk is still running: the next one waits for its slot
+        second = asyncio.ensure_future(engine.push("b", np.ones(1, dtype=np.float32)))
+        await asyncio.sleep(0.05)
+        assert infer.calls == 1 and not second.done()
+        infer.gate.set()
+        return await asyncio.wait_for(second, timeout=10)
+
+    output = asyncio.run(run())
+    engine.shutdown()
+    assert output["expression"][0, 0] == 1 and infer.calls == 2
+
+
+def test_closing_a_stream_drops_its_session():
+    engine = AsyncStreamingEngine(FakeInfer(), max_workers=1)
+
+    async def run():
+        chunks = [np.full(1, i, dtype=np.float32) for i in range(5)]
+        stream = engine.stream("a", chunks)
+        first = await stream.__anext__()
+        assert engine.num_sessions == 1
+        await stream.aclose()
+        assert engine.num_sessions == 0
+        with pytest.raises(KeyError):
+            await engine.push("a", chunks[1])
+        return first
+
+    assert asyncio.run(run())["expression"][0, 0] == 0
+    engine.shutdown()
@@ -0,0 +1,248 @@
+"""
+ARKit blendshape names and the animation JSON structure (build / export / quantize / decode).
+
+Only numpy and json: pdxutils converters and the serving code import this without pulling in
+torch; models.utils re-exports everything.
+"""
+
+import json
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+ARKitBlendShape =[
+   "browDownLeft",
+   "browDownRight",
+   "browInnerUp",
+   "browOuterUpLeft",
+   "browOuterUpRight",
+   "cheekPuff",
+   "cheekSquintLeft",
+   "cheekSquintRight",
+   "eyeBlinkLeft",
+   "eyeBlinkRight",
+   "eyeLookDownLeft",
+   "eyeLookDownRight",
+   "eyeLookInLeft",
+   "eyeLookInRight",
+   "eyeLookOutLeft",
+   "eyeLookOutRight",
+   "eyeLookUpLeft",
+   "eyeLookUpRight",
+   "eyeSquintLeft",
+   "eyeSquintRight",
+   "eyeWideLeft",
+   "eyeWideRight",
+   "jawForward",
+   "jawLeft",
+   "jawOpen",
+   "jawRight",
+   "mouthClose",
+   "mouthDimpleLeft",
+   "mouthDimpleRight",
+   "mouthFrownLeft",
+   "mouthFrownRight",
+   "mouthFunnel",
+   "mouthLeft",
+   "mouthLowerDownLeft",
+   "mouthLowerDownRight",
+   "mouthPressLeft",
+   "mouthPressRight",
+   "mouthPucker",
+   "mouthRight",
+   "mouthRollLower",
+   "mouthRollUpper",
+   "mouthShrugLower",
+   "mouthShrugUpper",
+   "mouthSmileLeft",
+   "mouthSmileRight",
+   "mouthStretchLeft",
+   "mouthStretchRight",
+   "mouthUpperUpLeft",
+   "mouthUpperUpRight",
+   "noseSneerLeft",
+   "noseSneerRight",
+   "tongueOut"
+]
+
+
+def build_blendshape_animation(
+        blendshape_weights: np.ndarray,
+        blendshape_names: List[str],
+        fps: float,
+        rotation_data: Optional[np.ndarray] = None,
+        quantization: Optional[str] = None
+) -> dict:
+    """
+    Build the ARKit-compatible animation structure written by export_blendshape_animation.
+
+    Args:
+        blendshape_weights: 2D numpy array of shape (N, 52) containing animation frames
+        blendshape_names: Ordered list of 52 ARKit-standard blendshape names
+        fps: Frame rate for timing calculations (frames per second)
+        rotation_data: Optional 3D rotation data array of shape (N, 3)
+        quantization: Optional weight encoding, see quantize_blendshape_weights.
+                      The parameters land in metadata["quantization"]; decode with
+                      decode_blendshape_animation
+
+    Returns:
+        JSON-serializable animation dict
+
+    Raises:
+        ValueError: If input dimensions are incompatible
+    """
+    # Validate input dimensions
+    if blendshape_weights.shape[1] != 52:
+        raise ValueError(f"Expected 52 blendshapes, got {blendshape_weights.shape[1]}")
+    if len(blendshape_names) != 52:
+        raise ValueError(f"Requires 52 blendshape names, got {len(blendshape_names)}")
+    if rotation_data is not None and len(rotation_data) != len(blendshape_weights):
+        raise ValueError("Rotation data length must match animation frames")
+
+    # Build animation data structure
+    animation_data = {
+        "names":blendshape_names,
+        "metadata": {
+            "fps": fps,
+            "frame_count": len(blendshape_weights),
+            "blendshape_names": blendshape_names
+        },
+        "frames": []
+    }
+
+    weights = blendshape_weights
+    if quantization is not None:
+        weights, animation_data["metadata"]["quantization"] = quantize_blendshape_weights(blendshape_weights,
+                                                                                          quantization)
+
+    # Convert numpy array to serializable format
+    weights = weights.tolist()
+    for frame_idx in range(blendshape_weights.shape[0]):
+        frame_data = {
+            "weights": weights[frame_idx],
+            "time": frame_idx / fps,
+            "rotation": rotation_data[frame_idx].tolist() if rotation_data is not None else []
+        }
+        animation_data["frames"].append(frame_data)
+
+    return animation_data
+
+
+def export_blendshape_animation(
+        blendshape_weights: np.ndarray,
+        output_path: str,
+        blendshape_names: List[str],
+        fps: float,
+        rotation_data: Optional[np.ndarray] = None,
+        quantization: Optional[str] = None,
+        indent: Optional[int] = 2
+) -> None:
+    """
+    Export blendshape animation data to JSON format compatible with ARKit.
+
+    Args:
+        blendshape_weights: 2D numpy array of shape (N, 52) containing animation frames
+        output_path: Full path for output JSON file (including .json extension)
+        blendshape_names: Ordered list of 52 ARKit-standard blendshape names
+        fps: Frame rate for timing calculations (frames per second)
+        rotation_data: Optional 3D rotation data array of shape (N, 3)
+        quantization: Optional weight encoding, see quantize_blendshape_weights
+        indent: JSON indentation, None writes compact JSON
+
+    Raises:
+        ValueError: If input dimensions are incompatible
+        IOError: If file writing fails
+    """
+    animation_data = build_blendshape_animation(blendshape_weights,
+                                                blendshape_names,
+                                                fps,
+                                                rotation_data,
+                                                quantization)
+
+    # Safeguard against data loss
+    if not output_path.endswith('.json'):
+        output_path += '.json'
+
+    # Write to file with error handling
+    try:
+        with open(output_path, 'w', encoding='utf-8') as json_file:
+            json.dump(animation_data, json_file, indent=indent, ensure_ascii=False,
+                      separators=None if indent is not None else (',', ':'))
+    except Exception as e:
+        raise IOError(f"Failed to write animation data: {str(e)}") from e
+
+
+def parse_quantization(quantization: str) -> dict:
+    """
+    Parses a quantization spec.
+
+    Specs:
+        "decimal<N>"  weights rounded to N (1-9) decimals, stored as floats
+        "uint8"       fixed-point integers round(w * 255)
+        "uint16"      fixed-point integers round(w * 65535)
+    A "_delta" suffix (e.g. "uint8_delta", "decimal3_delta") stores each frame as the integer
+    difference to the previous frame in fixed-point units (10^-N for decimal); the first frame is absolute.
+
+    Returns:
+        dict(mode, scale, delta): values are decoded as integer * scale
+    """
+    spec = quantization
+    delta = spec.endswith("_delta")
+    if delta:
+        spec = spec[:-len("_delta")]
+    if spec == "uint8":
+        scale = 1.0 / 255
+    elif spec == "uint16":
+        scale = 1.0 / 65535
+    elif spec.startswith("decimal") and spec[len("decimal"):].isdigit():
+        decimals = int(spec[len("decimal"):])
+        if not 1 <= decimals <= 9:
+            raise ValueError(f"Invalid quantization: {quantization}, decimal<N> needs N in 1-9")
+        scale = 10.0 ** -decimals
+    else:
+        raise ValueError(f"Invalid quantization: {quantization}")
+    return {"mode": spec, "scale": scale, "delta": delta}
+
+
+def quantize_blendshape_weights(
+        blendshape_weights: np.ndarray,
+        quantization: str
+) -> Tuple[np.ndarray, dict]:
+    """
+    Quantizes (N, C) weights in [0, 1].
+
+    Args:
+        blendshape_weights: 2D array of weights, clipped to [0, 1]
+        quantization: Spec understood by parse_quantization
+
+    Returns:
+        tuple: (encoded (N, C) array, int64 or float64 for non-delta decimal; metadata dict)
+    """
+    metadata = parse_quantization(quantization)
+    levels = np.rint(np.clip(blendshape_weights, 0.0, 1.0) / metadata["scale"]).astype(np.int64)
+    if metadata["delta"]:
+        levels[1:] = np.diff(levels, axis=0)
+        return levels, metadata
+    if metadata["mode"].startswith("decimal"):
+        decimals = int(metadata["mode"][len("decimal"):])
+        return np.round(levels * metadata["scale"], decimals), metadata
+    return levels, metadata
+
+
+def dequantize_blendshape_weights(values, metadata: Optional[dict]) -> np.ndarray:
+    """Inverse of quantize_blendshape_weights, returns float32 (N, C) weights."""
+    values = np.asarray(values)
+    if not metadata:
+        return values.astype(np.float32)
+    if metadata["delta"]:
+        values = np.cumsum(values.astype(np.int64), axis=0)
+    elif metadata["mode"].startswith("decimal"):
+        return values.astype(np.float32)
+    return (values * metadata["scale"]).astype(np.float32)
+
+
+def decode_blendshape_animation(animation_data: dict) -> np.ndarray:
+    """Returns the (N, C) float32 weights of an animation dict built by build_blendshape_animation."""
+    values = [frame["weights"] for frame in animation_data["frames"]]
+    return dequantize_blendshape_weights(values, animation_data["metadata"].get("quantization"))
@@ -100,6 +100,7 @@ class JSONWriter(EventWriter):
         self._file_handle = open(json_file, "a")
         self._window_size = window_size
         self._last_write = -1
+        self._last_histogram_write = -1
 
     def write(self):
         storage = get_event_storage()
@@ -119,6 +120,19 @@ class JSONWriter(EventWriter):
         for itr, scalars_per_iter in to_save.items():
             scalars_per_iter["iteration"] = itr
             self._file_handle.write(json.dumps(scalars_per_iter, sort_keys=True) + "\n")
+
+        # histograms are shared with TensorboardXWriter, which clears them after writing,
+        # so only the ones of iterations that have not been written yet are dumped here.
+        new_last_histogram_write = self._last_histogram_write
+        for params in storage._histograms:
+            if params["global_step"] <= self._last_histogram_write:
+                continue
+            hist = dict(params)
+            hist["iteration"] = hist.pop("global_step")
+            hist["histogram"] = hist.pop("tag")
+            self._file_handle.write(json.dumps(hist, sort_keys=True) + "\n")
+            new_last_histogram_write = max(new_last_histogram_write, hist["iteration"])
+        self._last_histogram_write = new_last_histogram_write
         self._file_handle.flush()
         try:
             os.fsync(self._file_handle.fileno())
@@ -347,35 +361,36 @@ class EventStorage:
     #     """
     #     for k, v in kwargs.items():
     #         self.put_scalar(k, v, smoothing_hint=smoothing_hint)
-    #
-    # def put_histogram(self, hist_name, hist_tensor, bins=1000):
-    #     """
-    #     Create a histogram from a tensor.
-    #     Args:
-    #         hist_name (str): The name of the histogram to put into tensorboard.
-    #         hist_tensor (torch.Tensor): A Tensor of arbitrary shape to be converted
-    #             into a histogram.
-    #         bins (int): Number of histogram bins.
-    #     """
-    #     ht_min, ht_max = hist_tensor.min().item(), hist_tensor.max().item()
-    #
-    #     # Create a histogram with PyTorch
-    #     hist_counts = torch.histc(hist_tensor, bins=bins)
-    #     hist_edges = torch.linspace(start=ht_min, end=ht_max, steps=bins + 1, dtype=torch.float32)
-    #
-    #     # Parameter for the add_histogram_raw function of SummaryWriter
-    #     hist_params = dict(
-    #         tag=hist_name,
-    #         min=ht_min,
-    #         max=ht_max,
-    #         num=len(hist_tensor),
-    #         sum=float(hist_tensor.sum()),
-    #         sum_squares=float(torch.sum(hist_tensor**2)),
-    #         bucket_limits=hist_edges[1:].tolist(),
-    #         bucket_counts=hist_counts.tolist(),
-    #         global_step=self._iter,
-    #     )
-    #     self._histograms.append(hist_params)
+
+    def put_histogram(self, hist_name, hist_tensor, bins=1000):
+        """
+        Create a histogram from a tensor.
+        Args:
+            hist_name (str): The name of the histogram to put into tensorboard.
+            hist_tensor (torch.Tensor or numpy.array): A Tensor of arbitrary shape to be converted
+                into a histogram.
+            bins (int): Number of histogram bins.
+        """
+        hist_tensor = torch.as_tensor(hist_tensor, dtype=torch.float64).flatten()
+        ht_min, ht_max = hist_tensor.min().item(), hist_tensor.max().item()
+
+        # Create a histogram with PyTorch
+        hist_counts = torch.histc(hist_tensor, bins=bins, min=ht_min, max=ht_max)
+        hist_edges = torch.linspace(start=ht_min, end=ht_max, steps=bins + 1, dtype=torch.float64)
+
+        # Parameter for the add_histogram_raw function of SummaryWriter
+        hist_params = dict(
+            tag=self._current_prefix + hist_name,
+            min=ht_min,
+            max=ht_max,
+            num=len(hist_tensor),
+            sum=float(hist_tensor.sum()),
+            sum_squares=float(torch.sum(hist_tensor**2)),
+            bucket_limits=hist_edges[1:].tolist(),
+            bucket_counts=hist_counts.tolist(),
+            global_step=self._iter,
+        )
+        self._histograms.append(hist_params)
 
     def history(self, name):
         """
@@ -0,0 +1,287 @@
+"""
+Copyright 2024-2025 The Alibaba 3DAIGC Team Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Compressed transport of expression streams.
+
+Weights are quantized to ``bits``-bit fixed point. Every message carries the frames of one
+streaming chunk; its first frame is a keyframe (absolute levels) when the stream starts, when
+``keyframe_interval`` frames have passed since the last keyframe, or on request. Other frames
+store per-channel differences to the previous frame. Zero levels (keyframes) and unchanged
+channels (delta frames) are skipped through a per-frame channel bitmask, the remaining values
+are zigzag varints, and the payload goes through a per-session raw deflate stream that is
+restarted at keyframes, so a decoder can join at any keyframe message.
+
+Message layout (little endian)::
+
+    u32 length      bytes following this field
+    u8  version
+    u8  flags       FLAG_KEYFRAME: first frame is a keyframe, deflate stream restarted
+    u8  bits        quantization bits (8 or 16)
+    u8  channels
+    u32 session_id
+    u32 sequence    message counter of the session
+    u16 num_frames
+    ... deflate(payload)
+
+Payload (columnar): packbits(frame is keyframe)[num_frames], packbits(channel mask)[num_frames, channels],
+then the varints of all masked values in row-major order.
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+CODEC_VERSION = 1
+FLAG_KEYFRAME = 1
+
+MESSAGE_HEADER = struct.Struct("<IBBBBIIH")
+# bytes of the header counted by its length field
+_HEADER_TAIL = MESSAGE_HEADER.size - 4
+
+
+def _zigzag_encode(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def _zigzag_decode(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.uint64)
+    return ((values >> np.uint64(1)).astype(np.int64)) ^ -((values & np.uint64(1)).astype(np.int64))
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """LEB128-encodes an array of non-negative integers (vectorized)."""
+    values = np.asarray(values, dtype=np.uint64)
+    if values.size == 0:
+        return b""
+    num_groups = np.ones(values.shape, dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        num_groups += rest > 0
+        rest >>= np.uint64(7)
+    max_groups = int(num_groups.max())
+    shifts = (np.arange(max_groups, dtype=np.uint64) * np.uint64(7))[None, :]
+    groups = ((values[:, None] >> shifts) & np.uint64(0x7F)).astype(np.uint8)
+    index = np.arange(max_groups)[None, :]
+    groups[index < (num_groups[:, None] - 1)] |= 0x80
+    return groups[index < num_groups[:, None]].tobytes()
+
+
+def decode_varints(data, count: int, offset: int = 0):
+    """
+    Decodes ``count`` LEB128 integers starting at ``offset``.
+
+    Returns:
+        tuple: (uint64 array, offset after the last decoded byte)
+    """
+    if count == 0:
+        return np.zeros(0, dtype=np.uint64), offset
+    buffer = np.frombuffer(data, dtype=np.uint8, offset=offset)
+    ends = np.flatnonzero(buffer < 0x80)
+    if ends.shape[0] < count:
+        raise ValueError("Truncated varint stream")
+    ends = ends[:count]
+    buffer = buffer[:ends[-1] + 1]
+    starts = np.empty(count, dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    value_index = np.repeat(np.arange(count), ends - starts + 1)
+    shifts = ((np.arange(buffer.shape[0]) - starts[value_index]) * 7).astype(np.uint64)
+    groups = (buffer & 0x7F).astype(np.uint64) << shifts
+    return np.add.reduceat(groups, starts), offset + int(ends[-1]) + 1
+
+
+class ExpressionEncoder:
+    """Encodes the expression chunks of one stream into framed messages.
+
+    Example:
+        encoder = ExpressionEncoder(session_id=7)
+        for output in outputs_of_infer_streaming_audio:
+            websocket.send_bytes(encoder.encode(output['expression']))
+    """
+
+    def __init__(self,
+                 session_id: int = 0,
+                 num_channels: int = 52,
+                 bits: int = 16,
+                 keyframe_interval: int = 60,
+                 threshold: int = 0,
+                 compress_level: int = 6):
+        """
+        Args:
+            session_id: Id written into every message, lets one connection carry many sessions
+            num_channels: Number of blendshape channels
+            bits: Fixed-point precision, 8 or 16
+            keyframe_interval: Min frames between two keyframes
+            threshold: Channel changes of at most this many levels are not sent (lossy, the
+                       error stays bounded by threshold levels since deltas are taken against
+                       what the decoder reconstructs)
+            compress_level: zlib level of the entropy stage
+        """
+        if bits not in (8, 16):
+            raise ValueError(f"bits must be 8 or 16, got {bits}")
+        self.session_id = session_id
+        self.num_channels = num_channels
+        self.bits = bits
+        self.max_level = (1 << bits) - 1
+        self.keyframe_interval = keyframe_interval
+        self.threshold = threshold
+        self.compress_level = compress_level
+        self.sequence = 0
+        self._previous = None
+        self._frames_since_keyframe = 0
+        self._compressor = None
+        self._force_keyframe = True
+
+    def request_keyframe(self) -> None:
+        """Makes the next message start with a keyframe, e.g. when a client (re)joins."""
+        self._force_keyframe = True
+
+    def quantize(self, frames: np.ndarray) -> np.ndarray:
+        return np.rint(np.clip(frames, 0.0, 1.0) * self.max_level).astype(np.int64)
+
+    def _deltas(self, levels: np.ndarray, keyframe: bool):
+        """Per-frame values and channel masks; row 0 is absolute when keyframe."""
+        previous = np.zeros(self.num_channels, dtype=np.int64) if keyframe else self._previous
+        if self.threshold <= 0:
+            values = np.diff(levels, axis=0, prepend=previous[None, :])
+            if keyframe:
+                values[0] = levels[0]
+            return values, values != 0, levels[-1]
+
+        values = np.zeros_like(levels)
+        mask = np.zeros(levels.shape, dtype=bool)
+        for i in range(levels.shape[0]):
+            if i == 0 and keyframe:
+                values[0], mask[0] = levels[0], levels[0] != 0
+                previous = levels[0]
+                continue
+            delta = levels[i] - previous
+            mask[i] = np.abs(delta) > self.threshold
+            values[i] = np.where(mask[i], delta, 0)
+            previous = previous + values[i]
+        return values, mask, previous
+
+    def encode(self, frames: np.ndarray) -> bytes:
+        """Encodes a [num_frames, num_channels] chunk of weights in [0, 1] into one message."""
+        frames = np.asarray(frames)
+        if frames.ndim != 2 or frames.shape[1] != self.num_channels:
+            raise ValueError(f"Expected frames of shape (N, {self.num_channels}), got {frames.shape}")
+        num_frames = frames.shape[0]
+        if num_frames > 0xFFFF:
+            raise ValueError("At most 65535 frames per message")
+
+        keyframe = num_frames > 0 and (self._force_keyframe
+                                       or self._previous is None
+                                       or self._frames_since_keyframe >= self.keyframe_interval)
+        flags = 0
+        if keyframe:
+            flags |= FLAG_KEYFRAME
+            self._compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, -15)
+            self._frames_since_keyframe = 0
+            self._force_keyframe = False
+
+        payload = b""
+        if num_frames > 0:
+            levels = self.quantize(frames)
+            values, mask, self._previous = self._deltas(levels, keyframe)
+            is_keyframe = np.zeros(num_frames, dtype=bool)
+            is_keyframe[0] = keyframe
+            # absolute keyframe levels are non-negative, deltas are zigzagged
+            selected = values[mask]
+            row_is_keyframe = np.repeat(is_keyframe, mask.sum(axis=1))
+            encoded = np.where(row_is_keyframe, selected.astype(np.uint64), _zigzag_encode(selected))
+            raw = (np.packbits(is_keyframe).tobytes()
+                   + np.packbits(mask).tobytes()
+                   + encode_varints(encoded))
+            payload = self._compressor.compress(raw) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._frames_since_keyframe += num_frames
+
+        header = MESSAGE_HEADER.pack(_HEADER_TAIL + len(payload), CODEC_VERSION, flags, self.bits,
+                                     self.num_channels, self.session_id, self.sequence, num_frames)
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        return header + payload
+
+
+class ExpressionDecoder:
+    """Decodes the messages of one or many sessions back to float32 weights.
+
+    Example:
+        decoder = ExpressionDecoder()
+        for session_id, sequence, frames in decoder.feed(received_bytes):
+            ...
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._sessions = {}
+
+    def feed(self, data: bytes) -> list:
+        """Appends received bytes; returns (session_id, sequence, frames) of every complete message."""
+        self._buffer += data
+        messages = []
+        offset = 0
+        while len(self._buffer) - offset >= 4:
+            length = struct.unpack_from("<I", self._buffer, offset)[0]
+            if len(self._buffer) - offset < 4 + length:
+                break
+            messages.append(self.decode(bytes(self._buffer[offset:offset + 4 + length])))
+            offset += 4 + length
+        del self._buffer[:offset]
+        return messages
+
+    def close_session(self, session_id) -> None:
+        self._sessions.pop(session_id, None)
+
+    def decode(self, message: bytes):
+        """Decodes one complete message; returns (session_id, sequence, frames)."""
+        length, version, flags, bits, num_channels, session_id, sequence, num_frames = \
+            MESSAGE_HEADER.unpack_from(message)
+        if version != CODEC_VERSION:
+            raise ValueError(f"Unsupported codec version {version}")
+
+        state = self._sessions.get(session_id)
+        if flags & FLAG_KEYFRAME:
+            state = {"decompressor": zlib.decompressobj(-15), "previous": None}
+            self._sessions[session_id] = state
+        if num_frames == 0:
+            return session_id, sequence, np.zeros((0, num_channels), dtype=np.float32)
+        if state is None or state["previous"] is None and not flags & FLAG_KEYFRAME:
+            raise ValueError(f"Session {session_id}: delta message {sequence} without a preceding keyframe")
+
+        raw = state["decompressor"].decompress(message[MESSAGE_HEADER.size:4 + length])
+        keyframe_bytes = (num_frames + 7) // 8
+        mask_bytes = (num_frames * num_channels + 7) // 8
+        buffer = np.frombuffer(raw, dtype=np.uint8)
+        is_keyframe = np.unpackbits(buffer[:keyframe_bytes])[:num_frames].astype(bool)
+        mask = np.unpackbits(buffer[keyframe_bytes:keyframe_bytes + mask_bytes])[:num_frames * num_channels]
+        mask = mask.reshape(num_frames, num_channels).astype(bool)
+        encoded, _ = decode_varints(raw, int(mask.sum()), keyframe_bytes + mask_bytes)
+
+        row_is_keyframe = np.repeat(is_keyframe, mask.sum(axis=1))
+        values = np.zeros((num_frames, num_channels), dtype=np.int64)
+        values[mask] = np.where(row_is_keyframe, encoded.astype(np.int64), _zigzag_decode(encoded))
+
+        # running sum of the deltas, restarted at every keyframe
+        if not is_keyframe[0]:
+            values[0] += state["previous"]
+        cumulative = np.cumsum(values, axis=0)
+        last_keyframe = np.maximum.accumulate(np.where(is_keyframe, np.arange(num_frames), 0))
+        before = np.where((last_keyframe > 0)[:, None], cumulative[np.maximum(last_keyframe - 1, 0)], 0)
+        levels = cumulative - before
+        state["previous"] = levels[-1]
+
+        return session_id, sequence, (levels * (1.0 / ((1 << bits) - 1))).astype(np.float32)
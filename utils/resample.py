@@ -0,0 +1,162 @@
+"""
+Frame-rate resampling of [num_frames, C] animations, offline and chunked (streaming).
+
+Only numpy: pdxutils converters import this without pulling in torch; models.utils
+re-exports everything.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+FRAME_INTERPOLATION_METHODS = ("linear", "cubic", "monotone")
+
+
+def _frame_tangents(frames: np.ndarray, method: str) -> np.ndarray:
+    """Per-frame Hermite tangents (in units of one source frame) of a [num_frames, C] array.
+
+    "cubic" uses Catmull-Rom tangents, "monotone" the Fritsch-Carlson harmonic mean of the
+    neighbouring secants (zero at local extrema), which never overshoots the input range.
+    Both are local: the tangent of frame i only depends on frames i-1 .. i+1.
+    """
+    secants = np.diff(frames, axis=0)
+    tangents = np.empty_like(frames)
+    tangents[0] = secants[0]
+    tangents[-1] = secants[-1]
+    if method == "cubic":
+        tangents[1:-1] = 0.5 * (secants[:-1] + secants[1:])
+    elif method == "monotone":
+        product = secants[:-1] * secants[1:]
+        total = secants[:-1] + secants[1:]
+        tangents[1:-1] = np.divide(2.0 * product, total,
+                                   out=np.zeros_like(product),
+                                   where=product > 0)
+    else:
+        raise ValueError(f"Invalid interpolation method: {method}")
+    return tangents
+
+
+def _interpolate_frames(
+        frames: np.ndarray,
+        positions: np.ndarray,
+        method: str = "linear"
+) -> np.ndarray:
+    """Samples a [num_frames, C] array at fractional frame positions (clamped to its range)."""
+    num_frames = frames.shape[0]
+    if num_frames == 1 or positions.shape[0] == 0:
+        return np.repeat(frames[:1], positions.shape[0], axis=0)
+
+    index = np.clip(np.floor(positions).astype(np.int64), 0, num_frames - 2)
+    t = np.clip(positions - index, 0.0, 1.0)[:, None]
+    start, end = frames[index], frames[index + 1]
+
+    if method == "linear":
+        return start + (end - start) * t
+
+    tangents = _frame_tangents(frames, method)
+    t2 = t * t
+    t3 = t2 * t
+    return ((2 * t3 - 3 * t2 + 1) * start
+            + (t3 - 2 * t2 + t) * tangents[index]
+            + (-2 * t3 + 3 * t2) * end
+            + (t3 - t2) * tangents[index + 1])
+
+
+def resample_frames(
+        frames: np.ndarray,
+        src_fps: float,
+        dst_fps: float,
+        method: str = "linear"
+) -> np.ndarray:
+    """Resamples an animation along the time axis.
+
+    Output frame j is sampled at time j / dst_fps; the output covers the same duration as
+    the input, i.e. round(num_frames * dst_fps / src_fps) frames.
+
+    Args:
+        frames: Array of shape [num_frames, C] sampled at src_fps
+        src_fps: Frame rate of frames
+        dst_fps: Requested frame rate
+        method: One of FRAME_INTERPOLATION_METHODS
+
+    Returns:
+        Resampled array of shape [round(num_frames * dst_fps / src_fps), C]
+    """
+    if method not in FRAME_INTERPOLATION_METHODS:
+        raise ValueError(f"Invalid interpolation method: {method}")
+    if frames.shape[0] == 0 or src_fps == dst_fps:
+        return frames.copy()
+
+    num_output = int(round(frames.shape[0] * dst_fps / src_fps))
+    positions = np.arange(num_output) * (src_fps / dst_fps)
+    return _interpolate_frames(frames.astype(np.float64), positions, method).astype(frames.dtype)
+
+
+def resample_frames_streaming(
+        frames: Optional[np.ndarray],
+        src_fps: float,
+        dst_fps: float,
+        method: str = "linear",
+        state: Optional[dict] = None,
+        flush: bool = False
+) -> Tuple[np.ndarray, dict]:
+    """Chunked version of resample_frames.
+
+    The last source frames of each chunk are carried in ``state`` so that the concatenated
+    output of all chunks (plus a final ``flush=True`` call) equals resample_frames on the
+    whole sequence. Spline methods hold back output frames that need the tangent of the
+    newest source frame until the next chunk (or the flush) arrives, i.e. one source frame
+    of extra latency; "linear" has none.
+
+    Args:
+        frames: New source frames [num_frames, C], may be None or empty when flushing
+        src_fps: Frame rate of frames
+        dst_fps: Requested frame rate
+        method: One of FRAME_INTERPOLATION_METHODS
+        state: Resampler state returned by the previous call (None for the first chunk)
+        flush: Emit all remaining output frames, ending the stream
+
+    Returns:
+        tuple: (resampled frames of this call, state for the next call)
+    """
+    if method not in FRAME_INTERPOLATION_METHODS:
+        raise ValueError(f"Invalid interpolation method: {method}")
+    if state is None:
+        state = {"carry": None, "start": 0, "next_output": 0}
+
+    carry = state["carry"]
+    if frames is None or frames.shape[0] == 0:
+        full = carry
+    elif carry is None:
+        full = frames.astype(np.float64)
+    else:
+        full = np.concatenate([carry, frames.astype(np.float64)], axis=0)
+    if full is None or full.shape[0] == 0:
+        num_channels = frames.shape[1] if frames is not None and frames.ndim == 2 else 0
+        return np.zeros((0, num_channels), dtype=np.float32), state
+
+    start = state["start"]
+    end = start + full.shape[0]
+    next_output = state["next_output"]
+
+    if flush:
+        output_end = int(round(end * dst_fps / src_fps))
+    else:
+        # last source frame whose outgoing segment is fully known
+        lookahead = 0 if method == "linear" else 1
+        output_end = int(np.floor((end - 1 - lookahead) * dst_fps / src_fps)) + 1
+    output_end = max(output_end, next_output)
+
+    positions = np.arange(next_output, output_end) * (src_fps / dst_fps) - start
+    output = _interpolate_frames(full, positions, method).astype(np.float32)
+
+    # keep the source frame before the next output's segment for its tangent
+    keep_from = int(np.floor(output_end * src_fps / dst_fps)) - 1
+    keep_from = min(max(keep_from, start), end)
+    new_state = {
+        "carry": full[keep_from - start:],
+        "start": keep_from,
+        "next_output": output_end,
+    }
+    return output, new_state
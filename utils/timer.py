@@ -2,8 +2,14 @@
 The code is base on https://github.com/Pointcept/Pointcept
 """
 
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
 from time import perf_counter
-from typing import Optional
+from typing import Dict, Optional
+
+import numpy as np
+import torch
 
 
 class Timer:
@@ -69,3 +75,206 @@ class Timer:
             pause.
         """
         return self.seconds() / self._count_start
+
+
+class _InstanceAttributeHandle:
+    """Removable handle of a method wrapper installed by :meth:`StageTimer.attach_method`."""
+
+    def __init__(self, owner, name: str) -> None:
+        self.owner = owner
+        self.name = name
+
+    def remove(self) -> None:
+        self.owner.__dict__.pop(self.name, None)
+
+
+class StageTimer:
+    """
+    Collects per-stage wall-clock latencies of a request pipeline and exposes them
+    as histograms through an :class:`EventStorage` and its writers.
+
+    Stages are timed with ``with timer.stage(name)``, for ``nn.Module`` stages with
+    forward hooks installed by :meth:`attach`, or around a method with :meth:`attach_method`. A request is delimited by
+    ``with timer.request()``; every ``write_period`` requests the latest
+    ``window_size`` samples of each stage are written as one histogram.
+    The timer is thread-safe and a no-op when ``enabled`` is False.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        storage=None,
+        writers=None,
+        prefix: str = "latency",
+        window_size: int = 1000,
+        write_period: int = 20,
+        cuda_sync: bool = False,
+    ) -> None:
+        """
+        Args:
+            enabled: record timings; when False all methods return immediately
+            storage (EventStorage): storage receiving histograms and percentile scalars
+            writers (list[EventWriter]): writers flushed every ``write_period`` requests
+            prefix: name scope of the recorded events
+            window_size: number of latest samples kept per stage
+            write_period: number of requests between two writes, 0 to disable
+            cuda_sync: synchronize CUDA around module stages so GPU time is attributed
+                to the stage that launched it
+        """
+        self.enabled = enabled
+        self.storage = storage
+        self.writers = writers or []
+        self.prefix = prefix
+        self.window_size = window_size
+        self.write_period = write_period
+        self.cuda_sync = cuda_sync
+        self._samples = defaultdict(lambda: deque(maxlen=self.window_size))
+        self._num_requests = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._hook_handles = []
+
+    def record(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._samples[name].append(seconds)
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, perf_counter() - start)
+
+    @contextmanager
+    def request(self):
+        """Delimits one request; nested calls (same thread) count once."""
+        if not self.enabled:
+            yield
+            return
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                self.record("total", perf_counter() - start)
+                self._step()
+
+    def attach(self, module, name: str) -> None:
+        """Times every forward of ``module`` as stage ``name``."""
+        if not self.enabled:
+            return
+
+        def _sync():
+            if self.cuda_sync:
+                torch.cuda.synchronize()
+
+        def _pre_hook(_module, _inputs):
+            _sync()
+            starts = getattr(self._local, "module_starts", None)
+            if starts is None:
+                starts = self._local.module_starts = {}
+            starts[id(_module)] = perf_counter()
+
+        def _post_hook(_module, _inputs, _outputs):
+            _sync()
+            start = self._local.module_starts.pop(id(_module), None)
+            if start is not None:
+                self.record(name, perf_counter() - start)
+
+        self._hook_handles.append(module.register_forward_pre_hook(_pre_hook))
+        self._hook_handles.append(module.register_forward_hook(_post_hook))
+
+    def attach_method(self, owner, method: str, name: str) -> None:
+        """
+        Times every call of ``owner.<method>`` as stage ``name``, for stages that do not go
+        through one module's forward (e.g. a method with several code paths).
+        """
+        if not self.enabled:
+            return
+        function = getattr(owner, method)
+
+        def _timed(*args, **kwargs):
+            if self.cuda_sync:
+                torch.cuda.synchronize()
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                if self.cuda_sync:
+                    torch.cuda.synchronize()
+                self.record(name, perf_counter() - start)
+
+        # instance attribute shadowing the method, removed again by detach
+        setattr(owner, method, _timed)
+        self._hook_handles.append(_InstanceAttributeHandle(owner, method))
+
+    def detach(self) -> None:
+        for handle in self._hook_handles:
+            handle.remove()
+        self._hook_handles = []
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            dict[stage -> dict]: count, mean, p50, p95, p99 and max (seconds) over
+                the current window of each stage
+        """
+        with self._lock:
+            samples = {name: np.asarray(values) for name, values in self._samples.items() if len(values)}
+        result = {}
+        for name, values in samples.items():
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            result[name] = dict(
+                count=int(values.shape[0]),
+                mean=float(values.mean()),
+                p50=float(p50),
+                p95=float(p95),
+                p99=float(p99),
+                max=float(values.max()),
+            )
+        return result
+
+    def write(self) -> None:
+        """Puts the current windows into the storage and flushes the writers."""
+        if not self.enabled or self.storage is None:
+            return
+        summary = self.summary()
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items() if len(values)}
+            with self.storage.name_scope(self.prefix):
+                for name, values in samples.items():
+                    self.storage.put_histogram(name, values, bins=50)
+                    for key in ("p50", "p95", "p99"):
+                        self.storage.put_scalar(f"{name}/{key}", summary[name][key])
+            if self.writers:
+                with self.storage:
+                    for writer in self.writers:
+                        writer.write()
+            self.storage.clear_histograms()
+            self.storage.step()
+
+    def _step(self) -> None:
+        with self._lock:
+            self._num_requests += 1
+            should_write = self.write_period > 0 and self._num_requests % self.write_period == 0
+        if should_write:
+            self.write()
+
+    def close(self) -> None:
+        self.detach()
+        if self.enabled and self.storage is not None:
+            with self._lock:
+                pending = self._num_requests
+            if self.write_period > 0 and pending % self.write_period:
+                self.write()
+        for writer in self.writers:
+            writer.close()